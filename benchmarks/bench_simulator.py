@@ -0,0 +1,243 @@
+"""
+Benchmarks for the simulator's hot paths.
+
+Every case runs in a fresh subprocess (so peak RSS belongs to that case only)
+and reports rows/sec, peak RSS and tracemalloc allocation figures. Results can
+be stored as a baseline and later runs compared against it:
+
+    python benchmarks/bench_simulator.py                     # run + compare
+    python benchmarks/bench_simulator.py --save-baseline     # refresh baseline.json
+    python benchmarks/bench_simulator.py --quick             # skip the 1M-row cases
+    python benchmarks/bench_simulator.py --cases stream_100k csv_export_100k
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+SEED = 2024
+
+# -----------------------------------------------------------------------------
+# CASES
+# Each case builds a zero-argument callable and says how many rows (or calls)
+# one run of it produces.
+# -----------------------------------------------------------------------------
+def _quotas(n_rows):
+    """generate_dataset's 500/500/8/7/50 mix scaled to about n_rows respondents."""
+    scale = n_rows / 1065
+    return dict(
+        n_exposed=round(500 * scale),
+        n_control=round(500 * scale),
+        n_exposed_outliers=round(8 * scale),
+        n_control_outliers=round(7 * scale),
+        n_terminated=round(50 * scale)
+    )
+
+def _stream(n_rows):
+    def run():
+        for _ in sim.iter_dataset_chunks(chunk_size=100_000, seed=SEED, **_quotas(n_rows)):
+            pass
+    return run
+
+def _respondents(func, n_calls, **kwargs):
+    def run():
+        rng = np.random.default_rng(SEED)
+        for i in range(n_calls):
+            func(i, rng=rng, **kwargs)
+    return run
+
+def _adjust_scalar(n_calls):
+    def run():
+        rng = np.random.default_rng(SEED)
+        for i in range(n_calls):
+            sim.adjust_brandx_ratings(3, 3, 6, brandx_in_b1=bool(i & 1), is_exposed=bool(i & 2), rng=rng)
+    return run
+
+def _adjust_batch(n_rows):
+    rng = np.random.default_rng(SEED)
+    b3, b4, b5 = rng.integers(1, 6, n_rows), rng.integers(1, 6, n_rows), rng.integers(1, 11, n_rows)
+    mention, exposed = rng.random(n_rows) < 0.3, rng.random(n_rows) < 0.5
+    def run():
+        sim.adjust_brandx_ratings_batch(b3, b4, b5, mention, exposed, rng=np.random.default_rng(SEED))
+    return run
+
+def _b1_scalar(n_calls):
+    def run():
+        rng = np.random.default_rng(SEED)
+        for i in range(n_calls):
+            sim.simulate_b1_unaided_brands(is_exposed=bool(i & 1), frequent_chip_eater=bool(i & 2), rng=rng)
+    return run
+
+def _b1_batch(n_rows):
+    rng = np.random.default_rng(SEED)
+    exposed, frequent = rng.random(n_rows) < 0.5, rng.random(n_rows) < 0.4
+    def run():
+        sim.simulate_b1_unaided_brands_batch(exposed, frequent, rng=np.random.default_rng(SEED))
+    return run
+
+def _export(writer, suffix, n_rows):
+    def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            writer(os.path.join(tmp, "panel" + suffix), seed=SEED, **_quotas(n_rows))
+    return run
+
+# name => (rows per run, factory, repeats, part of --quick)
+CASES = {
+    "generate_dataset": (1065, lambda: (lambda: sim.generate_dataset(rng=SEED)), 3, True),
+    "stream_1k": (1065, lambda: _stream(1065), 5, True),
+    "stream_100k": (100_000, lambda: _stream(100_000), 3, True),
+    "stream_1m": (1_000_000, lambda: _stream(1_000_000), 1, False),
+    "complete_respondent_10k": (10_000, lambda: _respondents(
+        sim.simulate_complete_respondent, 10_000, force_exposed=True), 3, True),
+    "terminated_respondent_10k": (10_000, lambda: _respondents(sim.simulate_terminated_respondent, 10_000), 3, True),
+    "adjust_brandx_ratings_100k": (100_000, lambda: _adjust_scalar(100_000), 3, True),
+    "adjust_brandx_ratings_batch_1m": (1_000_000, lambda: _adjust_batch(1_000_000), 3, True),
+    "b1_unaided_brands_100k": (100_000, lambda: _b1_scalar(100_000), 3, True),
+    "b1_unaided_brands_batch_1m": (1_000_000, lambda: _b1_batch(1_000_000), 3, True),
+    "csv_export_100k": (100_000, lambda: _export(sim.write_dataset_csv, ".csv", 100_000), 3, True),
+    "csv_export_1m": (1_000_000, lambda: _export(sim.write_dataset_csv, ".csv", 1_000_000), 1, False),
+    "parquet_export_100k": (100_000, lambda: _export(sim.write_dataset_parquet, ".parquet", 100_000), 3, True),
+}
+
+# -----------------------------------------------------------------------------
+# RUNNING
+# -----------------------------------------------------------------------------
+def run_case(name):
+    """Time one case in this process and return its metrics."""
+    global sim, np
+    import numpy as np
+    import Simulated_brandx_survey as sim
+
+    rows, factory, repeats, _ = CASES[name]
+    func = factory()
+    func()  # warm-up (imports, caches)
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    best = min(times)
+
+    # Separate traced run: tracemalloc slows things down, so it isn't timed
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    func()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1 << 20) if sys.platform == "darwin" else rss / (1 << 10)
+    return {
+        "rows": rows,
+        "seconds": round(best, 4),
+        "rows_per_sec": round(rows / best, 1),
+        "peak_rss_mb": round(rss_mb, 1),
+        "traced_peak_mb": round(traced_peak / (1 << 20), 2),
+        "live_blocks": sum(stat.count for stat in snapshot.statistics("filename")),
+        "net_blocks": sys.getallocatedblocks() - blocks_before
+    }
+
+def run_isolated(name):
+    """Run a case in a fresh interpreter so RSS and allocations are its own."""
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-case", name],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout)
+
+def compare(results, baseline, tolerance):
+    """Rows/sec regressions beyond `tolerance` (fraction) against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        change = result["rows_per_sec"] / base["rows_per_sec"] - 1
+        flag = "REGRESSION" if change < -tolerance else ""
+        print(f"  {name:32s} {change:+7.1%} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def _cpu_model():
+    """CPU model name (from /proc/cpuinfo on Linux), for the baseline record."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+def _versions():
+    """Versions of the libraries the timings depend on."""
+    import numpy
+    import pandas
+    versions = {"numpy": numpy.__version__, "pandas": pandas.__version__}
+    try:
+        import pyarrow
+        versions["pyarrow"] = pyarrow.__version__
+    except ImportError:
+        pass
+    return versions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), help="run only these cases")
+    parser.add_argument("--quick", action="store_true", help="skip the 1M-row end-to-end cases")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE_PATH}")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed rows/sec drop vs the baseline before failing (default 0.25)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case)))
+        return 0
+
+    names = args.cases or [name for name, case in CASES.items() if case[3] or not args.quick]
+    results = {}
+    print(f"{'case':32s} {'rows/sec':>12s} {'seconds':>9s} {'peak RSS':>9s} {'traced':>8s} {'blocks':>8s}")
+    for name in names:
+        result = results[name] = run_isolated(name)
+        print(f"{name:32s} {result['rows_per_sec']:12,.0f} {result['seconds']:9.3f} "
+              f"{result['peak_rss_mb']:7.0f}MB {result['traced_peak_mb']:6.1f}MB {result['live_blocks']:8d}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpu": _cpu_model(),
+                "cpus": os.cpu_count(),
+                "libraries": _versions(),
+                "results": results
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline yet; run with --save-baseline.")
+        return 0
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    print(f"Change in rows/sec vs baseline (tolerance {args.tolerance:.0%}):")
+    return 1 if compare(results, baseline, args.tolerance) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
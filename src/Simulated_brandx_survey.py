@@ -1,24 +1,549 @@
+import hashlib
+import json
+import os
+import time
+from collections import deque, namedtuple
+from functools import lru_cache, partial
+from itertools import product
+from string import Formatter
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 
 # -----------------------------------------------------------------------------
-# SET SEED FOR REPRODUCIBILITY
+# RANDOM NUMBER GENERATION
+# Every helper takes an optional `rng`: a np.random.Generator (PCG64 by
+# default, or e.g. np.random.Generator(np.random.Philox(seed))), an integer
+# seed, or None for fresh OS entropy. Pass a seed or a Generator for
+# reproducible output; importing this module does not touch any global state.
+# -----------------------------------------------------------------------------
+def _as_generator(rng):
+    """
+    Accept a np.random.Generator, an integer seed / SeedSequence, or None,
+    and return a Generator.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+# -----------------------------------------------------------------------------
+# PROFILING
+# Optional instrumentation for the scalar generators: pass a SurveyProfile as
+# `profile=` to collect per-section wall time, RNG call counts and rows
+# emitted. With profile=None (the default) each section boundary is a single
+# no-op call.
+# -----------------------------------------------------------------------------
+SECTIONS = ["A_screening", "B_brand", "C_ad_perception", "D_lifestyle", "termination", "assembly"]
+_COUNTED_RNG_METHODS = (
+    "random", "integers", "choice", "normal", "uniform", "permutation", "shuffle", "hypergeometric"
+)
+
+class CountingGenerator(np.random.Generator):
+    """
+    Generator sharing another Generator's bit generator (so the draws are
+    identical) that counts its method calls into a SurveyProfile.
+    """
+    def __init__(self, rng, profile):
+        super().__init__(rng.bit_generator)
+        self.profile = profile
+
+def _counted(name):
+    method = getattr(np.random.Generator, name)
+    def counted(self, *args, **kwargs):
+        self.profile.rng_calls += 1
+        return method(self, *args, **kwargs)
+    counted.__name__ = name
+    return counted
+
+for _name in _COUNTED_RNG_METHODS:
+    setattr(CountingGenerator, _name, _counted(_name))
+
+class SurveyProfile:
+    """
+    Per-section timing / RNG-call / row counters. `lap(section)` charges the
+    time and RNG calls since the previous lap to `section`.
+    """
+    def __init__(self):
+        self.seconds = dict.fromkeys(SECTIONS, 0.0)
+        self.section_rng_calls = dict.fromkeys(SECTIONS, 0)
+        self.rows = {}
+        self.rng_calls = 0
+        self.start()
+
+    def wrap(self, rng):
+        """Counting view of `rng` (returned as is if it already counts for us)."""
+        rng = _as_generator(rng)
+        if isinstance(rng, CountingGenerator) and rng.profile is self:
+            return rng
+        return CountingGenerator(rng, self)
+
+    def start(self):
+        """Start timing a new span (e.g. one respondent)."""
+        self._last_time = time.perf_counter()
+        self._last_calls = self.rng_calls
+
+    def lap(self, section):
+        now = time.perf_counter()
+        self.seconds[section] += now - self._last_time
+        self.section_rng_calls[section] += self.rng_calls - self._last_calls
+        self._last_time = now
+        self._last_calls = self.rng_calls
+
+    def emit(self, kind, n=1):
+        """Count n rows of one kind (e.g. "complete", "terminated")."""
+        self.rows[kind] = self.rows.get(kind, 0) + n
+
+    def report(self):
+        """Structured report: {"sections": {name: {...}}, "rows": {...}, "total_seconds": ...}."""
+        total = sum(self.seconds.values())
+        return {
+            "sections": {
+                name: {
+                    "seconds": self.seconds[name],
+                    "share": self.seconds[name] / total if total else 0.0,
+                    "rng_calls": self.section_rng_calls[name]
+                }
+                for name in SECTIONS
+            },
+            "rows": dict(self.rows),
+            "total_seconds": total
+        }
+
+    def counters(self):
+        """Flat {"metric.name": value} view for scraping into a metrics system."""
+        flat = {}
+        for name in SECTIONS:
+            flat[f"section.{name}.seconds"] = self.seconds[name]
+            flat[f"section.{name}.rng_calls"] = self.section_rng_calls[name]
+        for kind, n in self.rows.items():
+            flat[f"rows.{kind}"] = n
+        return flat
+
+    def __str__(self):
+        report = self.report()
+        lines = [f"{'section':16s} {'seconds':>9s} {'share':>6s} {'rng calls':>10s}"]
+        for name, stats in report["sections"].items():
+            lines.append(f"{name:16s} {stats['seconds']:9.3f} {stats['share']:6.1%} {stats['rng_calls']:10d}")
+        lines.append("rows: " + ", ".join(f"{kind}={n}" for kind, n in report["rows"].items()))
+        return "\n".join(lines)
+
+def _no_lap(section):
+    """Section boundary when profiling is off."""
+
+def _profiling(rng, profile, kind):
+    """
+    Generator and lap function for one respondent: the plain ones when
+    profile is None, else counting ones (and the row is counted as `kind`).
+    """
+    if profile is None:
+        return _as_generator(rng), _no_lap
+    profile.emit(kind)
+    profile.start()
+    return profile.wrap(rng), profile.lap
+
+# -----------------------------------------------------------------------------
+# CATEGORICAL SAMPLER TABLES
+# Every weighted categorical question is compiled once, at import, into an
+# immutable alias table. A draw then costs one integer and one uniform however
+# many categories there are, and `p` is never re-normalized or re-validated.
 # -----------------------------------------------------------------------------
-np.random.seed(123)
+class CategoricalSampler:
+    """
+    Immutable categorical distribution over `codes` (Walker/Vose alias method).
+    `weights` need not sum to 1; they are normalized once here.
+    draw(rng) returns one code, draw(rng, size) an array of codes.
+    """
+    __slots__ = ("codes", "probs", "_accept", "_alias")
+
+    def __init__(self, codes, weights):
+        codes = np.asarray(codes)
+        probs = np.asarray(weights, dtype=float)
+        if codes.shape != probs.shape or probs.ndim != 1:
+            raise ValueError("codes and weights must be 1-D and the same length")
+        if (probs < 0).any() or probs.sum() <= 0:
+            raise ValueError("weights must be non-negative with a positive sum")
+        probs = probs / probs.sum()
+
+        # Vose's alias table: column i keeps itself with prob accept[i],
+        # otherwise hands the draw to alias[i]
+        k = len(probs)
+        accept = np.ones(k)
+        alias = np.arange(k)
+        scaled = probs * k
+        small = [i for i in range(k) if scaled[i] < 1.0]
+        large = [i for i in range(k) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            accept[s], alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        for name, value in (("codes", codes), ("probs", probs), ("_accept", accept), ("_alias", alias)):
+            value.setflags(write=False)
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CategoricalSampler is immutable")
+
+    def __repr__(self):
+        return f"CategoricalSampler(codes={self.codes.tolist()}, probs={np.round(self.probs, 4).tolist()})"
+
+    def __reduce__(self):
+        # Rebuild from the public fields (worker processes get a copy)
+        return CategoricalSampler, (self.codes, self.probs)
+
+    def draw(self, rng, size=None):
+        column = rng.integers(0, len(self.codes), size)
+        keep = rng.random(size) < self._accept[column]
+        return self.codes[np.where(keep, column, self._alias[column])]
+
+_SNACK_WEIGHTS = [0.15, 0.25, 0.30, 0.20, 0.10]
+
+SAMPLERS = MappingProxyType({
+    # Section A
+    "gender": CategoricalSampler([1,2,3], [0.49,0.50,0.01]),
+    "age": CategoricalSampler([1,2,3,4,5,6], [0.1490, 0.1955, 0.1815, 0.1578, 0.1599, 0.1563]),
+    "province": CategoricalSampler(list(range(1,14)), [
+        10.20109, 13.27141, 3.0633, 2.0422, 1.0211,
+        0.515, 2.0422, 0.515, 40.3143, 1.0211,
+        22.45239, 3.0633, 0.515
+    ]),
+    "snack": CategoricalSampler([1,2,3,4,5], _SNACK_WEIGHTS),
+    "snack_not_never": CategoricalSampler([1,2,3,4,5], _SNACK_WEIGHTS[:-1] + [0.0]),
+    "termination_point": CategoricalSampler(["A1","A6","MidSurvey"], [0.3,0.4,0.3]),
+    # Section B
+    "b1_num_brands": CategoricalSampler([1,2,3], [0.4,0.4,0.2]),
+    "b2_num_selected": CategoricalSampler([2,3,4], [0.3,0.5,0.2]),
+    "b3_exposed": CategoricalSampler([1,2,3,4,5], [0.02,0.08,0.15,0.35,0.40]),
+    "b4_exposed": CategoricalSampler([1,2,3,4,5], [0.02,0.08,0.15,0.30,0.45]),
+    "b3_control": CategoricalSampler([1,2,3,4,5], [0.05,0.15,0.20,0.35,0.25]),
+    "b4_control": CategoricalSampler([1,2,3,4,5], [0.05,0.15,0.20,0.35,0.25]),
+    # Section C
+    "c1_frequent_viewer": CategoricalSampler([1,2,3], [0.80,0.15,0.05]),
+    "c1_other": CategoricalSampler([1,2,3], [0.60,0.30,0.10]),
+    "c3_not_recalled": CategoricalSampler([1,2,3], [0.30,0.50,0.20]),
+    "c4_positive": CategoricalSampler([1,2,3,4,5], [0.02,0.08,0.15,0.30,0.45]),
+    "c4_other": CategoricalSampler([1,2,3,4,5], [0.05,0.15,0.25,0.35,0.20]),
+    "attitude": CategoricalSampler([1,2,3,4,5], [0.05,0.10,0.10,0.35,0.40]),
+    "c7": CategoricalSampler([1,2,3,4,5,6,7], [0.50,0.10,0.10,0.05,0.10,0.10,0.05]),
+    # Section D
+    "d1": CategoricalSampler([1,2,3], [0.70,0.25,0.05]),
+    "d2": CategoricalSampler([1,2,3,4,5,6], [0.10,0.40,0.20,0.15,0.10,0.05]),
+    "d3": CategoricalSampler([1,2,3,4,5,6], [0.40,0.30,0.10,0.10,0.05,0.05]),
+    "d4": CategoricalSampler([1,2,3,4,5,6,7,8], [0.50,0.10,0.05,0.05,0.15,0.10,0.03,0.02]),
+    "d5": CategoricalSampler([1,2,3,4,5], [0.30,0.30,0.30,0.08,0.02]),
+    "d6": CategoricalSampler([1,2,3,4,5], [0.35,0.50,0.10,0.03,0.02]),
+    "d7": CategoricalSampler([1,2], [0.50,0.50]),
+    "d8_num_kids": CategoricalSampler([1,2,3], [0.5,0.3,0.2]),
+    "community_type": CategoricalSampler([1,2,3], [0.70,0.20,0.10]),
+    "d10": CategoricalSampler([1,2,3,4,5,6,7], [0.20,0.25,0.20,0.15,0.10,0.05,0.05]),
+})
+
+# Preliminary B5 (1-10, before adjust_brandx_ratings): (mean, sd) of a clipped normal
+NORMALS = MappingProxyType({
+    "b5_exposed": (8, 1.5),
+    "b5_control": (6, 1.8),
+})
+
+# -----------------------------------------------------------------------------
+# SCENARIO PROFILES
+# A scenario overrides any SAMPLERS distribution (and the B5 NORMALS) to run
+# another market or wave without editing this module. Profiles are JSON, TOML
+# or YAML files (or plain dicts), e.g. in TOML:
+#
+#   name = "quebec-wave-2"
+#   [samplers]
+#   province = {11 = 60, 9 = 25, 2 = 15}             # code => weight, others 0
+#   termination_point = {A1 = 0.2, A6 = 0.5, MidSurvey = 0.3}
+#   d10 = [0.10, 0.20, 0.20, 0.20, 0.15, 0.10, 0.05]  # a weight for every code
+#   [normals]
+#   b5_exposed = [8.5, 1.2]                           # mean, sd
+#
+# Every profile is normalized to one canonical form and hashed; the compiled
+# alias tables are cached per hash (and files per path / mtime), so switching
+# between scenarios in a long-running process compiles each one only once.
+# -----------------------------------------------------------------------------
+SCENARIO_SECTIONS = ("name", "samplers", "normals")
+
+class Scenario:
+    """
+    A compiled scenario: `samplers` (SAMPLERS with the profile's overrides)
+    and `normals` (NORMALS likewise), both read-only mappings. Build one with
+    scenario_from_dict() or load_scenario(); `digest` is the sha256 of the
+    canonical profile, and equal profiles share one cached Scenario.
+    """
+    __slots__ = ("name", "profile", "digest", "samplers", "normals")
+
+    def __init__(self, name, profile, digest, samplers, normals):
+        self.name = name
+        self.profile = profile
+        self.digest = digest
+        self.samplers = samplers
+        self.normals = normals
+
+    def __repr__(self):
+        overrides = sorted(self.profile["samplers"]) + sorted(self.profile["normals"])
+        return f"Scenario({self.name!r}, digest={self.digest[:12]}, overrides={overrides})"
+
+    def __reduce__(self):
+        # Worker processes rebuild (or reuse) it from their own cache
+        return scenario_from_dict, (self.to_dict(),)
+
+    def to_dict(self):
+        """The canonical profile, JSON-serializable (e.g. for a manifest)."""
+        return {"name": self.name, **self.profile}
+
+def _canonical_weights(name, spec):
+    """A sampler override => weights over all of SAMPLERS[name].codes, summing to 1."""
+    codes = SAMPLERS[name].codes.tolist()
+    if isinstance(spec, dict):
+        lookup = {str(code): i for i, code in enumerate(codes)}
+        unknown = [key for key in spec if str(key) not in lookup]
+        if unknown:
+            raise ValueError(f"scenario sampler {name!r} has unknown codes {unknown}; codes are {codes}")
+        weights = [0.0] * len(codes)
+        for key, weight in spec.items():
+            weights[lookup[str(key)]] = weight
+    elif isinstance(spec, (list, tuple)):
+        if len(spec) != len(codes):
+            raise ValueError(f"scenario sampler {name!r} needs {len(codes)} weights (codes {codes}), got {len(spec)}")
+        weights = list(spec)
+    else:
+        raise ValueError(f"scenario sampler {name!r} must be a list of weights or a {{code: weight}} table")
+    weights = np.asarray(weights, dtype=float)
+    if not np.isfinite(weights).all() or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError(f"scenario sampler {name!r}: weights must be non-negative with a positive sum")
+    return (weights / weights.sum()).tolist()
+
+def _canonical_normal(name, spec):
+    mean, sd = (spec["mean"], spec["sd"]) if isinstance(spec, dict) else spec
+    if not sd > 0:
+        raise ValueError(f"scenario normal {name!r} needs a positive sd")
+    return [float(mean), float(sd)]
+
+def _canonical_profile(profile):
+    unknown = sorted(set(profile) - set(SCENARIO_SECTIONS))
+    if unknown:
+        raise ValueError(f"unknown scenario sections {unknown}; expected {list(SCENARIO_SECTIONS)}")
+    samplers, normals = dict(profile.get("samplers") or {}), dict(profile.get("normals") or {})
+    for names, known, kind in ((samplers, SAMPLERS, "sampler"), (normals, NORMALS, "normal")):
+        unknown = sorted(set(names) - set(known))
+        if unknown:
+            raise ValueError(f"unknown scenario {kind}s {unknown}; known: {sorted(known)}")
+    samplers = {name: _canonical_weights(name, spec) for name, spec in samplers.items()}
+    normals = {name: _canonical_normal(name, spec) for name, spec in normals.items()}
+    # A6 "not all never" items follow the snack mix with Never removed
+    if "snack" in samplers and "snack_not_never" not in samplers:
+        samplers["snack_not_never"] = samplers["snack"][:-1] + [0.0]
+    return {"samplers": samplers, "normals": normals}
+
+@lru_cache(maxsize=None)
+def _compile_scenario(digest, text):
+    """Alias tables for one canonical profile; cached per profile hash."""
+    profile = json.loads(text)
+    samplers = SAMPLERS
+    if profile["samplers"]:
+        overrides = {name: CategoricalSampler(SAMPLERS[name].codes, w) for name, w in profile["samplers"].items()}
+        samplers = MappingProxyType({**SAMPLERS, **overrides})
+    normals = MappingProxyType({**NORMALS, **{name: tuple(v) for name, v in profile["normals"].items()}})
+    return profile, samplers, normals
+
+@lru_cache(maxsize=None)
+def _scenario(name, digest, text):
+    profile, samplers, normals = _compile_scenario(digest, text)
+    return Scenario(name, profile, digest, samplers, normals)
+
+def scenario_from_dict(profile, name=None):
+    """
+    Compile a profile {"name": ..., "samplers": {...}, "normals": {...}}
+    (see SCENARIO PROFILES) into a Scenario, or return the cached one.
+    """
+    text = json.dumps(_canonical_profile(profile), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(text.encode()).hexdigest()
+    return _scenario(str(name or profile.get("name") or f"scenario-{digest[:12]}"), digest, text)
+
+def load_scenario(path):
+    """
+    Scenario from a .json, .toml or .yaml / .yml profile file (named after
+    the file unless it sets `name`). Reloading an unchanged file is a cache hit.
+    """
+    path = os.path.abspath(os.fspath(path))
+    stat = os.stat(path)
+    return _load_scenario_file(path, stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=256)
+def _load_scenario_file(path, mtime_ns, size):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path) as f:
+            profile = json.load(f)
+    elif extension == ".toml":
+        import tomllib
+        with open(path, "rb") as f:
+            profile = tomllib.load(f)
+    elif extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise ImportError("YAML scenarios require PyYAML (pip install pyyaml)") from exc
+        with open(path) as f:
+            profile = yaml.safe_load(f) or {}
+    else:
+        raise ValueError(f"unknown scenario format {extension!r}; use .json, .toml, .yaml or .yml")
+    if not isinstance(profile, dict):
+        raise ValueError(f"{path}: a scenario profile must be a table / mapping")
+    return scenario_from_dict(profile, name=profile.get("name") or os.path.splitext(os.path.basename(path))[0])
+
+def as_scenario(scenario):
+    """Accept a Scenario, a profile dict, a profile file path or None (DEFAULT_SCENARIO)."""
+    if scenario is None:
+        return DEFAULT_SCENARIO
+    if isinstance(scenario, Scenario):
+        return scenario
+    if isinstance(scenario, dict):
+        return scenario_from_dict(scenario)
+    if isinstance(scenario, (str, os.PathLike)):
+        return load_scenario(scenario)
+    raise TypeError(f"scenario must be a Scenario, dict or path, not {type(scenario).__name__}")
+
+def _samplers(scenario):
+    return SAMPLERS if scenario is None else as_scenario(scenario).samplers
+
+def _normals(scenario):
+    return NORMALS if scenario is None else as_scenario(scenario).normals
+
+DEFAULT_SCENARIO = scenario_from_dict({"name": "default"})
+
+# -----------------------------------------------------------------------------
+# TV EXPOSURE MODEL
+# TV_Channel_A..E viewing (1..5 each, 5 = never) is drawn jointly from one
+# distribution over all 5^5 combinations. Exposed_Flag is then derived from it
+# (A<5 or B<5), or - for the forced exposed / control groups - the channels
+# are drawn straight from the distribution conditioned on being exposed /
+# control. Each case is one alias table, so no group needs retries or per-row
+# branching, whatever share of the population is naturally exposed.
+# -----------------------------------------------------------------------------
+TV_CHANNELS = "ABCDE"
+
+class ExposureModel:
+    """
+    Joint TV_Channel_A..E viewing distribution. Give either per-channel
+    weights ({"A": [w1..w5], ...}, missing channels uniform; channels are then
+    independent) or a full `joint` weight array of shape (5,5,5,5,5),
+    indexed [A-1, B-1, C-1, D-1, E-1].
+    """
+
+    def __init__(self, channel_weights=None, joint=None):
+        if joint is None:
+            channel_weights = channel_weights or {}
+            unknown = set(channel_weights) - set(TV_CHANNELS)
+            if unknown:
+                raise ValueError(f"unknown TV channels: {sorted(unknown)}")
+            joint = np.ones(())
+            for channel in TV_CHANNELS:
+                weights = np.asarray(channel_weights.get(channel, [1,1,1,1,1]), dtype=float)
+                if weights.shape != (5,):
+                    raise ValueError(f"channel {channel} needs 5 weights")
+                joint = np.multiply.outer(joint, weights)
+        joint = np.asarray(joint, dtype=float)
+        if joint.shape != (5,) * len(TV_CHANNELS):
+            raise ValueError("joint must have shape (5,5,5,5,5)")
+
+        exposed = np.zeros(joint.shape, dtype=bool)
+        exposed[:4] = True       # A < 5
+        exposed[:, :4] = True    # B < 5
+        cells = np.arange(joint.size)
+        self.weights = joint  # as given, so a manifest can rebuild the identical model
+        self.joint = joint / joint.sum()
+        self.exposed_share = float(self.joint[exposed].sum())
+        self._samplers = {
+            None: CategoricalSampler(cells, joint.ravel()),
+            True: self._conditional(cells[exposed.ravel()], joint[exposed]),
+            False: self._conditional(cells[~exposed.ravel()], joint[~exposed])
+        }
+
+    @staticmethod
+    def _conditional(cells, weights):
+        return CategoricalSampler(cells, weights) if weights.sum() > 0 else None
+
+    def __repr__(self):
+        return f"ExposureModel(exposed_share={self.exposed_share:.4f})"
+
+    def draw(self, rng, size=None, exposed=None):
+        """
+        Channel codes: shape (5,) for size=None, else (size, 5), columns A..E.
+        exposed=None draws from the full distribution (natural exposure);
+        True / False draw conditioned on being exposed / control; a boolean
+        array (one entry per row) mixes the two row by row.
+        """
+        if isinstance(exposed, np.ndarray):
+            cells = np.empty(len(exposed), dtype=np.int64)
+            for flag in (True, False):
+                rows = exposed == flag
+                if rows.any():
+                    cells[rows] = self._sampler(flag).draw(rng, int(rows.sum()))
+        else:
+            cells = self._sampler(exposed).draw(rng, size)
+        return np.stack(np.unravel_index(cells, self.joint.shape), axis=-1) + 1
+
+    def draw_share(self, rng, n, exposed_share):
+        """
+        n rows with exactly round(n * exposed_share) of them exposed, in
+        random order: channels plus the derived exposed flag.
+        """
+        if not 0 <= exposed_share <= 1:
+            raise ValueError("exposed_share must be between 0 and 1")
+        exposed = rng.permutation(n) < round(n * exposed_share)
+        return self.draw(rng, exposed=exposed), exposed
+
+    def _sampler(self, exposed):
+        sampler = self._samplers[exposed]
+        if sampler is None:
+            raise ValueError(f"this ExposureModel gives {'exposed' if exposed else 'control'} viewing zero weight")
+        return sampler
+
+def _exposed(channels):
+    """Exposed_Flag rule: channel A or channel B watched (< 5)."""
+    return (channels[..., 0] < 5) | (channels[..., 1] < 5)
+
+def _forced_exposure(force_exposed, force_control):
+    """ExposureModel.draw's `exposed` argument for a respondent group's force flags."""
+    if force_exposed and force_control:
+        raise ValueError("force_exposed and force_control are mutually exclusive")
+    return True if force_exposed else False if force_control else None
+
+def _classic_exposure_joint(exposed_share=0.96):
+    """
+    The classic generator's channel mix as a joint table: exposed cells follow
+    its 50/50 mixture of "A watched (<5), B any" and "B watched (<5), A any",
+    control cells (A = B = 5) are uniform, C/D/E are uniform throughout.
+    """
+    a_watched = np.outer([1,1,1,1,0], [1,1,1,1,1]) / 20
+    ab = exposed_share * (0.5*a_watched + 0.5*a_watched.T)
+    ab[4, 4] = 1 - exposed_share
+    return np.multiply.outer(ab, np.full((5, 5, 5), 1 / 125))
+
+# Default: the classic forced-exposed channel mix, 96% naturally exposed as
+# with uniform channels
+EXPOSURE = ExposureModel(joint=_classic_exposure_joint())
 
 # -----------------------------------------------------------------------------
 # DEMOGRAPHIC DISTRIBUTIONS (CANADIAN POPULATION PATTERNS)
 # -----------------------------------------------------------------------------
-def pick_gender():
+def pick_gender(rng=None, scenario=None):
     """
     A2_Gender:
     1 = Men (49%)
     2 = Women (50%)
     3 = Other (1%)
     """
-    return np.random.choice([1,2,3], p=[0.49,0.50,0.01])
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["gender"].draw(rng)
 
-def pick_age():
+def pick_age(rng=None, scenario=None):
     """
     A3_Age Groups (coded):
      1 = 18-24 (14.90%)
@@ -28,9 +553,9 @@ def pick_age():
      5 = 55-64 (15.99%)
      6 = 65+   (15.63%)
     """
-    age_probs = [0.1490, 0.1955, 0.1815, 0.1578, 0.1599, 0.1563]
-    age_probs = np.array(age_probs) / np.sum(age_probs)
-    return np.random.choice([1,2,3,4,5,6], p=age_probs)
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["age"].draw(rng)
 
 # Province mapping with realistic Canadian distribution
 PROVINCE_MAPPING = {
@@ -49,31 +574,28 @@ PROVINCE_MAPPING = {
     13:"Yukon"
 }
 
-def pick_province():
+def pick_province(rng=None, scenario=None):
     """
     A4_Province with approximate percentages (source-like):
       AB=10.20109, BC=13.27141, MB=3.0633, NB=2.0422, NL=1.0211, NWT=0.515,
       NS=2.0422, NU=0.515, ON=40.3143, PE=1.0211, QC=22.45239,
       SK=3.0633, YT=0.515
     """
-    prov_codes = list(PROVINCE_MAPPING.keys())
-    prov_probs = np.array([
-        10.20109, 13.27141, 3.0633, 2.0422, 1.0211,
-        0.515, 2.0422, 0.515, 40.3143, 1.0211,
-        22.45239, 3.0633, 0.515
-    ])
-    prov_probs = prov_probs / prov_probs.sum()
-    chosen = np.random.choice(prov_codes, p=prov_probs)
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    chosen = samplers["province"].draw(rng)
     return PROVINCE_MAPPING[chosen]
 
-def pick_community_type():
+def pick_community_type(rng=None, scenario=None):
     """
     D9_Community_Type:
     1 = Urban (70%)
     2 = Suburban (20%)
     3 = Rural (10%)
     """
-    return np.random.choice([1,2,3], p=[0.70,0.20,0.10])
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["community_type"].draw(rng)
 
 # -----------------------------------------------------------------------------
 # BRAND LIST FOR UNAIDED AWARENESS (B1) -- each ≤ 12 chars
@@ -111,24 +633,401 @@ C6_RESPONSES_LONGER = [
     "movie nights, and quick bites at home. It was quite convincing."
 ]
 
+class VerbatimGenerator:
+    """
+    Template-based open-ended answers. `templates` maps a tone (e.g.
+    "positive") to a list of templates whose {slot} placeholders take every
+    value listed in `slots`, e.g.
+        VerbatimGenerator({"positive": ["Loved the {thing}", "Great {thing}!"]},
+                          slots={"thing": ["music", "crunch", "colours"]})
+    Every expansion is built once, here, into `pool` (distinct strings, in
+    order of first appearance). Draws return integer indices into the pool,
+    so rows never build or copy strings: columns are gathers of shared pool
+    entries, or a Categorical over the pool (`dtype`). Each template of a
+    tone is equally likely, split evenly over its expansions.
+    """
+
+    def __init__(self, templates, slots=None):
+        slots = slots or {}
+        index = {}
+        self._samplers = {}
+        for tone, tone_templates in templates.items():
+            codes, weights = [], []
+            for template in tone_templates:
+                texts = self._expand(template, slots)
+                codes += [index.setdefault(text, len(index)) for text in texts]
+                weights += [1 / len(texts)] * len(texts)
+            self._samplers[tone] = CategoricalSampler(codes, weights)
+        self.pool = tuple(index)
+        self._texts = np.array(self.pool, dtype=object)
+        self.dtype = pd.CategoricalDtype(self.pool)
+
+    @staticmethod
+    def _expand(template, slots):
+        names = list(dict.fromkeys(name for _, name, _, _ in Formatter().parse(template) if name))
+        missing = [name for name in names if name not in slots]
+        if missing:
+            raise ValueError(f"template {template!r} uses undefined slots {missing}")
+        return [template.format(**dict(zip(names, values))) for values in product(*(slots[n] for n in names))]
+
+    def __repr__(self):
+        return f"VerbatimGenerator(tones={list(self._samplers)}, pool={len(self.pool)} strings)"
+
+    def draw(self, tone, rng, size=None):
+        """Pool indices of `size` answers in this tone (one int for size=None)."""
+        return self._samplers[tone].draw(rng, size)
+
+    def text(self, indices):
+        """The pooled strings for pool indices (an object array, or one str)."""
+        return self._texts[indices]
+
+# C6 answers: uniform over each list (positive / longer for C4≥4, neutral
+# otherwise) plus the fixed straight-liner answer for outliers
+C6_VERBATIMS = VerbatimGenerator({
+    "positive": C6_RESPONSES_POSITIVE,
+    "longer": C6_RESPONSES_LONGER,
+    "neutral": C6_RESPONSES_NEUTRAL_NEG,
+    "outlier": ["Average ad. Not much to say."]
+})
+
+# -----------------------------------------------------------------------------
+# QUESTIONNAIRE SCHEMA
+# One entry per output column, in output order. Each Question records:
+#   kind       - "int" (never missing), "code" (integer code, NaN when skipped),
+#                "float" (continuous), "text", "mask" (multi-select: bit j set
+#                = codes[j] chosen), "digits" (Likert grid, one decimal
+#                digit per item) or "ratings" (a 4-bit rating per aided
+#                brand, 0 = brand not rated); mask/digits/ratings hold 0
+#                when skipped
+#   codes      - the valid answer codes (None = free text / continuous)
+#   samplers   - SAMPLERS keys that drive the answer, if any
+#   asked_if   - skip/termination logic: which respondents reach the question
+#                ("all", "screened" = passed A1, "qualified" = passed A6,
+#                "completed", "exposed" = completed & Exposed_Flag=1)
+#   only_if    - extra (column, value) condition within that audience
+#   depends_on - columns whose answers feed into this one
+# The generators, the preallocated column plan (allocate_columns), the output
+# dtypes and validate_schema() are all derived from this single list.
+# -----------------------------------------------------------------------------
+Question = namedtuple(
+    "Question",
+    ["column", "kind", "codes", "samplers", "asked_if", "only_if", "depends_on"],
+    defaults=((), "all", None, ())
+)
+
+_LIKERT_5 = (1,2,3,4,5)
+C5_ITEMS = 6
+B2A_ITEMS = 8  # one per B2 option
+_TV_CHANNEL = Question("", "code", _LIKERT_5, (), "screened")
+_A6_ITEM = Question("", "code", _LIKERT_5, ("snack", "snack_not_never"), "screened")
+
+QUESTIONNAIRE = (
+    Question("respondent_id", "int", None),
+    Question("Completed", "int", (0,1)),
+    Question("Termination_Point", "text", ("A1","A6","MidSurvey","Completed"), ("termination_point",)),
+    Question("A1_purchased_snack", "int", (1,2,99)),
+    Question("A2_gender", "code", (1,2,3), ("gender",), "screened"),
+    Question("A3_age", "code", (1,2,3,4,5,6), ("age",), "screened"),
+    Question("A4_province", "text", tuple(PROVINCE_MAPPING.values()), ("province",), "screened"),
+    _TV_CHANNEL._replace(column="TV_Channel_A"),
+    _TV_CHANNEL._replace(column="TV_Channel_B"),
+    _TV_CHANNEL._replace(column="TV_Channel_C"),
+    _TV_CHANNEL._replace(column="TV_Channel_D"),
+    _TV_CHANNEL._replace(column="TV_Channel_E"),
+    _A6_ITEM._replace(column="A6_PotatoChips"),
+    _A6_ITEM._replace(column="A6_Popcorn"),
+    _A6_ITEM._replace(column="A6_Pretzels"),
+    _A6_ITEM._replace(column="A6_Chocolate"),
+    _A6_ITEM._replace(column="A6_GranolaBars"),
+    _A6_ITEM._replace(column="A6_FruitSlices"),
+    Question("Exposed_Flag", "code", (0,1), (), "screened", None, ("TV_Channel_A", "TV_Channel_B")),
+    Question("B1_Unaided_BrandAwareness", "mask", tuple(ALL_BRANDS), ("b1_num_brands",), "qualified", None,
+             ("Exposed_Flag", "A6_PotatoChips")),
+    Question("B2_Aided_BrandAwareness", "mask", (1,2,3,4,5,6,7,8), ("b2_num_selected",), "qualified"),
+    Question("B2a_Overall_Impression", "ratings", tuple(range(1,11)), (), "qualified", None,
+             ("B2_Aided_BrandAwareness",)),
+    Question("B3_Familiarity_BrandX", "code", _LIKERT_5, ("b3_exposed", "b3_control"), "qualified", None,
+             ("Exposed_Flag", "B1_Unaided_BrandAwareness")),
+    Question("B4_Consideration_BrandX", "code", _LIKERT_5, ("b4_exposed", "b4_control"), "qualified", None,
+             ("Exposed_Flag", "B1_Unaided_BrandAwareness", "B3_Familiarity_BrandX")),
+    Question("B5_Recommendation_BrandX", "code", tuple(range(1,11)), (), "qualified", None,
+             ("Exposed_Flag", "B4_Consideration_BrandX")),
+    Question("C1_Ad_Recall_Pre", "code", (1,2,3), ("c1_frequent_viewer", "c1_other"), "exposed", None,
+             ("TV_Channel_A", "TV_Channel_B")),
+    Question("C2_Ad_Source", "code", tuple(range(1,10)), (), "exposed", ("C1_Ad_Recall_Pre", 1),
+             ("C1_Ad_Recall_Pre",)),
+    Question("C3_Ad_Recall_Post", "code", (1,2,3), ("c3_not_recalled",), "exposed", None, ("C1_Ad_Recall_Pre",)),
+    Question("C4_Ad_Enjoyment", "code", _LIKERT_5, ("c4_positive", "c4_other"), "exposed", None,
+             ("B4_Consideration_BrandX", "C1_Ad_Recall_Pre")),
+    Question("C5_Ad_Attitudes", "digits", _LIKERT_5, ("attitude",), "exposed", None, ("C4_Ad_Enjoyment",)),
+    Question("C6_Key_Message_Unaided", "text", None, (), "exposed", None, ("C4_Ad_Enjoyment",)),
+    Question("C7_Key_Message_Aided", "code", (1,2,3,4,5,6,7), ("c7",), "exposed"),
+    Question("D1_Grocery_Shopper_Role", "code", (1,2,3), ("d1",), "completed"),
+    Question("D2_Snack_Purchase_Frequency", "code", (1,2,3,4,5,6), ("d2",), "completed", None,
+             ("D1_Grocery_Shopper_Role", "D7_Children")),
+    Question("D3_Weekly_Snack_Spend", "code", (1,2,3,4,5,6), ("d3",), "completed", None,
+             ("D1_Grocery_Shopper_Role", "D7_Children")),
+    Question("D4_Employment_Status", "code", (1,2,3,4,5,6,7,8), ("d4",), "completed"),
+    Question("D5_Education_Level", "code", _LIKERT_5, ("d5",), "completed"),
+    Question("D6_Marital_Status", "code", _LIKERT_5, ("d6",), "completed"),
+    Question("D7_Children", "code", (1,2), ("d7",), "completed"),
+    Question("D8_Children_Age", "mask", (1,2,3,4), ("d8_num_kids",), "completed", ("D7_Children", 1),
+             ("D7_Children",)),
+    Question("D9_Community_Type", "code", (1,2,3), ("community_type",), "completed"),
+    Question("D10_Household_Income", "code", (1,2,3,4,5,6,7), ("d10",), "completed"),
+    Question("Completion_Time", "float", None),
+)
+
+QUESTIONS = {q.column: q for q in QUESTIONNAIRE}
+RESPONDENT_COLUMNS = [q.column for q in QUESTIONNAIRE]
+A6_COLUMNS = [q.column for q in QUESTIONNAIRE if q.column.startswith("A6_")]
+TEXT_COLUMNS = {q.column for q in QUESTIONNAIRE if q.kind == "text"}
+# Answered by every respondent, terminated or not => integer columns
+ALWAYS_ANSWERED_COLUMNS = {q.column for q in QUESTIONNAIRE if q.kind == "int"}
+# Multi-select / grid columns: kept as integers while generating, formatted
+# to the "a, b, c" strings only on export (see format_multi_select)
+MULTI_SELECT_COLUMNS = [q.column for q in QUESTIONNAIRE if q.kind in ("mask", "digits", "ratings")]
+
+def _mask_dtype(q):
+    """Smallest unsigned int with a bit per option (int32 for a digit grid, uint32 for ratings)."""
+    if q.kind == "digits":
+        return np.int32
+    if q.kind == "ratings":
+        return np.uint32
+    return next(t for t in (np.uint8, np.uint16, np.uint32, np.uint64) if np.iinfo(t).bits >= len(q.codes))
+
+COLUMN_DTYPES = {
+    q.column: (
+        _mask_dtype(q) if q.column in MULTI_SELECT_COLUMNS else
+        {"int": np.int64, "code": np.float64, "float": np.float64, "text": object}[q.kind]
+    )
+    for q in QUESTIONNAIRE
+}
+# Compact output mode: fixed-category Categorical for coded text, nullable Int8
+# for answer codes, int8 flags and float32 times (free text and multi-select
+# columns keep their dtype)
+COMPACT_DTYPES = {
+    q.column: (
+        (np.int8 if q.codes else np.int64) if q.kind == "int" else
+        "Int8" if q.kind == "code" else
+        np.float32 if q.kind == "float" else
+        pd.CategoricalDtype(q.codes)
+    )
+    for q in QUESTIONNAIRE
+    if q.kind in ("int", "code", "float") or (q.kind == "text" and q.codes is not None)
+}
+# Free text drawn from a VerbatimGenerator is dictionary-encoded over its pool
+POOLED_TEXT = {"C6_Key_Message_Unaided": C6_VERBATIMS}
+COMPACT_DTYPES.update({name: generator.dtype for name, generator in POOLED_TEXT.items()})
+
+# Audiences reached at each termination point (plus "exposed" for exposed completes)
+REACHED_BY_TERMINATION = {
+    "A1": {"all"},
+    "A6": {"all", "screened"},
+    "MidSurvey": {"all", "screened", "qualified"},
+    "Completed": {"all", "screened", "qualified", "completed"},
+}
+
+def allocate_columns(n):
+    """
+    Preallocated columnar plan for n respondents: one array per schema column,
+    in output order, with the schema dtype and every skippable cell missing
+    (NaN, or 0 for multi-select columns).
+    """
+    columns = {}
+    for q in QUESTIONNAIRE:
+        dtype = COLUMN_DTYPES[q.column]
+        if q.kind in ("int", "mask", "digits", "ratings"):
+            columns[q.column] = np.zeros(n, dtype=dtype)
+        else:
+            columns[q.column] = np.full(n, np.nan, dtype=dtype)
+    return columns
+
+def compact_dtypes(df, verbatims=None):
+    """
+    Cast a generated DataFrame to COMPACT_DTYPES (roughly 1 byte per coded
+    cell). Pass the VerbatimGenerator used for C6 if it wasn't the default.
+    """
+    if verbatims is None:
+        return df.astype(COMPACT_DTYPES)
+    return df.astype({**COMPACT_DTYPES, "C6_Key_Message_Unaided": verbatims.dtype})
+
+def memory_per_row(df):
+    """Bytes per respondent, counting the string payloads of object columns."""
+    return df.memory_usage(index=False, deep=True).sum() / max(len(df), 1)
+
+def format_multi_select(df):
+    """
+    Export form of the multi-select columns: masks => "1, 3, 5" style
+    strings of the selected codes, digit grids => "5, 4, 4, 3, 5, 5",
+    ratings => "Brand X:8, Lay's:7"; 0 / NaN (not asked) => NaN. Each
+    distinct value is formatted once.
+    """
+    df = df.copy()
+    for name in MULTI_SELECT_COLUMNS:
+        q = QUESTIONS[name]
+        values = df[name].fillna(0).to_numpy(dtype=np.uint64)
+        uniques, inverse = np.unique(values, return_inverse=True)
+        if q.kind == "digits":
+            labels = [", ".join(str(v)) if v else "" for v in uniques.tolist()]
+        elif q.kind == "ratings":
+            labels = [
+                ", ".join(f"{AIDED_BRAND_NAMES[c]}:{v >> 4*(c-1) & 15}" for c in range(1, B2A_ITEMS+1) if v >> 4*(c-1) & 15)
+                for v in uniques.tolist()
+            ]
+        else:
+            labels = [", ".join(str(c) for j, c in enumerate(q.codes) if v >> j & 1) for v in uniques.tolist()]
+        labels = np.array([label or np.nan for label in labels], dtype=object)
+        df[name] = labels[inverse]
+    return df
+
+def _parse_multi_select(q, label):
+    """One format_multi_select string back to its integer form."""
+    tokens = label.split(", ")
+    if q.kind == "digits":
+        return int("".join(tokens))
+    if q.kind == "ratings":
+        brands = {name: c for c, name in AIDED_BRAND_NAMES.items()}
+        return sum(int(r) << 4*(brands[b]-1) for b, r in (t.rsplit(":", 1) for t in tokens))
+    codes = [str(c) for c in q.codes]
+    return sum(1 << codes.index(t) for t in tokens)
+
+def multi_select_values(series):
+    """
+    A multi-select column in its integer form (uint64 masks, digit grids or
+    packed ratings; 0 = not asked), whether the frame was generated with
+    masks=True or holds the exported strings. Strings are parsed once per
+    distinct value.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.fillna(0).to_numpy(dtype=np.uint64)
+    q = QUESTIONS[series.name]
+    row_codes, uniques = pd.factorize(series)
+    lookup = [_parse_multi_select(q, label) for label in uniques] + [0]  # factorize: -1 = missing
+    return np.array(lookup, dtype=np.uint64)[row_codes]
+
+def multi_select_matrix(series):
+    """
+    Respondent x option matrix of a multi-select column: bool for masks
+    (B1, B2, D8; one column per code), int8 for C5 (one column per item) and
+    B2a (one column per B2 brand, the 1–10 rating or 0 if not rated).
+    """
+    q = QUESTIONS[series.name]
+    values = multi_select_values(series)
+    if q.kind == "digits":
+        return (values[:, None] // 10 ** np.arange(C5_ITEMS, dtype=np.uint64)[::-1] % 10).astype(np.int8)
+    if q.kind == "ratings":
+        return (values[:, None] >> np.arange(0, 4*B2A_ITEMS, 4, dtype=np.uint64) & 15).astype(np.int8)
+    return _mask_bits(values, len(q.codes))
+
+def _finish_frame(df, compact, masks, verbatims=None):
+    """Output dtypes: integer masks (masks=True) or export strings, then compact."""
+    if masks:
+        df = df.fillna(dict.fromkeys(MULTI_SELECT_COLUMNS, 0))
+        df = df.astype({name: COLUMN_DTYPES[name] for name in MULTI_SELECT_COLUMNS})
+    else:
+        df = format_multi_select(df)
+    return compact_dtypes(df, verbatims) if compact else df
+
+def _blank_record(resp_id):
+    """Row dict with every question unanswered (NaN) except the id."""
+    record = dict.fromkeys(RESPONDENT_COLUMNS, np.nan)
+    record["respondent_id"] = resp_id
+    return record
+
+def validate_schema(df):
+    """
+    Check a generated DataFrame against QUESTIONNAIRE: column order, answer
+    codes, and skip/termination logic (answered exactly when reached).
+    Returns a list of problem descriptions; empty means the data is valid.
+    """
+    problems = []
+    if list(df.columns) != RESPONDENT_COLUMNS:
+        return ["columns do not match QUESTIONNAIRE order"]
+
+    # Works on both the default and the compact (Categorical / Int8) dtypes
+    tp = df["Termination_Point"].to_numpy(dtype=object)
+    exposed_complete = (tp == "Completed") & _equals(df["Exposed_Flag"], 1)
+    audience = {
+        level: np.isin(tp, [t for t, reached in REACHED_BY_TERMINATION.items() if level in reached])
+        for level in ("all", "screened", "qualified", "completed")
+    }
+    audience["exposed"] = exposed_complete
+
+    for q in QUESTIONNAIRE:
+        values = df[q.column]
+        as_ints = q.column in MULTI_SELECT_COLUMNS and pd.api.types.is_numeric_dtype(values)
+        if as_ints:
+            answered = values.fillna(0).to_numpy() != 0
+        else:
+            answered = values.notna().to_numpy()
+        asked = audience[q.asked_if]
+        if q.only_if is not None:
+            asked = asked & _equals(df[q.only_if[0]], q.only_if[1])
+        if (answered & ~asked).any():
+            problems.append(f"{q.column}: answered by {int((answered & ~asked).sum())} respondents who were not asked")
+        if (asked & ~answered).any():
+            problems.append(f"{q.column}: missing for {int((asked & ~answered).sum())} respondents who were asked")
+        if q.codes is not None and q.column in MULTI_SELECT_COLUMNS:
+            bad = answered & ~_valid_multi_select(q, values, as_ints)
+            if bad.any():
+                problems.append(f"{q.column}: {int(bad.sum())} answers outside {list(q.codes)}")
+        elif q.codes is not None:
+            bad = answered & ~values.isin(q.codes).to_numpy()
+            if bad.any():
+                problems.append(f"{q.column}: {int(bad.sum())} answers outside {list(q.codes)}")
+    return problems
+
+def _valid_multi_select(q, values, as_ints):
+    """Per-row check that a mask / digit grid only uses the question's codes."""
+    if not as_ints:
+        tokens = values.reset_index(drop=True).fillna("").astype(str).str.split(", ").explode()
+        if q.kind == "ratings":
+            pairs = tokens.str.rsplit(":", n=1)
+            ok = (pairs.str[0].isin(list(AIDED_BRAND_NAMES.values())) & pairs.str[-1].isin([str(c) for c in q.codes])
+                  | (tokens == ""))
+        else:
+            ok = tokens.isin([str(c) for c in q.codes]) | (tokens == "")
+        return ok.groupby(level=0).all().to_numpy()
+    values = values.fillna(0).to_numpy(dtype=np.uint64)
+    if q.kind == "mask":
+        return values >> np.uint64(len(q.codes)) == 0
+    if q.kind == "ratings":
+        nibbles = values[:, None] >> np.arange(0, 64, 4, dtype=np.uint64) & np.uint64(15)
+        return (np.isin(nibbles, q.codes) | (nibbles == 0)).all(axis=1) & (values >> np.uint64(4*B2A_ITEMS) == 0)
+    digits = values[:, None] // 10 ** np.arange(C5_ITEMS, dtype=np.uint64)[::-1] % 10
+    return np.isin(digits, q.codes).all(axis=1) & (values < 10 ** C5_ITEMS)
+
+def _equals(values, code):
+    """Boolean mask of values == code, with missing answers counted as False."""
+    return values.eq(code).to_numpy(dtype=bool, na_value=False)
+
 # -----------------------------------------------------------------------------
 # HELPER FUNCTIONS FOR RANDOM RESPONSE GENERATION
 # -----------------------------------------------------------------------------
-def simulate_completion_time(is_outlier=False):
+# Completion times in minutes, to 1 decimal. Clean completes fall inside
+# CLEAN_COMPLETION_TIME (bounds included); outlier times are rounded away from
+# it (down for speeders, up for stragglers), so they are strictly outside
+CLEAN_COMPLETION_TIME = (3, 45)
+OUTLIER_COMPLETION_TIMES = ((1, 3), (45, 60))
+
+def simulate_completion_time(is_outlier=False, rng=None):
     """
     Simulate survey completion time in minutes.
       - Normal: uniform(3,45)
-      - Outlier: uniform(1,3) or uniform(45,60)
+      - Outlier: uniform(1,3) or uniform(45,60), never 3.0 or 45.0
     """
+    rng = _as_generator(rng)
     if is_outlier:
-        if np.random.rand() < 0.5:
-            return round(np.random.uniform(1,3),1)
+        (fast_low, fast_high), (slow_low, slow_high) = OUTLIER_COMPLETION_TIMES
+        if rng.random() < 0.5:
+            return float(np.floor(rng.uniform(fast_low, fast_high) * 10) / 10)
         else:
-            return round(np.random.uniform(45,60),1)
+            return float(np.ceil(rng.uniform(slow_low, slow_high) * 10) / 10)
     else:
-        return round(np.random.uniform(3,45),1)
+        return round(rng.uniform(*CLEAN_COMPLETION_TIME),1)
 
-def simulate_snack_response(avoid_all_never=False):
+def simulate_snack_response(avoid_all_never=False, rng=None, scenario=None):
     """
     A6 Snack consumption scale:
       1 = Daily
@@ -138,90 +1037,84 @@ def simulate_snack_response(avoid_all_never=False):
       5 = Never
     If avoid_all_never=True, the probability of 'Never'=0 for that single item.
     """
-    probs = np.array([0.15, 0.25, 0.30, 0.20, 0.10])
-    if avoid_all_never:
-        probs[-1] = 0.0
-        probs /= probs.sum()
-    return np.random.choice([1,2,3,4,5], p=probs)
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["snack_not_never" if avoid_all_never else "snack"].draw(rng)
 
-def simulate_b1_unaided_brands(is_exposed=False, frequent_chip_eater=False):
+def simulate_b1_unaided_brands(is_exposed=False, frequent_chip_eater=False, rng=None, scenario=None):
     """
     B1: Up to 3 brand mentions from the brand list (≤12 chars each).
     - If is_exposed => higher chance to include 'BrandX'
     - If frequent_chip_eater => higher chance to include top chip brands
+    Returns a bitmask over ALL_BRANDS (bit j set => ALL_BRANDS[j] mentioned).
+    Same draw as sample_b1_brands: distinct brands, no retries.
     """
-    num_brands = np.random.choice([1,2,3], p=[0.4,0.4,0.2])
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    num_brands = samplers["b1_num_brands"].draw(rng)
     chosen = []
 
     # Increase chance BrandX if is_exposed
-    if is_exposed and np.random.rand()<0.60:
-        chosen.append("BrandX")
-
-    # Weighted approach for frequent chip eaters
-    popular_brands = ["Lays","Pringles","Ruffles","Doritos","Cheetos","BrandX"]
-    needed = num_brands - len(chosen)
-    if needed<0:
-        needed=0
-
-    for _ in range(needed):
-        if frequent_chip_eater and np.random.rand()<0.50:
-            chosen.append(np.random.choice(popular_brands))
-        else:
-            chosen.append(np.random.choice(ALL_BRANDS))
-
-    # Remove duplicates if any, but keep the count to num_brands
-    chosen = list(set(chosen))
-    while len(chosen)<num_brands:
-        chosen.append(np.random.choice(ALL_BRANDS))
-
-    np.random.shuffle(chosen)
-    return ", ".join(chosen[:num_brands])
-
-def simulate_aided_awareness():
+    if is_exposed and rng.random()<0.60:
+        chosen.append(BRANDX_INDEX)
+
+    # Weighted approach for frequent chip eaters; each mention is drawn from
+    # the brands not mentioned yet (inverse CDF stepping over the taken ones)
+    weights = B1_BRAND_WEIGHTS[int(bool(frequent_chip_eater))]
+    starts = _B1_BRAND_STARTS[int(bool(frequent_chip_eater))]
+    for _ in range(num_brands - len(chosen)):
+        point = rng.random() * (1.0 - sum(weights[j] for j in chosen))
+        for j in sorted(chosen):
+            if point >= starts[j]:
+                point += weights[j]
+        chosen.append(int(np.searchsorted(starts, point, side="right")) - 1)
+
+    return sum(1 << j for j in chosen)
+
+def simulate_aided_awareness(rng=None, scenario=None):
     """
     B2: Aided brand awareness from among:
       1=BrandX, 2=Lays, 3=Pringles, 4=Ruffles, 5=Utz, 6=Kettle Brand, 7=Herr's, 8=Other
     Typically pick 2–4.
-    Returns a string like "1, 3, 5".
+    Returns a bitmask: bit c-1 set => code c selected (e.g. 0b10101 for "1, 3, 5").
     """
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
     options = [1,2,3,4,5,6,7]
-    num_selected = np.random.choice([2,3,4], p=[0.3,0.5,0.2])
-    sel = list(np.random.choice(options, size=num_selected, replace=False))
-    if np.random.rand()<0.1:
+    num_selected = samplers["b2_num_selected"].draw(rng)
+    sel = list(rng.choice(options, size=num_selected, replace=False))
+    if rng.random()<0.1:
         sel.append(8)  # "Other"
-    sel.sort()
-    return ", ".join(map(str, sel))
+    return sum(1 << (c-1) for c in sel)
 
-def simulate_overall_impression(aided_str):
+def simulate_overall_impression(aided_mask, rng=None):
     """
-    B2a: For each brand selected in B2, generate a 1–10 slider rating.
-    E.g. "Brand X:8, Lay's:7"
+    B2a: For each brand selected in the B2 bitmask, generate a 1–10 slider rating.
+    Returns the ratings packed 4 bits per brand (bits 4(c-1).. for code c,
+    0 = not rated); exported as e.g. "Brand X:8, Lay's:7".
     """
-    mapping = {
-        1:"Brand X", 2:"Lay's", 3:"Pringles", 4:"Ruffles",
-        5:"Utz", 6:"Kettle Brand", 7:"Herr's", 8:"Other"
-    }
-    if not aided_str:
-        return ""
-    codes = [int(x.strip()) for x in aided_str.split(",")]
-    results=[]
-    for c in codes:
-        r = int(np.round(np.random.uniform(1,10)))
-        results.append(f"{mapping[c]}:{r}")
-    return ", ".join(results)
-
-def simulate_attitude():
+    rng = _as_generator(rng)
+    packed = 0
+    for c in range(1, B2A_ITEMS+1):
+        if aided_mask >> (c-1) & 1:
+            r = int(np.round(rng.uniform(1,10)))
+            packed |= r << 4*(c-1)
+    return packed
+
+def simulate_attitude(rng=None, scenario=None):
     """
     Returns a 1–5 Likert with mild positive skew:
       5=40%, 4=35%, 3=10%, 2=10%, 1=5%
     Used for C5 (Ad attitudes) or other agreement scales.
     """
-    return np.random.choice([1,2,3,4,5], p=[0.05,0.10,0.10,0.35,0.40])
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["attitude"].draw(rng)
 
 # -----------------------------------------------------------------------------
 # CORRELATED BRAND X RATINGS (B3, B4, B5)
 # -----------------------------------------------------------------------------
-def adjust_brandx_ratings(b3, b4, b5, brandx_in_b1=False, is_exposed=False):
+def adjust_brandx_ratings(b3, b4, b5, brandx_in_b1=False, is_exposed=False, rng=None, effect=1.0):
     """
     B3 & B4 in 1..5 scale, B5 in 1..10 scale.
     Nudges them so:
@@ -229,7 +1122,10 @@ def adjust_brandx_ratings(b3, b4, b5, brandx_in_b1=False, is_exposed=False):
       - If brandx_in_b1 => push them up a bit
       - If is_exposed => also push them up
       - B5 is correlated with B4 (if B4 is 5 => B5 ~8..10)
+    `effect` scales the exposure nudges (1 = as designed, 0 = none; see
+    EXPOSURE_EFFECT).
     """
+    rng = _as_generator(rng)
     # Ensure B4 >= B3
     if b4 < b3:
         b4 = b3
@@ -241,9 +1137,9 @@ def adjust_brandx_ratings(b3, b4, b5, brandx_in_b1=False, is_exposed=False):
 
     # If exposed => random bump
     if is_exposed:
-        if b3 < 5 and np.random.rand()<0.5:
+        if b3 < 5 and rng.random()<0.5*effect:
             b3 += 1
-        if b4 < 5 and np.random.rand()<0.5:
+        if b4 < 5 and rng.random()<0.5*effect:
             b4 += 1
 
     # Re-check
@@ -254,13 +1150,96 @@ def adjust_brandx_ratings(b3, b4, b5, brandx_in_b1=False, is_exposed=False):
     center_map = {1:2, 2:4, 3:6, 4:8, 5:9}
     center = center_map[b4]
     if is_exposed:
-        center += 0.5
-    val = np.clip(np.random.normal(loc=center, scale=1.0), 1, 10)
+        center += 0.5*effect
+    val = np.clip(rng.normal(loc=center, scale=1.0), 1, 10)
     new_b5 = int(round((b5 + val)/2.0))  # average old b5 with the new random
     new_b5 = max(1, min(10, new_b5))
 
     return b3, b4, new_b5
 
+B5_CENTER_BY_B4 = np.array([0, 2, 4, 6, 8, 9])  # index = B4 (1..5)
+
+def adjust_brandx_ratings_batch(b3, b4, b5, brandx_in_b1, is_exposed, rng=None, effect=1.0):
+    """
+    Array version of adjust_brandx_ratings: same nudges applied with masks.
+    b3, b4, b5 are integer arrays; brandx_in_b1 and is_exposed are boolean
+    masks (or scalars broadcast to every row). Returns new (b3, b4, b5) arrays.
+    """
+    rng = _as_generator(rng)
+    b3 = np.asarray(b3, dtype=np.int64)
+    b4 = np.maximum(np.asarray(b4, dtype=np.int64), b3)
+    n = len(b3)
+    brandx_in_b1 = np.broadcast_to(np.asarray(brandx_in_b1, dtype=bool), (n,))
+    is_exposed = np.broadcast_to(np.asarray(is_exposed, dtype=bool), (n,))
+
+    # If brandX mentioned => small bump
+    b3 = b3 + (brandx_in_b1 & (b3<5))
+    b4 = b4 + (brandx_in_b1 & (b4<5))
+
+    # If exposed => random bump
+    b3 = b3 + (is_exposed & (b3<5) & (rng.random(n)<0.5*effect))
+    b4 = b4 + (is_exposed & (b4<5) & (rng.random(n)<0.5*effect))
+
+    # Re-check
+    b4 = np.maximum(b4, b3)
+
+    # B5 ~ around a center for each B4
+    center = B5_CENTER_BY_B4[b4] + 0.5*effect*is_exposed
+    val = np.clip(rng.normal(loc=center, scale=1.0), 1, 10)
+    new_b5 = np.clip(np.round((np.asarray(b5) + val)/2.0).astype(np.int64), 1, 10)
+
+    return b3, b4, new_b5
+
+# -----------------------------------------------------------------------------
+# EXPOSURE EFFECT SIZE
+# One knob for how strongly ad exposure moves the brand metrics. It scales
+# every exposed-vs-control gap the simulator builds in: the 60% BrandX first
+# mention in B1, the exposed B3/B4 skews and B5 mean/spread (interpolated
+# between the control and exposed settings) and the random bumps / B5 centre
+# shift in adjust_brandx_ratings. 1 reproduces the default draws exactly, 0
+# makes exposed and control statistically identical, 2 doubles the gaps.
+# -----------------------------------------------------------------------------
+EXPOSURE_EFFECT = 1.0
+MAX_EXPOSURE_EFFECT = 2.0
+
+def _check_effect(effect):
+    if not 0 <= effect <= MAX_EXPOSURE_EFFECT:
+        raise ValueError(f"effect must be between 0 and {MAX_EXPOSURE_EFFECT}, got {effect}")
+
+def exposed_rating_samplers(effect=EXPOSURE_EFFECT, scenario=None):
+    """
+    (b3, b4) samplers for exposed respondents at this effect size: the
+    control weights plus `effect` times the exposed - control gap (negative
+    weights clipped). effect=1 returns the scenario's own tables.
+    """
+    return _exposed_rating_samplers(float(effect), as_scenario(scenario))
+
+# Bounded: power sweeps and arbitrary user effects would otherwise keep every
+# (effect, scenario) pair - and every Scenario - alive
+@lru_cache(maxsize=256)
+def _exposed_rating_samplers(effect, scenario):
+    _check_effect(effect)
+    samplers = scenario.samplers
+    if effect == 1:
+        return samplers["b3_exposed"], samplers["b4_exposed"]
+    return tuple(
+        CategoricalSampler(
+            samplers[f"{item}_control"].codes,
+            np.clip(
+                samplers[f"{item}_control"].probs
+                + effect*(samplers[f"{item}_exposed"].probs - samplers[f"{item}_control"].probs),
+                0, None
+            )
+        )
+        for item in ("b3", "b4")
+    )
+
+def b5_exposed_normal(effect=EXPOSURE_EFFECT, scenario=None):
+    """(mean, sd) of the preliminary exposed B5 draw at this effect size."""
+    normals = _normals(scenario)
+    (mean, sd), (control_mean, control_sd) = normals["b5_exposed"], normals["b5_control"]
+    return control_mean + effect*(mean - control_mean), control_sd + effect*(sd - control_sd)
+
 # -----------------------------------------------------------------------------
 # SECTION C (Ad Perceptions) CORRELATIONS:
 #  - If Exposed, fill out. If not, everything = NaN.
@@ -271,263 +1250,163 @@ def adjust_brandx_ratings(b3, b4, b5, brandx_in_b1=False, is_exposed=False):
 # -----------------------------------------------------------------------------
 # TERMINATION SIMULATION
 # -----------------------------------------------------------------------------
-def simulate_terminated_respondent(resp_id):
+def simulate_terminated_respondent(resp_id, rng=None, profile=None, exposure=None, scenario=None):
     """
     Creates a partially complete / terminated record with one of three scenarios:
       1) A1 Termination (didn't purchase snack => everything else NaN)
       2) A6 Termination (all 'Never' => end)
       3) MidSurvey Termination (some B but no C or D)
-    We do NOT force channels for terminated (they do not count towards the final 500/500 distribution).
+    We do NOT force channels for terminated (they do not count towards the final 500/500
+    distribution): they come unconditioned from `exposure` (default EXPOSURE).
+    Distributions come from `scenario` (default SAMPLERS / NORMALS).
+    Pass a SurveyProfile as `profile` to time it (section "termination").
     """
-    termination_types = ["A1","A6","MidSurvey"]
-    tp = np.random.choice(termination_types, p=[0.3,0.4,0.3])
+    scenario = as_scenario(scenario)
+    rng, lap = _profiling(rng, profile, "terminated")
+    samplers = scenario.samplers
+    tp = samplers["termination_point"].draw(rng)
+
+    record = _blank_record(resp_id)
+    record["Completed"] = 0
+    record["Termination_Point"] = tp
+    record["A1_purchased_snack"] = 1
 
     if tp=="A1":
         # Fail at screening => A1 not 1 => everything else is NaN
-        return {
-            "respondent_id": resp_id,
-            "Completed": 0,
-            "Termination_Point": "A1",
-            "A1_purchased_snack": np.random.choice([2,99]),
-            "A2_gender": np.nan,
-            "A3_age": np.nan,
-            "A4_province": np.nan,
-            "TV_Channel_A": np.nan,
-            "TV_Channel_B": np.nan,
-            "TV_Channel_C": np.nan,
-            "TV_Channel_D": np.nan,
-            "TV_Channel_E": np.nan,
-            "A6_PotatoChips": np.nan,
-            "A6_Popcorn": np.nan,
-            "A6_Pretzels": np.nan,
-            "A6_Chocolate": np.nan,
-            "A6_GranolaBars": np.nan,
-            "A6_FruitSlices": np.nan,
-            "Exposed_Flag": np.nan,
-            "B1_Unaided_BrandAwareness": np.nan,
-            "B2_Aided_BrandAwareness": np.nan,
-            "B2a_Overall_Impression": np.nan,
-            "B3_Familiarity_BrandX": np.nan,
-            "B4_Consideration_BrandX": np.nan,
-            "B5_Recommendation_BrandX": np.nan,
-            "C1_Ad_Recall_Pre": np.nan,
-            "C2_Ad_Source": np.nan,
-            "C3_Ad_Recall_Post": np.nan,
-            "C4_Ad_Enjoyment": np.nan,
-            "C5_Ad_Attitudes": np.nan,
-            "C6_Key_Message_Unaided": np.nan,
-            "C7_Key_Message_Aided": np.nan,
-            "D1_Grocery_Shopper_Role": np.nan,
-            "D2_Snack_Purchase_Frequency": np.nan,
-            "D3_Weekly_Snack_Spend": np.nan,
-            "D4_Employment_Status": np.nan,
-            "D5_Education_Level": np.nan,
-            "D6_Marital_Status": np.nan,
-            "D7_Children": np.nan,
-            "D8_Children_Age": np.nan,
-            "D9_Community_Type": np.nan,
-            "D10_Household_Income": np.nan,
-            "Completion_Time": simulate_completion_time(False)
-        }
+        record["A1_purchased_snack"] = rng.choice([2,99])
+        record["Completion_Time"] = simulate_completion_time(False, rng=rng)
+        lap("termination")
+        return record
 
-    elif tp=="A6":
-        # A1=1 => but then A6 => all 'Never' => termination
-        return {
-            "respondent_id": resp_id,
-            "Completed": 0,
-            "Termination_Point": "A6",
-            "A1_purchased_snack": 1,
-            "A2_gender": pick_gender(),
-            "A3_age": pick_age(),
-            "A4_province": pick_province(),
-            "TV_Channel_A": np.random.choice([1,2,3,4,5]),
-            "TV_Channel_B": np.random.choice([1,2,3,4,5]),
-            "TV_Channel_C": np.random.choice([1,2,3,4,5]),
-            "TV_Channel_D": np.random.choice([1,2,3,4,5]),
-            "TV_Channel_E": np.random.choice([1,2,3,4,5]),
-            "A6_PotatoChips":5,
-            "A6_Popcorn":5,
-            "A6_Pretzels":5,
-            "A6_Chocolate":5,
-            "A6_GranolaBars":5,
-            "A6_FruitSlices":5,
-            # We randomize Exposed_Flag but they don't actually continue
-            "Exposed_Flag": np.random.choice([0,1]),
-            "B1_Unaided_BrandAwareness": np.nan,
-            "B2_Aided_BrandAwareness": np.nan,
-            "B2a_Overall_Impression": np.nan,
-            "B3_Familiarity_BrandX": np.nan,
-            "B4_Consideration_BrandX": np.nan,
-            "B5_Recommendation_BrandX": np.nan,
-            "C1_Ad_Recall_Pre": np.nan,
-            "C2_Ad_Source": np.nan,
-            "C3_Ad_Recall_Post": np.nan,
-            "C4_Ad_Enjoyment": np.nan,
-            "C5_Ad_Attitudes": np.nan,
-            "C6_Key_Message_Unaided": np.nan,
-            "C7_Key_Message_Aided": np.nan,
-            "D1_Grocery_Shopper_Role": np.nan,
-            "D2_Snack_Purchase_Frequency": np.nan,
-            "D3_Weekly_Snack_Spend": np.nan,
-            "D4_Employment_Status": np.nan,
-            "D5_Education_Level": np.nan,
-            "D6_Marital_Status": np.nan,
-            "D7_Children": np.nan,
-            "D8_Children_Age": np.nan,
-            "D9_Community_Type": np.nan,
-            "D10_Household_Income": np.nan,
-            "Completion_Time": simulate_completion_time(False)
-        }
+    # A6 and MidSurvey both answer the screener block
+    record["A2_gender"] = pick_gender(rng=rng, scenario=scenario)
+    record["A3_age"] = pick_age(rng=rng, scenario=scenario)
+    record["A4_province"] = pick_province(rng=rng, scenario=scenario)
 
-    else:  # MidSurvey
-        # partial brand metrics in B, no C or D
-        A2 = pick_gender()
-        A3 = pick_age()
-        A4 = pick_province()
-
-        # A6 => not all never
-        snack_items = [simulate_snack_response(True) for _ in range(6)]
-        B1 = simulate_b1_unaided_brands(is_exposed=False, frequent_chip_eater=(snack_items[0] in [1,2]))
-        B2 = simulate_aided_awareness()
-        B2a = simulate_overall_impression(B2)
-        B3 = np.random.choice([1,2,3,4,5], p=[0.05,0.15,0.20,0.35,0.25])
-        B4 = np.random.choice([1,2,3,4,5], p=[0.05,0.15,0.20,0.35,0.25])
-        B5 = int(np.clip(np.random.normal(6,1.8),1,10))
-        # Adjust for correlation
-        B3, B4, B5 = adjust_brandx_ratings(
-            b3=B3, b4=B4, b5=B5,
-            brandx_in_b1=("BrandX" in B1),
-            is_exposed=False
-        )
+    if tp=="A6":
+        # A1=1 => but then A6 => all 'Never' => termination
+        for channel, code in zip(TV_CHANNELS, (exposure or EXPOSURE).draw(rng).tolist()):
+            record[f"TV_Channel_{channel}"] = code
+        for name in A6_COLUMNS:
+            record[name] = 5
+        # We randomize Exposed_Flag but they don't actually continue
+        record["Exposed_Flag"] = rng.choice([0,1])
+        record["Completion_Time"] = simulate_completion_time(False, rng=rng)
+        lap("termination")
+        return record
+
+    # MidSurvey => partial brand metrics in B, no C or D
+    # A6 => not all never
+    snack_items = [simulate_snack_response(True, rng=rng, scenario=scenario) for _ in range(6)]
+    B1 = simulate_b1_unaided_brands(
+        is_exposed=False, frequent_chip_eater=(snack_items[0] in [1,2]), rng=rng, scenario=scenario
+    )
+    B2 = simulate_aided_awareness(rng=rng, scenario=scenario)
+    B2a = simulate_overall_impression(B2, rng=rng)
+    B3 = samplers["b3_control"].draw(rng)
+    B4 = samplers["b4_control"].draw(rng)
+    B5 = int(np.clip(rng.normal(*scenario.normals["b5_control"]),1,10))
+    # Adjust for correlation
+    B3, B4, B5 = adjust_brandx_ratings(
+        b3=B3, b4=B4, b5=B5,
+        brandx_in_b1=bool(B1 >> BRANDX_INDEX & 1),
+        is_exposed=False,
+        rng=rng
+    )
 
-        return {
-            "respondent_id": resp_id,
-            "Completed": 0,
-            "Termination_Point": "MidSurvey",
-            "A1_purchased_snack": 1,
-            "A2_gender": A2,
-            "A3_age": A3,
-            "A4_province": A4,
-            "TV_Channel_A": np.random.choice([1,2,3,4,5]),
-            "TV_Channel_B": np.random.choice([1,2,3,4,5]),
-            "TV_Channel_C": np.random.choice([1,2,3,4,5]),
-            "TV_Channel_D": np.random.choice([1,2,3,4,5]),
-            "TV_Channel_E": np.random.choice([1,2,3,4,5]),
-            "A6_PotatoChips": snack_items[0],
-            "A6_Popcorn": snack_items[1],
-            "A6_Pretzels": snack_items[2],
-            "A6_Chocolate": snack_items[3],
-            "A6_GranolaBars": snack_items[4],
-            "A6_FruitSlices": snack_items[5],
-            "Exposed_Flag": np.random.choice([0,1]),
-            "B1_Unaided_BrandAwareness": B1,
-            "B2_Aided_BrandAwareness": B2,
-            "B2a_Overall_Impression": B2a,
-            "B3_Familiarity_BrandX": B3,
-            "B4_Consideration_BrandX": B4,
-            "B5_Recommendation_BrandX": B5,
-            "C1_Ad_Recall_Pre": np.nan,
-            "C2_Ad_Source": np.nan,
-            "C3_Ad_Recall_Post": np.nan,
-            "C4_Ad_Enjoyment": np.nan,
-            "C5_Ad_Attitudes": np.nan,
-            "C6_Key_Message_Unaided": np.nan,
-            "C7_Key_Message_Aided": np.nan,
-            "D1_Grocery_Shopper_Role": np.nan,
-            "D2_Snack_Purchase_Frequency": np.nan,
-            "D3_Weekly_Snack_Spend": np.nan,
-            "D4_Employment_Status": np.nan,
-            "D5_Education_Level": np.nan,
-            "D6_Marital_Status": np.nan,
-            "D7_Children": np.nan,
-            "D8_Children_Age": np.nan,
-            "D9_Community_Type": np.nan,
-            "D10_Household_Income": np.nan,
-            "Completion_Time": simulate_completion_time(False)
-        }
+    for channel, code in zip(TV_CHANNELS, (exposure or EXPOSURE).draw(rng).tolist()):
+        record[f"TV_Channel_{channel}"] = code
+    record.update(zip(A6_COLUMNS, snack_items))
+    record["Exposed_Flag"] = rng.choice([0,1])
+    record["B1_Unaided_BrandAwareness"] = B1
+    record["B2_Aided_BrandAwareness"] = B2
+    record["B2a_Overall_Impression"] = B2a
+    record["B3_Familiarity_BrandX"] = B3
+    record["B4_Consideration_BrandX"] = B4
+    record["B5_Recommendation_BrandX"] = B5
+    record["Completion_Time"] = simulate_completion_time(False, rng=rng)
+    lap("termination")
+    return record
 
 # -----------------------------------------------------------------------------
 # COMPLETE RESPONDENTS, WITH NEW EXPOSED-FLAG LOGIC:
 # EXPOSED GROUP = (Channel A<5 OR Channel B<5)
 # CONTROL GROUP = (Channel A=5 AND Channel B=5)
 #
-# We'll explicitly force the channel usage for the 500 Exposed and 500 Control.
-# Then we derive Exposed_Flag from those channels.
+# We'll explicitly force the channel usage for the 500 Exposed and 500 Control
+# (drawing from the exposure model conditioned on the group), or let the
+# model decide for unforced respondents. Then we derive Exposed_Flag from
+# those channels.
 # Outliers also forced similarly but with suspicious rating patterns and times.
 # -----------------------------------------------------------------------------
 def simulate_complete_respondent(
     resp_id,
     force_exposed=False,
     force_control=False,
-    outlier=False
+    outlier=False,
+    rng=None,
+    profile=None,
+    exposure=None,
+    verbatims=None,
+    scenario=None
 ):
     """
     Creates a *complete* record with the following logic:
-      - If force_exposed=True => ensure (TV_Channel_A <5) OR (TV_Channel_B <5).
-      - If force_control=True => ensure (TV_Channel_A=5) AND (TV_Channel_B=5).
-      - We'll set the other channels (C,D,E) randomly.
+      - TV channels A..E are drawn jointly from `exposure` (an ExposureModel,
+        default EXPOSURE):
+          force_exposed=True => conditioned on (TV_Channel_A <5) OR (TV_Channel_B <5)
+          force_control=True => conditioned on (TV_Channel_A=5) AND (TV_Channel_B=5)
+          neither => unconditioned (natural exposure)
       - Then we DERIVE Exposed_Flag from those channels:
            Exposed_Flag=1 if (A<5 or B<5) else 0
       - We fill out A6, B1..B5, optionally C1..C7 if Exposed_Flag=1,
         plus D1..D10. Also handle outliers (straight-line ratings, extreme times).
+      - C6 verbatims come from `verbatims` (a VerbatimGenerator with
+        positive / longer / neutral / outlier tones, default C6_VERBATIMS).
+      - Every weighted draw (and the B5 normals) comes from `scenario` (a
+        Scenario, profile dict or profile file; default SAMPLERS / NORMALS).
+    Pass a SurveyProfile as `profile` to time each questionnaire section.
     """
+    forced = _forced_exposure(force_exposed, force_control)
+    verbatims = verbatims or C6_VERBATIMS
+    scenario = as_scenario(scenario)
+    rng, lap = _profiling(rng, profile, "complete")
+    samplers, normals = scenario.samplers, scenario.normals
+
     # Section A1 = 1 to pass screening
     A1 = 1
-    A2 = pick_gender()
-    A3 = pick_age()
-    A4 = pick_province()
-
-    # Force channels for group membership:
-    # (We want exactly 500 forced-exposed completes and 500 forced-control completes.)
-    if force_exposed:
-        # ensure at least one of (A,B) is <5
-        if np.random.rand()<0.5:
-            TV_Channel_A = np.random.choice([1,2,3,4])  # definitely <5
-            TV_Channel_B = np.random.choice([1,2,3,4,5])  # random
-        else:
-            TV_Channel_B = np.random.choice([1,2,3,4])
-            TV_Channel_A = np.random.choice([1,2,3,4,5])
-    elif force_control:
-        # must have both (A,B)=5
-        TV_Channel_A = 5
-        TV_Channel_B = 5
-    else:
-        raise ValueError(
-            "simulate_complete_respondent requires either force_exposed or force_control!"
-        )
-
-    # Channels C, D, E => random
-    def random_tv_channel():
-        return np.random.choice([1,2,3,4,5])
+    A2 = pick_gender(rng=rng, scenario=scenario)
+    A3 = pick_age(rng=rng, scenario=scenario)
+    A4 = pick_province(rng=rng, scenario=scenario)
 
-    TV_Channel_C = random_tv_channel()
-    TV_Channel_D = random_tv_channel()
-    TV_Channel_E = random_tv_channel()
+    # Channels for group membership (forced groups draw from the conditional)
+    channels = (exposure or EXPOSURE).draw(rng, exposed=forced)
+    TV_Channel_A, TV_Channel_B, TV_Channel_C, TV_Channel_D, TV_Channel_E = channels.tolist()
 
     # Derive Exposed_Flag from channels:
     # if (A<5 or B<5) => Exposed=1, else 0
-    if (TV_Channel_A<5) or (TV_Channel_B<5):
-        derived_exposed_flag = 1
-    else:
-        derived_exposed_flag = 0
+    derived_exposed_flag = int(_exposed(channels))
 
     # A6 => 6 snack items (make sure not all never)
-    snacks = [simulate_snack_response(True) for _ in range(6)]
+    snacks = [simulate_snack_response(True, rng=rng, scenario=scenario) for _ in range(6)]
     if all(x==5 for x in snacks):
         # override at least one
-        snacks[0] = np.random.choice([1,2,3,4])
+        snacks[0] = rng.choice([1,2,3,4])
+    lap("A_screening")
 
     # B1 => brand awareness open-ended
     # We'll call them "is_exposed" if derived_exposed_flag=1 to nudge BrandX
     frequent_chip_eater = (snacks[0] in [1,2])  # daily or 2-3x/wk for potato chips
     B1 = simulate_b1_unaided_brands(
         is_exposed=(derived_exposed_flag==1),
-        frequent_chip_eater=frequent_chip_eater
+        frequent_chip_eater=frequent_chip_eater,
+        rng=rng,
+        scenario=scenario
     )
 
     # B2 => aided awareness
-    B2 = simulate_aided_awareness()
-    B2a = simulate_overall_impression(B2)
+    B2 = simulate_aided_awareness(rng=rng, scenario=scenario)
+    B2a = simulate_overall_impression(B2, rng=rng)
 
     # Preliminary B3,B4,B5
     if outlier:
@@ -536,22 +1415,24 @@ def simulate_complete_respondent(
     else:
         if derived_exposed_flag==1:
             # distribution skewed more positive
-            B3 = np.random.choice([1,2,3,4,5], p=[0.02,0.08,0.15,0.35,0.40])
-            B4 = np.random.choice([1,2,3,4,5], p=[0.02,0.08,0.15,0.30,0.45])
-            B5 = int(np.clip(np.random.normal(8,1.5),1,10))
+            B3 = samplers["b3_exposed"].draw(rng)
+            B4 = samplers["b4_exposed"].draw(rng)
+            B5 = int(np.clip(rng.normal(*normals["b5_exposed"]),1,10))
         else:
             # balanced distribution
-            B3 = np.random.choice([1,2,3,4,5], p=[0.05,0.15,0.20,0.35,0.25])
-            B4 = np.random.choice([1,2,3,4,5], p=[0.05,0.15,0.20,0.35,0.25])
-            B5 = int(np.clip(np.random.normal(6,1.8),1,10))
+            B3 = samplers["b3_control"].draw(rng)
+            B4 = samplers["b4_control"].draw(rng)
+            B5 = int(np.clip(rng.normal(*normals["b5_control"]),1,10))
 
     # Correlate B3,B4,B5 with mention of BrandX in B1 & Exposed_Flag
-    brandx_in_b1 = ("BrandX" in B1.split(", "))
+    brandx_in_b1 = bool(B1 >> BRANDX_INDEX & 1)
     B3, B4, B5 = adjust_brandx_ratings(
         b3=B3, b4=B4, b5=B5,
         brandx_in_b1=brandx_in_b1,
-        is_exposed=(derived_exposed_flag==1)
+        is_exposed=(derived_exposed_flag==1),
+        rng=rng
     )
+    lap("B_brand")
 
     # SECTION C => only if derived_exposed_flag=1
     if derived_exposed_flag==1:
@@ -559,92 +1440,92 @@ def simulate_complete_respondent(
             # uniform suspicious pattern
             C1, C2, C3 = 1, 3, 1
             C4 = 3
-            c5_list = [3,3,3,3,3,3]
-            C5 = ", ".join(map(str, c5_list))
-            C6 = "Average ad. Not much to say."
-            C7 = np.random.choice([1,2,3,4,5,6,7])
+            C5 = 333333  # one digit per item => "3, 3, 3, 3, 3, 3"
+            C6 = verbatims.text(verbatims.draw("outlier", rng))
+            C7 = rng.choice([1,2,3,4,5,6,7])
         else:
             # Ad recall correlates with channel freq
             freq_check = (TV_Channel_A in [1,2]) or (TV_Channel_B in [1,2])
             if freq_check:
-                C1 = np.random.choice([1,2,3], p=[0.80,0.15,0.05])
+                C1 = samplers["c1_frequent_viewer"].draw(rng)
             else:
-                C1 = np.random.choice([1,2,3], p=[0.60,0.30,0.10])
+                C1 = samplers["c1_other"].draw(rng)
 
             if C1==1:
                 C3 = 1
-                C2 = np.random.choice(range(1,10))  # random "source code"
+                C2 = rng.choice(range(1,10))  # random "source code"
             else:
-                C3 = np.random.choice([1,2,3], p=[0.30,0.50,0.20])
+                C3 = samplers["c3_not_recalled"].draw(rng)
                 C2 = np.nan
 
             # C4 => if B4≥4 or C1=1 => more positive
             if B4>=4 or C1==1:
-                C4 = np.random.choice([1,2,3,4,5], p=[0.02,0.08,0.15,0.30,0.45])
+                C4 = samplers["c4_positive"].draw(rng)
             else:
-                C4 = np.random.choice([1,2,3,4,5], p=[0.05,0.15,0.25,0.35,0.20])
+                C4 = samplers["c4_other"].draw(rng)
 
             # C5 => 6 Likert items. If C4≥4 => nudge them up
-            c5_list = [simulate_attitude() for _ in range(6)]
+            c5_list = [simulate_attitude(rng=rng, scenario=scenario) for _ in range(6)]
             if C4>=4:
                 for i in range(len(c5_list)):
-                    if c5_list[i]<5 and np.random.rand()<0.6:
+                    if c5_list[i]<5 and rng.random()<0.6:
                         c5_list[i] += 1
-            C5 = ", ".join(map(str,c5_list))
+            C5 = int("".join(map(str,c5_list)))
 
             # C6 => open-ended: more positive if C4≥4
+            # (a shared pool string, not a fresh copy per respondent)
             if C4>=4:
-                if np.random.rand()<0.5:
-                    C6 = np.random.choice(C6_RESPONSES_POSITIVE)
+                if rng.random()<0.5:
+                    C6 = verbatims.text(verbatims.draw("positive", rng))
                 else:
-                    C6 = np.random.choice(C6_RESPONSES_LONGER)
+                    C6 = verbatims.text(verbatims.draw("longer", rng))
             else:
-                C6 = np.random.choice(C6_RESPONSES_NEUTRAL_NEG)
+                C6 = verbatims.text(verbatims.draw("neutral", rng))
 
             # C7 => "key message aided"
-            C7 = np.random.choice([1,2,3,4,5,6,7],
-                                  p=[0.50,0.10,0.10,0.05,0.10,0.10,0.05])
+            C7 = samplers["c7"].draw(rng)
     else:
         # Control => no ad questions
         C1 = C2 = C3 = C4 = np.nan
         C5 = C6 = C7 = np.nan
+    lap("C_ad_perception")
 
     # SECTION D => LIFESTYLE & DEMOGRAPHICS
     # We'll nudge D2/D3 if D1=1 (primary shopper) or D7=1 (has children).
-    D1 = np.random.choice([1,2,3], p=[0.70,0.25,0.05])  # 1=Primary,2=Shared,3=None
-    base_d2 = np.random.choice([1,2,3,4,5,6], p=[0.10,0.40,0.20,0.15,0.10,0.05])
-    base_d3 = np.random.choice([1,2,3,4,5,6], p=[0.40,0.30,0.10,0.10,0.05,0.05])
+    D1 = samplers["d1"].draw(rng)  # 1=Primary,2=Shared,3=None
+    base_d2 = samplers["d2"].draw(rng)
+    base_d3 = samplers["d3"].draw(rng)
 
-    D7 = np.random.choice([1,2], p=[0.50,0.50])
+    D7 = samplers["d7"].draw(rng)
     if D7==1:
-        n_kids = np.random.choice([1,2,3], p=[0.5,0.3,0.2])
-        kids_ages = np.random.choice([1,2,3,4], size=n_kids, replace=False)
-        D8 = ", ".join(map(str, sorted(kids_ages)))
+        n_kids = samplers["d8_num_kids"].draw(rng)
+        kids_ages = rng.choice([1,2,3,4], size=n_kids, replace=False)
+        D8 = sum(1 << (int(age)-1) for age in kids_ages)
     else:
         D8 = np.nan
 
     # Nudges for D2 (snack purchase freq) & D3 (weekly snack spend)
-    if D1==1 and np.random.rand()<0.5:
-        base_d2 = np.random.choice([1,2])
-    if D1==1 and np.random.rand()<0.5:
-        base_d3 = np.random.choice([1,2])
+    if D1==1 and rng.random()<0.5:
+        base_d2 = rng.choice([1,2])
+    if D1==1 and rng.random()<0.5:
+        base_d3 = rng.choice([1,2])
 
-    if D7==1 and np.random.rand()<0.3:
-        base_d2 = np.random.choice([1,2])
-    if D7==1 and np.random.rand()<0.3:
-        base_d3 = np.random.choice([1,2])
+    if D7==1 and rng.random()<0.3:
+        base_d2 = rng.choice([1,2])
+    if D7==1 and rng.random()<0.3:
+        base_d3 = rng.choice([1,2])
 
     D2 = base_d2
     D3 = base_d3
 
-    D4 = np.random.choice([1,2,3,4,5,6,7,8], p=[0.50,0.10,0.05,0.05,0.15,0.10,0.03,0.02])
-    D5 = np.random.choice([1,2,3,4,5], p=[0.30,0.30,0.30,0.08,0.02])
-    D6 = np.random.choice([1,2,3,4,5], p=[0.35,0.50,0.10,0.03,0.02])
-    D9 = pick_community_type()
-    D10 = np.random.choice([1,2,3,4,5,6,7], p=[0.20,0.25,0.20,0.15,0.10,0.05,0.05])
+    D4 = samplers["d4"].draw(rng)
+    D5 = samplers["d5"].draw(rng)
+    D6 = samplers["d6"].draw(rng)
+    D9 = pick_community_type(rng=rng, scenario=scenario)
+    D10 = samplers["d10"].draw(rng)
 
     # Completion time
-    comp_time = simulate_completion_time(is_outlier=outlier)
+    comp_time = simulate_completion_time(is_outlier=outlier, rng=rng)
 
     # Build final dict
     respondent = {
@@ -693,12 +1574,510 @@ def simulate_complete_respondent(
         "D10_Household_Income": D10,
         "Completion_Time": comp_time
     }
+    lap("D_lifestyle")
     return respondent
 
+# -----------------------------------------------------------------------------
+# VECTORIZED (COLUMNAR) ENGINE
+# Builds N respondents at once as NumPy arrays, one column at a time, instead
+# of one dict per respondent. Every *_batch helper mirrors the scalar helper of
+# the same name and keeps its probabilities and conditional rules.
+# -----------------------------------------------------------------------------
+BRANDX_INDEX = ALL_BRANDS.index("BrandX")
+POPULAR_BRAND_INDEX = np.array(
+    [ALL_BRANDS.index(b) for b in ["Lays","Pringles","Ruffles","Doritos","Cheetos","BrandX"]]
+)
+# B1 brand mix per mention: uniform over ALL_BRANDS (row 0); frequent chip
+# eaters (row 1) pick a popular brand half the time, any brand otherwise
+B1_BRAND_WEIGHTS = np.tile(np.full(len(ALL_BRANDS), 1 / len(ALL_BRANDS)), (2, 1))
+B1_BRAND_WEIGHTS[1] *= 0.5
+B1_BRAND_WEIGHTS[1, POPULAR_BRAND_INDEX] += 0.5 / len(POPULAR_BRAND_INDEX)
+_B1_BRAND_STARTS = np.cumsum(B1_BRAND_WEIGHTS, axis=1) - B1_BRAND_WEIGHTS
+# Inverse-CDF lookup grid: the brand at the start of each 1/4096 cell. Every
+# brand weight is wider than a cell, so a point is in that brand or the next
+_B1_GRID_CELLS = 4096
+_B1_BRAND_GRID = np.stack([
+    np.searchsorted(starts, np.arange(_B1_GRID_CELLS) / _B1_GRID_CELLS, side="right") - 1
+    for starts in _B1_BRAND_STARTS
+])
+_B1_BRAND_ENDS = np.append(_B1_BRAND_STARTS[:, 1:], [[np.inf], [np.inf]], axis=1)
+# Code => name lookup for A4 (index 0 unused)
+PROVINCE_NAMES = np.array([None] + [PROVINCE_MAPPING[c] for c in range(1, 14)], dtype=object)
+AIDED_BRAND_NAMES = {
+    1:"Brand X", 2:"Lay's", 3:"Pringles", 4:"Ruffles",
+    5:"Utz", 6:"Kettle Brand", 7:"Herr's", 8:"Other"
+}
+
+def _subset_ranks(n, k_options, size, rng):
+    """
+    For each row, pick `size[i]` distinct items out of `k_options` without
+    replacement. Returns a boolean (n, k_options) selection mask.
+    """
+    ranks = rng.random((n, k_options)).argsort(axis=1).argsort(axis=1)
+    return ranks < size[:, None]
+
+def _bits_to_mask(selected, dtype):
+    """(n, k) boolean selection matrix => per-row bitmask (bit j = column j)."""
+    weights = np.uint64(1) << np.arange(selected.shape[1], dtype=np.uint64)
+    return (selected @ weights).astype(dtype)
+
+def _mask_bits(mask, k):
+    """Per-row bitmask => (n, k) boolean matrix, the inverse of _bits_to_mask."""
+    return (np.asarray(mask, dtype=np.uint64)[:, None] >> np.arange(k, dtype=np.uint64)) & 1 == 1
+
+def pick_gender_batch(n, rng=None, scenario=None):
+    """A2_gender for n respondents (see pick_gender)."""
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["gender"].draw(rng, n)
+
+def pick_age_batch(n, rng=None, scenario=None):
+    """A3_age for n respondents (see pick_age)."""
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["age"].draw(rng, n)
+
+def pick_province_batch(n, rng=None, scenario=None):
+    """A4_province names for n respondents (see pick_province)."""
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return PROVINCE_NAMES[samplers["province"].draw(rng, n)]
+
+def pick_community_type_batch(n, rng=None, scenario=None):
+    """D9_Community_Type for n respondents (see pick_community_type)."""
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["community_type"].draw(rng, n)
+
+def simulate_completion_time_batch(n, is_outlier=False, rng=None):
+    """Completion times in minutes for n respondents (see simulate_completion_time)."""
+    rng = _as_generator(rng)
+    if is_outlier:
+        (fast_low, fast_high), (slow_low, slow_high) = OUTLIER_COMPLETION_TIMES
+        fast = rng.random(n) < 0.5
+        times = np.where(fast, np.floor(rng.uniform(fast_low, fast_high, n) * 10),
+                         np.ceil(rng.uniform(slow_low, slow_high, n) * 10))
+        return times / 10
+    return np.round(rng.uniform(*CLEAN_COMPLETION_TIME, n), 1)
+
+def simulate_snack_response_batch(n, avoid_all_never=False, rng=None, scenario=None):
+    """
+    A6 for n respondents => (n, 6) array, one column per snack item
+    (see simulate_snack_response).
+    """
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["snack_not_never" if avoid_all_never else "snack"].draw(rng, (n, 6))
+
+def simulate_attitude_batch(size, rng=None, scenario=None):
+    """1–5 Likert draws with the simulate_attitude skew."""
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    return samplers["attitude"].draw(rng, size)
+
+def sample_b1_brands(is_exposed, frequent_chip_eater, rng=None, effect=1.0, scenario=None):
+    """
+    B1 mentions for a whole array of respondents: 1-3 distinct brands each
+    (b1_num_brands), drawn without any retry loop.
+      - BrandX is the first mention for ~60% of exposed respondents
+        (times `effect`, see EXPOSURE_EFFECT)
+      - every other mention is drawn from the respondent's B1_BRAND_WEIGHTS
+        mix (popular-brand weighting for frequent chip eaters), renormalized
+        over the brands not mentioned yet
+    Returns (picks, brandx_mentioned): picks is an (n, 3) int8 matrix of
+    ALL_BRANDS indices in mention order, -1 for unused slots.
+    """
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    is_exposed = np.asarray(is_exposed, dtype=bool)
+    frequent = np.asarray(frequent_chip_eater, dtype=bool).astype(np.intp)
+    n = len(is_exposed)
+    num_brands = samplers["b1_num_brands"].draw(rng, n)
+    brandx_first = is_exposed & (rng.random(n) < 0.60*effect)
+
+    picks = np.full((n, 3), -1, dtype=np.int8)
+    rows = slice(None)  # every respondent names a first brand
+    taken = []  # brands `rows` have mentioned so far, kept in ascending order
+    for j in range(3):
+        if j:
+            keep = num_brands[rows] > j
+            rows = np.flatnonzero(keep) if j == 1 else rows[keep]
+            taken = [brands[keep] for brands in taken]
+        # Inverse CDF over the brands left: a point in the remaining mass is
+        # stepped past every brand already mentioned (in ascending order), so
+        # it lands on the full [0, 1) line outside their intervals
+        frequent_rows = frequent[rows]
+        weights = [B1_BRAND_WEIGHTS[frequent_rows, brands] for brands in taken]
+        point = rng.random(len(frequent_rows)) * (1.0 - sum(weights))
+        for brands, weight in zip(taken, weights):
+            point += weight * (point >= _B1_BRAND_STARTS[frequent_rows, brands])
+        brand = _B1_BRAND_GRID[frequent_rows, (point * _B1_GRID_CELLS).astype(np.intp)]
+        brand += point >= _B1_BRAND_ENDS[frequent_rows, brand]
+        if j == 0:
+            brand[brandx_first] = BRANDX_INDEX
+        picks[rows, j] = brand
+        for t in range(len(taken)):
+            taken[t], brand = np.minimum(taken[t], brand), np.maximum(taken[t], brand)
+        taken.append(brand)
+
+    return picks, (picks == BRANDX_INDEX).any(axis=1)
+
+def simulate_b1_unaided_brands_batch(is_exposed, frequent_chip_eater, rng=None, scenario=None):
+    """
+    B1 for a whole array of respondents (see sample_b1_brands).
+    Returns a uint32 bitmask over ALL_BRANDS per respondent.
+    """
+    picks, _ = sample_b1_brands(is_exposed, frequent_chip_eater, rng=rng, scenario=scenario)
+    return _picks_to_mask(picks)
+
+def _picks_to_mask(picks):
+    """(n, k) brand-index matrix (-1 = none) => uint32 bitmask per row."""
+    bits = np.where(picks >= 0, np.uint64(1) << picks.clip(0).astype(np.uint64), np.uint64(0))
+    return np.bitwise_or.reduce(bits, axis=1).astype(np.uint32)
+
+def simulate_aided_awareness_batch(n, rng=None, scenario=None):
+    """
+    B2 for n respondents (see simulate_aided_awareness).
+    Returns a uint8 bitmask per respondent; bit c-1 is set if code c was selected.
+    """
+    rng = _as_generator(rng)
+    selected, _ = sample_aided_awareness(n, rng=rng, scenario=scenario)
+    return _bits_to_mask(selected, np.uint8)
+
+def simulate_overall_impression_batch(aided_mask, rng=None):
+    """
+    B2a for the B2 bitmasks (see simulate_overall_impression):
+    a 1–10 rating per selected brand, packed 4 bits per brand (uint32).
+    """
+    rng = _as_generator(rng)
+    selected = _mask_bits(aided_mask, B2A_ITEMS)
+    return _pack_ratings(_impression_ratings(selected, rng))
+
+def sample_aided_awareness(n, rng=None, scenario=None):
+    """
+    B2 and B2a together for n respondents, in one pass: returns the (n, 8)
+    bool selection matrix (2–4 of codes 1–7, plus "Other" 10% of the time)
+    and the (n, 8) int8 rating matrix (1–10 slider per selected brand, 0
+    where the brand wasn't selected).
+    """
+    rng = _as_generator(rng)
+    samplers = _samplers(scenario)
+    num_selected = samplers["b2_num_selected"].draw(rng, n)
+    selected = np.zeros((n, B2A_ITEMS), dtype=bool)
+    selected[:, :7] = _subset_ranks(n, 7, num_selected, rng)
+    selected[:, 7] = rng.random(n) < 0.1  # "Other"
+    return selected, _impression_ratings(selected, rng)
+
+def _impression_ratings(selected, rng):
+    ratings = np.round(rng.uniform(1, 10, selected.shape)).astype(np.int8)
+    return np.where(selected, ratings, np.int8(0))
+
+def _pack_ratings(ratings):
+    """(n, 8) matrix of 0–10 ratings => one uint32 per row, 4 bits per brand."""
+    shifts = np.arange(0, 4*ratings.shape[1], 4, dtype=np.uint32)
+    return np.bitwise_or.reduce(ratings.astype(np.uint32) << shifts, axis=1)
+
+def simulate_brandx_ratings_batch(is_exposed, brandx_in_b1, rng=None, effect=1.0, scenario=None):
+    """
+    B3/B4/B5 for (non-outlier) completes: the exposed or control skews, then
+    adjust_brandx_ratings_batch. `effect` scales the exposed skews and bumps
+    (see EXPOSURE_EFFECT); the skews and B5 normals come from `scenario`.
+    Returns (b3, b4, b5) arrays.
+    """
+    rng = _as_generator(rng)
+    scenario = as_scenario(scenario)
+    samplers = scenario.samplers
+    is_exposed = np.asarray(is_exposed, dtype=bool)
+    n = len(is_exposed)
+    b3_exposed, b4_exposed = exposed_rating_samplers(effect, scenario)
+    b3 = np.where(is_exposed, b3_exposed.draw(rng, n), samplers["b3_control"].draw(rng, n))
+    b4 = np.where(is_exposed, b4_exposed.draw(rng, n), samplers["b4_control"].draw(rng, n))
+    b5 = np.where(
+        is_exposed,
+        np.clip(rng.normal(*b5_exposed_normal(effect, scenario), n),1,10),
+        np.clip(rng.normal(*scenario.normals["b5_control"], n),1,10)
+    ).astype(np.int64)
+
+    # Correlate B3,B4,B5 with mention of BrandX in B1 & Exposed_Flag
+    return adjust_brandx_ratings_batch(
+        b3, b4, b5, brandx_in_b1=brandx_in_b1, is_exposed=is_exposed, rng=rng, effect=effect
+    )
+
+def _pack_digits(values):
+    """(n, k) matrix of 1–9 codes => one int per row, a decimal digit per item."""
+    return values @ 10 ** np.arange(values.shape[1] - 1, -1, -1)
+
+def _section_c_batch(tv_a, tv_b, b4, outlier, rng, verbatims=None, scenario=None):
+    """
+    Section C (ad perceptions) for exposed respondents only; all inputs are
+    arrays over the exposed rows. Returns a dict of C1..C7 columns; C6 is a
+    gather of pooled `verbatims` strings (default C6_VERBATIMS).
+    """
+    samplers = _samplers(scenario)
+    verbatims = verbatims or C6_VERBATIMS
+    n = len(tv_a)
+    if outlier:
+        return {
+            "C1_Ad_Recall_Pre": np.full(n, 1.0),
+            "C2_Ad_Source": np.full(n, 3.0),
+            "C3_Ad_Recall_Post": np.full(n, 1.0),
+            "C4_Ad_Enjoyment": np.full(n, 3.0),
+            "C5_Ad_Attitudes": np.full(n, 333333),
+            "C6_Key_Message_Unaided": verbatims.text(verbatims.draw("outlier", rng, n)),
+            "C7_Key_Message_Aided": rng.integers(1, 8, n).astype(float)
+        }
+
+    # Ad recall correlates with channel freq
+    freq_check = np.isin(tv_a, [1,2]) | np.isin(tv_b, [1,2])
+    C1 = np.where(
+        freq_check,
+        samplers["c1_frequent_viewer"].draw(rng, n),
+        samplers["c1_other"].draw(rng, n)
+    )
+    recalled = C1==1
+    C3 = np.where(recalled, 1, samplers["c3_not_recalled"].draw(rng, n))
+    C2 = np.where(recalled, rng.integers(1, 10, n), np.nan)
+
+    # C4 => if B4≥4 or C1=1 => more positive
+    C4 = np.where(
+        (b4>=4) | recalled,
+        samplers["c4_positive"].draw(rng, n),
+        samplers["c4_other"].draw(rng, n)
+    )
+
+    # C5 => 6 Likert items, nudged up if C4≥4
+    c5 = simulate_attitude_batch((n, C5_ITEMS), rng=rng, scenario=scenario)
+    nudge = (C4>=4)[:, None] & (c5<5) & (rng.random((n, C5_ITEMS))<0.6)
+    c5 = c5 + nudge
+
+    # C6 => open-ended, more positive if C4≥4 (pool indices, one gather at the end)
+    C6 = np.where(
+        C4>=4,
+        np.where(
+            rng.random(n)<0.5,
+            verbatims.draw("positive", rng, n),
+            verbatims.draw("longer", rng, n)
+        ),
+        verbatims.draw("neutral", rng, n)
+    )
+
+    C7 = samplers["c7"].draw(rng, n)
+    return {
+        "C1_Ad_Recall_Pre": C1.astype(float),
+        "C2_Ad_Source": C2.astype(float),
+        "C3_Ad_Recall_Post": C3.astype(float),
+        "C4_Ad_Enjoyment": C4.astype(float),
+        "C5_Ad_Attitudes": _pack_digits(c5),
+        "C6_Key_Message_Unaided": verbatims.text(C6),
+        "C7_Key_Message_Aided": C7.astype(float)
+    }
+
+def _section_d_batch(n, rng, scenario=None):
+    """
+    Section D (lifestyle & demographics) for n complete respondents, with the
+    D1 (primary shopper) and D7 (has children) nudges on D2/D3.
+    """
+    samplers = _samplers(scenario)
+    D1 = samplers["d1"].draw(rng, n)
+    D2 = samplers["d2"].draw(rng, n)
+    D3 = samplers["d3"].draw(rng, n)
+
+    D7 = samplers["d7"].draw(rng, n)
+    has_kids = D7==1
+    n_kids = samplers["d8_num_kids"].draw(rng, n)
+    kids_ages = _subset_ranks(n, 4, n_kids, rng)
+    D8 = np.where(has_kids, _bits_to_mask(kids_ages, np.uint8), 0)
+
+    # Nudges for D2 (snack purchase freq) & D3 (weekly snack spend)
+    for shopper_mask, rate in ((D1==1, 0.5), (has_kids, 0.3)):
+        nudge_d2 = shopper_mask & (rng.random(n)<rate)
+        nudge_d3 = shopper_mask & (rng.random(n)<rate)
+        D2 = np.where(nudge_d2, rng.integers(1, 3, n), D2)
+        D3 = np.where(nudge_d3, rng.integers(1, 3, n), D3)
+
+    return {
+        "D1_Grocery_Shopper_Role": D1,
+        "D2_Snack_Purchase_Frequency": D2,
+        "D3_Weekly_Snack_Spend": D3,
+        "D4_Employment_Status": samplers["d4"].draw(rng, n),
+        "D5_Education_Level": samplers["d5"].draw(rng, n),
+        "D6_Marital_Status": samplers["d6"].draw(rng, n),
+        "D7_Children": D7,
+        "D8_Children_Age": D8,
+        "D9_Community_Type": pick_community_type_batch(n, rng=rng, scenario=scenario),
+        "D10_Household_Income": samplers["d10"].draw(rng, n)
+    }
+
+def simulate_complete_batch(
+    resp_ids,
+    force_exposed=False,
+    force_control=False,
+    outlier=False,
+    rng=None,
+    exposure=None,
+    verbatims=None,
+    scenario=None
+):
+    """
+    Columnar version of simulate_complete_respondent: fills an
+    allocate_columns() plan for len(resp_ids) complete records in one pass
+    and returns it ({column: array} in RESPONDENT_COLUMNS order). Same rules
+    as the scalar path:
+      - TV channels from `exposure`, conditioned on the forced group (or
+        natural exposure when neither flag is set)
+      - A6 "not all never" override
+      - B1 BrandX mention & exposure feed the B3/B4/B5 correlation
+      - C1 => C3/C2 recall chain, C4 => C5 nudges (exposed only)
+      - D1/D7 nudges on D2/D3
+      - distributions from `scenario` (default SAMPLERS / NORMALS)
+    """
+    rng = _as_generator(rng)
+    scenario = as_scenario(scenario)
+    resp_ids = np.asarray(resp_ids)
+    n = len(resp_ids)
+
+    # Channels for group membership, all five in one joint draw
+    channels = (exposure or EXPOSURE).draw(rng, n, exposed=_forced_exposure(force_exposed, force_control))
+    TV_Channel_A, TV_Channel_B = channels[:, 0], channels[:, 1]
+    exposed = _exposed(channels)
+
+    # A6 => 6 snack items (make sure not all never)
+    snacks = simulate_snack_response_batch(n, avoid_all_never=True, rng=rng, scenario=scenario)
+    all_never = (snacks==5).all(axis=1)
+    snacks[all_never, 0] = rng.integers(1, 5, all_never.sum())
+
+    # B1 / B2 / B2a
+    b1_picks, brandx_in_b1 = sample_b1_brands(
+        is_exposed=exposed,
+        frequent_chip_eater=np.isin(snacks[:, 0], [1,2]),
+        rng=rng,
+        scenario=scenario
+    )
+    B1 = _picks_to_mask(b1_picks)
+    b2_selected, b2a_ratings = sample_aided_awareness(n, rng=rng, scenario=scenario)
+    B2 = _bits_to_mask(b2_selected, np.uint8)
+    B2a = _pack_ratings(b2a_ratings)
+
+    # B3,B4,B5: outliers start from a flat 3/3/5, then the usual adjustment
+    if outlier:
+        B3, B4, B5 = adjust_brandx_ratings_batch(
+            b3=np.full(n, 3), b4=np.full(n, 3), b5=np.full(n, 5),
+            brandx_in_b1=brandx_in_b1,
+            is_exposed=exposed,
+            rng=rng
+        )
+    else:
+        B3, B4, B5 = simulate_brandx_ratings_batch(exposed, brandx_in_b1, rng=rng, scenario=scenario)
+
+    # Fill the preallocated plan; section C stays NaN for control rows
+    columns = allocate_columns(n)
+    columns["respondent_id"][:] = resp_ids
+    columns["Completed"][:] = 1
+    columns["Termination_Point"][:] = "Completed"
+    columns["A1_purchased_snack"][:] = 1
+    columns["A2_gender"][:] = pick_gender_batch(n, rng=rng, scenario=scenario)
+    columns["A3_age"][:] = pick_age_batch(n, rng=rng, scenario=scenario)
+    columns["A4_province"][:] = pick_province_batch(n, rng=rng, scenario=scenario)
+    for j, channel in enumerate(TV_CHANNELS):
+        columns[f"TV_Channel_{channel}"][:] = channels[:, j]
+    for j, name in enumerate(A6_COLUMNS):
+        columns[name][:] = snacks[:, j]
+    columns["Exposed_Flag"][:] = exposed
+    columns["B1_Unaided_BrandAwareness"][:] = B1
+    columns["B2_Aided_BrandAwareness"][:] = B2
+    columns["B2a_Overall_Impression"][:] = B2a
+    columns["B3_Familiarity_BrandX"][:] = B3
+    columns["B4_Consideration_BrandX"][:] = B4
+    columns["B5_Recommendation_BrandX"][:] = B5
+
+    # SECTION C => only for exposed rows
+    if exposed.any():
+        exposed_c = _section_c_batch(
+            TV_Channel_A[exposed], TV_Channel_B[exposed], B4[exposed], outlier,
+            rng=rng, verbatims=verbatims, scenario=scenario
+        )
+        for name, values in exposed_c.items():
+            columns[name][exposed] = values
+
+    for name, values in _section_d_batch(n, rng=rng, scenario=scenario).items():
+        columns[name][:] = values
+    columns["Completion_Time"][:] = simulate_completion_time_batch(n, is_outlier=outlier, rng=rng)
+    return columns
+
+def simulate_terminated_batch(resp_ids, rng=None, exposure=None, scenario=None):
+    """
+    Columnar version of simulate_terminated_respondent: draws the A1 / A6 /
+    MidSurvey termination split (0.3/0.4/0.3 unless `scenario` overrides it)
+    for every id and fills only the columns each path reaches; everything
+    else stays NaN.
+    """
+    rng = _as_generator(rng)
+    scenario = as_scenario(scenario)
+    samplers = scenario.samplers
+    resp_ids = np.asarray(resp_ids)
+    n = len(resp_ids)
+    tp = samplers["termination_point"].draw(rng, n).astype(object)
+    columns = allocate_columns(n)
+    columns["respondent_id"][:] = resp_ids
+    columns["Termination_Point"][:] = tp
+    columns["A1_purchased_snack"][:] = 1
+    columns["Completion_Time"][:] = simulate_completion_time_batch(n, is_outlier=False, rng=rng)
+
+    # A1 => fail at screening, everything else is NaN
+    a1 = tp=="A1"
+    columns["A1_purchased_snack"][a1] = rng.choice([2,99], a1.sum())
+
+    # A6 and MidSurvey both pass A1 and answer the screener block
+    screened = ~a1
+    m = screened.sum()
+    columns["A2_gender"][screened] = pick_gender_batch(m, rng=rng, scenario=scenario)
+    columns["A3_age"][screened] = pick_age_batch(m, rng=rng, scenario=scenario)
+    columns["A4_province"][screened] = pick_province_batch(m, rng=rng, scenario=scenario)
+    channels = (exposure or EXPOSURE).draw(rng, m)
+    for j, channel in enumerate(TV_CHANNELS):
+        columns[f"TV_Channel_{channel}"][screened] = channels[:, j]
+    # We randomize Exposed_Flag but they don't actually continue
+    columns["Exposed_Flag"][screened] = rng.integers(0, 2, m)
+
+    # A6 => all 'Never'
+    a6 = tp=="A6"
+    for name in A6_COLUMNS:
+        columns[name][a6] = 5
+
+    # MidSurvey => A6 not all never, partial brand metrics in B, no C or D
+    mid = tp=="MidSurvey"
+    k = mid.sum()
+    snacks = simulate_snack_response_batch(k, avoid_all_never=True, rng=rng, scenario=scenario)
+    for j, name in enumerate(A6_COLUMNS):
+        columns[name][mid] = snacks[:, j]
+    b1_picks, brandx_in_b1 = sample_b1_brands(
+        is_exposed=np.zeros(k, dtype=bool),
+        frequent_chip_eater=np.isin(snacks[:, 0], [1,2]),
+        rng=rng,
+        scenario=scenario
+    )
+    B1 = _picks_to_mask(b1_picks)
+    b2_selected, b2a_ratings = sample_aided_awareness(k, rng=rng, scenario=scenario)
+    B3, B4, B5 = adjust_brandx_ratings_batch(
+        b3=samplers["b3_control"].draw(rng, k),
+        b4=samplers["b4_control"].draw(rng, k),
+        b5=np.clip(rng.normal(*scenario.normals["b5_control"], k),1,10).astype(np.int64),
+        brandx_in_b1=brandx_in_b1,
+        is_exposed=False,
+        rng=rng
+    )
+    columns["B1_Unaided_BrandAwareness"][mid] = B1
+    columns["B2_Aided_BrandAwareness"][mid] = _bits_to_mask(b2_selected, np.uint8)
+    columns["B2a_Overall_Impression"][mid] = _pack_ratings(b2a_ratings)
+    columns["B3_Familiarity_BrandX"][mid] = B3
+    columns["B4_Consideration_BrandX"][mid] = B4
+    columns["B5_Recommendation_BrandX"][mid] = B5
+    return columns
+
 # -----------------------------------------------------------------------------
 # FINAL DATASET BUILD FUNCTION
 # -----------------------------------------------------------------------------
-def generate_dataset():
+def generate_dataset(rng=None, compact=False, masks=False, profile=None, scenario=None):
     """
     We want exactly:
       - 500 'complete' respondents in the EXPOSED group (Channel A<5 or B<5)
@@ -706,76 +2085,1071 @@ def generate_dataset():
       - 15 outliers (some forced-exposed, some forced-control)
       - 50 terminated
     => total = 1065
+    Pass `rng` (a seed or np.random.Generator) for a reproducible dataset.
+    compact=True returns the COMPACT_DTYPES columns (see compact_dtypes).
+    masks=True keeps B1/B2/D8 as bitmasks, C5 as a digit grid and B2a as
+    packed ratings instead of formatting them to strings (see format_multi_select).
+    Pass a SurveyProfile as `profile` to collect per-section timings, RNG call
+    counts and rows emitted (print it, or read .report() / .counters()).
+    scenario (a Scenario, profile dict or profile file, see load_scenario)
+    overrides the answer distributions.
     """
+    rng = _as_generator(rng) if profile is None else profile.wrap(rng)
+    scenario = as_scenario(scenario)
+
+    # Shuffle up front: draw a slot for every respondent before generating,
+    # then write each record straight into its slot of one preallocated
+    # plan - no list of records, no reordering copy of the finished table
+    n_total = 500 + 500 + 15 + 50
+    slots = iter(rng.permutation(n_total).tolist())
+    columns = allocate_columns(n_total)
+
+    def place(record):
+        slot = next(slots)
+        for name, value in record.items():
+            if not (isinstance(value, float) and np.isnan(value)):  # plan is already missing there
+                columns[name][slot] = value
+
     # 1) 500 Exposed completes
-    exposed_completes = [
-        simulate_complete_respondent(
+    for i in range(1,501):
+        place(simulate_complete_respondent(
             resp_id=i,
             force_exposed=True,
             force_control=False,
-            outlier=False
-        )
-        for i in range(1,501)
-    ]
+            outlier=False,
+            rng=rng,
+            profile=profile,
+            scenario=scenario
+        ))
     # 2) 500 Control completes
-    control_completes = [
-        simulate_complete_respondent(
+    for i in range(1,501):
+        place(simulate_complete_respondent(
             resp_id=500+i,
             force_exposed=False,
             force_control=True,
-            outlier=False
-        )
-        for i in range(1,501)
-    ]
+            outlier=False,
+            rng=rng,
+            profile=profile,
+            scenario=scenario
+        ))
 
     # 3) 15 Outliers => forcibly produce suspicious patterns & extremes
     # We'll do ~ half exposed, ~ half control
-    outliers = []
     n_exp_out = 8  # 8 outliers with Channel A<5 or B<5
     n_ctl_out = 7  # 7 outliers with Channel A=5 AND B=5
     base_out_id = 2000
     for i in range(n_exp_out):
         rid = base_out_id + i + 1
-        outliers.append(
-            simulate_complete_respondent(
-                resp_id=rid,
-                force_exposed=True,
-                force_control=False,
-                outlier=True
-            )
-        )
+        place(simulate_complete_respondent(
+            resp_id=rid,
+            force_exposed=True,
+            force_control=False,
+            outlier=True,
+            rng=rng,
+            profile=profile,
+            scenario=scenario
+        ))
     for i in range(n_ctl_out):
         rid = base_out_id + n_exp_out + i + 1
-        outliers.append(
-            simulate_complete_respondent(
-                resp_id=rid,
-                force_exposed=False,
-                force_control=True,
-                outlier=True
-            )
-        )
+        place(simulate_complete_respondent(
+            resp_id=rid,
+            force_exposed=False,
+            force_control=True,
+            outlier=True,
+            rng=rng,
+            profile=profile,
+            scenario=scenario
+        ))
 
     # 4) 50 terminated respondents
     # For these we do not force channel logic.
     # We'll ID them from 3001..3050
-    terminated = []
     for i in range(50):
         rid = 3000 + i + 1
-        terminated.append(simulate_terminated_respondent(rid))
+        place(simulate_terminated_respondent(rid, rng=rng, profile=profile, scenario=scenario))
+
+    # Combine all (rows are already in shuffled order)
+    if profile is not None:
+        profile.start()
+    df = pd.DataFrame(columns, copy=False)
+    df = _finish_frame(df, compact, masks)
+    if profile is not None:
+        profile.lap("assembly")
+    return df
 
-    # Combine all
-    all_respondents = exposed_completes + control_completes + outliers + terminated
-    df = pd.DataFrame(all_respondents)
-    # Shuffle
-    df = df.sample(frac=1, random_state=123).reset_index(drop=True)
+# -----------------------------------------------------------------------------
+# STREAMING (CHUNKED) DATASET BUILD
+# Same quota mix as generate_dataset, but emitted as fixed-size chunks so
+# memory stays flat however many rows are requested. Each chunk gets an exact
+# share of every group (sequential hypergeometric split of the remaining
+# quotas) and is shuffled internally, so the concatenated stream is a uniformly
+# shuffled panel with the exact quota mix. Chunks are independent tasks with
+# their own RNG stream, so they can be built in parallel worker processes.
+# -----------------------------------------------------------------------------
+# "natural" completes are neither forced exposed nor forced control: their
+# Exposed_Flag follows from the exposure model's channel draw
+RESPONDENT_GROUPS = ["exposed", "control", "natural", "exposed_outlier", "control_outlier", "terminated"]
 
-    return df
+def _id_bases(n_exposed, n_control, n_outliers, n_natural=0):
+    """
+    First respondent_id - 1 of each group. Keeps the generate_dataset layout
+    (1.. exposed, 501.. control, 2001.. outliers, 3001.. terminated) and moves
+    the outlier/terminated blocks up by whole thousands when quotas grow.
+    Natural completes follow straight after control.
+    """
+    out_base = 1000 * (-(-(n_exposed + n_control + n_natural) // 1000) + 1)
+    term_base = out_base + 1000 * max(1, -(-n_outliers // 1000))
+    return {
+        "exposed": 0,
+        "control": n_exposed,
+        "natural": n_exposed + n_control,
+        "exposed_outlier": out_base,
+        "control_outlier": out_base,  # continues after the exposed outliers
+        "terminated": term_base
+    }
+
+def _split_chunk_counts(remaining, size, rng):
+    """
+    Draw how many of the `size` next rows come from each group, without
+    replacement from the `remaining` per-group counts.
+    """
+    counts = np.zeros(len(remaining), dtype=np.int64)
+    left = int(sum(remaining))
+    for g, available in enumerate(remaining):
+        left -= available
+        if available and size > 0:
+            counts[g] = rng.hypergeometric(available, left, size) if left else size
+            size -= counts[g]
+    return counts
+
+def _simulate_group_batch(group, resp_ids, rng, exposure=None, verbatims=None, scenario=None):
+    """Columnar records for one respondent group."""
+    if group == "terminated":
+        return simulate_terminated_batch(resp_ids, rng=rng, exposure=exposure, scenario=scenario)
+    return simulate_complete_batch(
+        resp_ids,
+        force_exposed=group.startswith("exposed"),
+        force_control=group.startswith("control"),
+        outlier=group.endswith("outlier"),
+        rng=rng,
+        exposure=exposure,
+        verbatims=verbatims,
+        scenario=scenario
+    )
+
+def _group_id_bases(quotas):
+    """First respondent_id - 1 of each group for these quotas (the generate_dataset layout)."""
+    quota = dict(zip(RESPONDENT_GROUPS, quotas))
+    bases = _id_bases(
+        quota["exposed"], quota["control"],
+        quota["exposed_outlier"] + quota["control_outlier"], quota["natural"]
+    )
+    bases["control_outlier"] += quota["exposed_outlier"]
+    return bases
+
+def _plan_chunks(quotas, chunk_size, seed_seq, cell_counts=None):
+    """
+    Lazily yield one task per chunk: (group counts, first id per group, chunk
+    seed, completes per quota cell or None). The plan depends only on the
+    quotas, chunk_size and seed - never on how many workers end up building
+    the chunks.
+    """
+    plan_seq, chunk_root = seed_seq.spawn(2)
+    plan_rng = np.random.default_rng(plan_seq)
+    remaining = list(quotas)
+    next_id = _group_id_bases(quotas)
+    cells_left = None if cell_counts is None else np.array(cell_counts, dtype=np.int64)
+    while sum(remaining) > 0:
+        counts = _split_chunk_counts(remaining, min(chunk_size, sum(remaining)), plan_rng)
+        first_ids = [next_id[group] + 1 for group in RESPONDENT_GROUPS]
+        for g, group in enumerate(RESPONDENT_GROUPS):
+            next_id[group] += counts[g]
+            remaining[g] -= counts[g]
+        cells = None
+        if cells_left is not None:
+            # This chunk's completes take an exact share of every quota cell
+            cells = plan_rng.multivariate_hypergeometric(cells_left, int(counts[:-1].sum()))
+            cells_left -= cells
+        yield counts, first_ids, chunk_root.spawn(1)[0], cells
+
+def _build_chunk(task, compact=False, masks=False, cell_values=None, exposure=None, verbatims=None, scenario=None):
+    """
+    Build one shuffled DataFrame chunk from its plan entry, with its own
+    Generator. Module-level so worker processes can run it.
+    """
+    counts, first_ids, chunk_seed, cells = task
+    rng = np.random.default_rng(chunk_seed)
+    # Shuffle within the chunk: each group's rows are scattered straight
+    # into their shuffled slots of one preallocated plan
+    slots = rng.permutation(int(counts.sum()))
+    chunk = allocate_columns(len(slots))
+    start = 0
+    for g, group in enumerate(RESPONDENT_GROUPS):
+        if counts[g] == 0:
+            continue
+        part = _simulate_group_batch(
+            group, np.arange(first_ids[g], first_ids[g] + counts[g]), rng, exposure, verbatims, scenario
+        )
+        rows = slots[start:start + counts[g]]
+        for name, values in part.items():
+            chunk[name][rows] = values
+        start += counts[g]
+    if cells is not None:
+        _assign_quota_cells(chunk, cells, cell_values, rng)
+    return _finish_frame(pd.DataFrame(chunk, copy=False), compact, masks, verbatims)
+
+# -----------------------------------------------------------------------------
+# FIXED BLOCK LAYOUT
+# The appendable layout (iter_dataset_chunks(offsets=...), used by manifest
+# writes and append_dataset). Every group has its own lane of respondents
+# numbered over the whole panel, cut into blocks of `block_size`: group g's
+# k-th respondent sits in block k // block_size, draws from the (block, g)
+# stream and gets a respondent_id that depends only on (g, k). A block's rows
+# come out in the order of a permutation seeded by the block alone. Nothing
+# depends on a run's totals, so growing a panel run by run gives the same
+# respondents as one run with the summed quotas.
+# -----------------------------------------------------------------------------
+LAYOUT_BLOCK_SIZE = 4096
+
+def block_layout_ids(group_index, lanes, block_size=LAYOUT_BLOCK_SIZE):
+    """respondent_id of lane positions `lanes` (0-based, panel-wide) of group RESPONDENT_GROUPS[group_index]."""
+    lanes = np.asarray(lanes, dtype=np.int64)
+    block, position = np.divmod(lanes, block_size)
+    return (block * len(RESPONDENT_GROUPS) + group_index) * block_size + position + 1
+
+def _plan_blocks(quotas, offsets, block_size, chunk_size, seed_seq, cell_counts=None):
+    """
+    Lazily yield one task per run of whole blocks holding about chunk_size of
+    the new rows: (entropy, [(block, (lo, hi) lane range per group)], chunk
+    seed, completes per quota cell or None). Group g fills lanes
+    offsets[g] .. offsets[g] + quotas[g] - 1.
+    """
+    plan_seq, chunk_root = seed_seq.spawn(2)
+    plan_rng = np.random.default_rng(plan_seq)
+    starts = np.asarray(offsets, dtype=np.int64)
+    ends = starts + np.asarray(quotas, dtype=np.int64)
+    used = ends > starts
+    if not used.any():
+        return
+    cells_left = None if cell_counts is None else np.array(cell_counts, dtype=np.int64)
+    terminated = RESPONDENT_GROUPS.index("terminated")
+
+    def task(blocks):
+        cells = None
+        if cells_left is not None:
+            completes = sum(hi - lo for _, lanes in blocks for g, (lo, hi) in enumerate(lanes) if g != terminated)
+            cells = plan_rng.multivariate_hypergeometric(cells_left, completes)
+            cells_left[:] -= cells
+        return seed_seq.entropy, blocks, chunk_root.spawn(1)[0], cells
+
+    blocks, n_rows = [], 0
+    for block in range(int((starts[used] // block_size).min()), int(((ends[used] - 1) // block_size).max()) + 1):
+        first = block * block_size
+        lo = np.clip(starts - first, 0, block_size)
+        hi = np.clip(ends - first, lo, block_size)
+        size = int((hi - lo).sum())
+        if size == 0:
+            continue
+        if blocks and n_rows + size > chunk_size:
+            yield task(blocks)
+            blocks, n_rows = [], 0
+        blocks.append((block, list(zip(lo.tolist(), hi.tolist()))))
+        n_rows += size
+    yield task(blocks)
+
+def _build_blocks(task, block_size=LAYOUT_BLOCK_SIZE, compact=False, masks=False, cell_values=None, exposure=None,
+                  verbatims=None, scenario=None):
+    """
+    Build the rows of a _plan_blocks task as one DataFrame, block after block.
+    Each (block, group) stream always simulates the full block_size lanes and
+    keeps the requested ones, so a lane's answers never depend on which other
+    lanes a run asked for. Module-level so worker processes can run it.
+    """
+    entropy, blocks, chunk_seed, cells = task
+    n_groups = len(RESPONDENT_GROUPS)
+    chunk = allocate_columns(sum(hi - lo for _, lanes in blocks for lo, hi in lanes))
+    start = 0
+    for block, lanes in blocks:
+        # Row order: the block's slots (group-major) ranked by one permutation
+        # of the whole block, so any subset keeps its relative order
+        keys = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(3, block))).permutation(
+            n_groups * block_size
+        )
+        slots = np.concatenate([g * block_size + np.arange(lo, hi) for g, (lo, hi) in enumerate(lanes)])
+        rows = start + np.argsort(np.argsort(keys[slots]))
+        done = 0
+        for g, (lo, hi) in enumerate(lanes):
+            if hi == lo:
+                continue
+            rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(4, block, g)))
+            resp_ids = block_layout_ids(g, block * block_size + np.arange(block_size), block_size)
+            part = _simulate_group_batch(RESPONDENT_GROUPS[g], resp_ids, rng, exposure, verbatims, scenario)
+            for name, values in part.items():
+                chunk[name][rows[done:done + hi - lo]] = values[lo:hi]
+            done += hi - lo
+        start += len(slots)
+    if cells is not None:
+        _assign_quota_cells(chunk, cells, cell_values, np.random.default_rng(chunk_seed))
+    return _finish_frame(pd.DataFrame(chunk, copy=False), compact, masks, verbatims)
+
+def _map_in_workers(func, tasks, n_workers):
+    """
+    Ordered ProcessPoolExecutor map over a lazy task iterator, keeping at most
+    2 tasks per worker in flight so finished chunks don't pile up in memory.
+    """
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(func, task))
+            if len(pending) >= 2 * n_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def iter_dataset_chunks(
+    n_exposed=500,
+    n_control=500,
+    n_exposed_outliers=8,
+    n_control_outliers=7,
+    n_terminated=50,
+    chunk_size=100_000,
+    as_arrow=False,
+    seed=None,
+    n_workers=1,
+    compact=False,
+    masks=False,
+    cell_quotas=None,
+    n_natural=0,
+    exposure=None,
+    offsets=None,
+    block_size=LAYOUT_BLOCK_SIZE,
+    verbatims=None,
+    scenario=None
+):
+    """
+    Yield the dataset as shuffled chunks of at most `chunk_size` rows
+    (pandas DataFrames, or pyarrow RecordBatches if as_arrow=True).
+    Quotas are filled exactly; respondent ids follow the generate_dataset
+    layout (see _id_bases). compact=True casts every chunk to COMPACT_DTYPES;
+    masks=True keeps the multi-select columns as integers (see generate_dataset).
+
+    cell_quotas (see normalize_cell_quotas) fixes the exact number of complete
+    respondents in every province x age x gender cell (or any subset of those
+    columns); it must add up to the exposed + control + natural + outlier quotas.
+
+    n_natural adds complete respondents that are not forced into either
+    group: their channels come unconditioned from `exposure` (an
+    ExposureModel, default EXPOSURE) and Exposed_Flag follows from them. The
+    forced groups draw from the same model conditioned on their group.
+
+    verbatims (a VerbatimGenerator, default C6_VERBATIMS) supplies the C6
+    open-ended answers; compact chunks encode C6 over its pool.
+
+    offsets=None keeps the generate_dataset id layout. A list of per-group
+    counts (RESPONDENT_GROUPS order) of respondents already in the panel - all
+    zeros for a new one - switches to the fixed block layout instead (see
+    LAYOUT_BLOCK_SIZE): respondents, ids and row order within a block then
+    depend only on the seed's entropy and their lane position, so runs with
+    offsets advanced by the previous quotas add up to one larger run (rows
+    sorted by respondent_id are identical). Used by append_dataset.
+    Chunks are then cut at block boundaries where possible.
+
+    scenario (a Scenario, profile dict or profile file, see load_scenario)
+    overrides the answer distributions; worker processes get its compiled
+    tables from their own cache.
+
+    Every chunk draws from its own np.random.Generator spawned from
+    SeedSequence(seed), so the same seed and chunk_size give identical chunks
+    whatever n_workers is (seed=None => fresh OS entropy; a SeedSequence is
+    used as is). n_workers > 1
+    builds chunks in a process pool (None = one per CPU) and yields them in
+    order.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if as_arrow:
+        pa = _import_pyarrow()
+        schema = arrow_schema(compact=compact, masks=masks, verbatims=verbatims)
+    quotas = [n_exposed, n_control, n_natural, n_exposed_outliers, n_control_outliers, n_terminated]
+    cell_counts = cell_values = None
+    if cell_quotas is not None:
+        cells = normalize_cell_quotas(cell_quotas)
+        if cells["n"].sum() != sum(quotas[:-1]):
+            raise ValueError(
+                f"cell_quotas add up to {cells['n'].sum()} but there are {sum(quotas[:-1])} complete respondents"
+            )
+        cell_counts = cells["n"].to_numpy()
+        cell_values = {name: cells[name].to_numpy() for name in cells.columns if name != "n"}
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    options = dict(
+        compact=compact, masks=masks, cell_values=cell_values,
+        exposure=exposure, verbatims=verbatims, scenario=as_scenario(scenario)
+    )
+    if offsets is None:
+        tasks = _plan_chunks(quotas, chunk_size, seed_seq, cell_counts)
+        build = partial(_build_chunk, **options)
+    else:
+        if len(offsets) != len(quotas) or min(offsets) < 0:
+            raise ValueError(f"offsets needs one non-negative count per group {RESPONDENT_GROUPS}")
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        tasks = _plan_blocks(quotas, offsets, block_size, chunk_size, seed_seq, cell_counts)
+        build = partial(_build_blocks, block_size=block_size, **options)
+    n_workers = n_workers or os.cpu_count()
+    if n_workers == 1:
+        chunks = map(build, tasks)
+    else:
+        chunks = _map_in_workers(build, tasks, n_workers)
+    for chunk in _split_chunks(chunks, chunk_size):
+        if as_arrow:
+            # Same schema metadata for every batch, whatever dtype pandas
+            # gave an all-missing text column in this chunk
+            chunk = pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+            chunk = chunk.replace_schema_metadata(schema.metadata)
+        yield chunk
+
+def _split_chunks(chunks, chunk_size):
+    """Cut any frame longer than chunk_size (a single large block) into chunk_size pieces."""
+    for chunk in chunks:
+        if len(chunk) <= chunk_size:
+            yield chunk
+            continue
+        for start in range(0, len(chunk), chunk_size):
+            yield chunk.iloc[start:start + chunk_size].reset_index(drop=True)
+
+def write_dataset_csv(path, chunk_size=100_000, manifest=False, compression=None, progress=None, **options):
+    """
+    Stream the dataset straight to a CSV file, one chunk at a time.
+    `options` (quotas, seed, n_workers) are passed to iter_dataset_chunks.
+    compression: None, "gzip", "bz2" or "xz". progress, if given, is called
+    with the running row count after every chunk.
+    manifest=True also writes the sidecar manifest append_dataset needs.
+    Returns the number of rows written.
+    """
+    record = _new_manifest(path, "csv", chunk_size, None, compression, options) if manifest else None
+    n_rows = _write_csv(path, "w", chunk_size, options, compression, progress)
+    if record is not None:
+        _add_segment(path, record, options, path, n_rows)
+    return n_rows
+
+CSV_COMPRESSION = {"gzip": "gzip", "bz2": "bz2", "xz": "lzma"}  # => stdlib module
+
+def _write_csv(path, mode, chunk_size, options, compression=None, progress=None):
+    if compression is None:
+        f = open(path, mode, newline="")
+    elif compression in CSV_COMPRESSION:
+        # Appending to a compressed CSV adds a new member/stream, which the
+        # stdlib readers (and pandas) read back as one file
+        f = __import__(CSV_COMPRESSION[compression]).open(path, mode + "t", newline="")
+    else:
+        raise ValueError(f"CSV compression must be one of {[None, *CSV_COMPRESSION]}")
+    n_rows = 0
+    with f:
+        for chunk in iter_dataset_chunks(chunk_size=chunk_size, **options):
+            chunk.to_csv(f, header=(n_rows == 0 and mode == "w"), index=False)
+            n_rows += len(chunk)
+            if progress is not None:
+                progress(n_rows)
+    return n_rows
+
+def arrow_schema(compact=False, masks=False, verbatims=None):
+    """
+    Fixed Arrow schema of the chunks, so every RecordBatch matches even when a
+    chunk has no answers at all for some text column.
+    """
+    pa = _import_pyarrow()
+    sample = _finish_frame(pd.DataFrame(allocate_columns(1)), compact, masks, verbatims)
+    schema = pa.Schema.from_pandas(sample, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type) or pa.types.is_string(field.type):
+            schema = schema.set(i, field.with_type(pa.large_string()))
+    return schema
+
+def _write_arrow_dataset(
+    path, file_format, chunk_size, partition_cols, options,
+    basename_template=None, compression=None, progress=None
+):
+    """
+    Stream Arrow chunks to one Parquet / IPC file (a row group or record batch
+    per chunk), or to a hive-partitioned directory when partition_cols is set.
+    Categoricals are dictionary-encoded (compact output is the default here).
+    compression=None keeps each format's default (snappy for Parquet,
+    uncompressed IPC).
+    """
+    pa = _import_pyarrow()
+    schema = arrow_schema(
+        compact=options["compact"], masks=options.get("masks", False), verbatims=options.get("verbatims")
+    )
+    n_rows = 0
+
+    def batches():
+        nonlocal n_rows
+        for batch in iter_dataset_chunks(chunk_size=chunk_size, as_arrow=True, **options):
+            n_rows += batch.num_rows
+            yield batch
+            if progress is not None:
+                progress(n_rows)
+
+    if partition_cols:
+        import pyarrow.dataset as ds
+        # Partition keys only survive as directory names; keep the full schema
+        # in the file metadata so read_dataset can restore order and dtypes
+        schema = schema.with_metadata({**schema.metadata, b"survey_schema": schema.serialize().to_pybytes()})
+        file_format = ds.ParquetFileFormat() if file_format == "parquet" else ds.IpcFileFormat()
+        ds.write_dataset(
+            batches(), path, schema=schema, format=file_format,
+            file_options=file_format.make_write_options(compression=compression) if compression else None,
+            partitioning=list(partition_cols), partitioning_flavor="hive",
+            basename_template=basename_template, existing_data_behavior="overwrite_or_ignore"
+        )
+    elif file_format == "parquet":
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(path, schema, compression=compression or "snappy") as writer:
+            for batch in batches():
+                writer.write_batch(batch)
+    else:
+        with pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression=compression)) as writer:
+            for batch in batches():
+                writer.write_batch(batch)
+    return n_rows
+
+def write_dataset_parquet(
+    path, chunk_size=100_000, partition_cols=None, manifest=False, compression=None, progress=None, **options
+):
+    """
+    Stream the dataset to Parquet, one row group per chunk. With
+    partition_cols (e.g. ["Completed", "Exposed_Flag"] or ["A4_province"])
+    `path` is a directory of hive partitions instead (read it back with
+    read_dataset). `options` are passed to iter_dataset_chunks.
+    compression: any Parquet codec ("snappy" default, "zstd", "gzip", "none"...).
+    progress, if given, is called with the running row count after every chunk.
+    manifest=True also writes the sidecar manifest append_dataset needs.
+    Returns the number of rows written.
+    """
+    return _write_arrow_output(path, "parquet", chunk_size, partition_cols, manifest, compression, progress, options)
+
+def write_dataset_arrow(
+    path, chunk_size=100_000, partition_cols=None, manifest=False, compression=None, progress=None, **options
+):
+    """
+    Same as write_dataset_parquet but in the Arrow IPC (Feather v2) file format,
+    which read_dataset can memory-map without copying (when uncompressed;
+    compression may be "lz4" or "zstd").
+    """
+    return _write_arrow_output(path, "ipc", chunk_size, partition_cols, manifest, compression, progress, options)
+
+def _write_arrow_output(path, file_format, chunk_size, partition_cols, manifest, compression, progress, options):
+    options.setdefault("compact", True)
+    record = _new_manifest(path, file_format, chunk_size, partition_cols, compression, options) if manifest else None
+    n_rows = _write_arrow_dataset(
+        path, file_format, chunk_size, partition_cols, options, compression=compression, progress=progress
+    )
+    if record is not None:
+        _add_segment(path, record, options, path, n_rows)
+    return n_rows
+
+def read_dataset(path):
+    """
+    Load a write_dataset_parquet / write_dataset_arrow output as a pyarrow
+    Table (use .to_pandas() for a DataFrame). A single IPC file is
+    memory-mapped (zero-copy); a partitioned directory gets its partition
+    columns back in schema order and dtype.
+    """
+    pa = _import_pyarrow()
+    if os.path.isdir(path):
+        dataset = open_dataset(path)
+        schema = pa.ipc.read_schema(pa.py_buffer(dataset.schema.metadata[b"survey_schema"]))
+        return dataset.to_table().select(schema.names).cast(schema)
+    files = _segment_files(path)
+    if len(files) > 1:
+        # Appended single-file output: one file per segment
+        return pa.concat_tables([_read_file(file) for file in files])
+    return _read_file(path)
+
+def open_dataset(path):
+    """
+    The same outputs as read_dataset, opened lazily as a pyarrow Dataset (a
+    partitioned directory, or a file plus its appended segments) so callers
+    can scan selected columns in batches without loading the whole panel.
+    """
+    _import_pyarrow()
+    import pyarrow.dataset as ds
+    path = os.fspath(path)
+    if os.path.isdir(path):
+        file_format = "parquet" if _first_file(path).endswith(".parquet") else "ipc"
+        return ds.dataset(
+            path, format=file_format,
+            partitioning=ds.HivePartitioning.discover(infer_dictionary=False)
+        )
+    return ds.dataset(_segment_files(path), format="parquet" if path.endswith(".parquet") else "ipc")
+
+def _segment_files(path):
+    """A single-file output's data files: the file itself, or every segment in its manifest."""
+    if not os.path.exists(manifest_path(path)):
+        return [path]
+    folder = os.path.dirname(os.path.normpath(path))
+    return [os.path.join(folder, segment["file"]) for segment in _load_manifest(path)["segments"]]
+
+def _read_file(path):
+    pa = _import_pyarrow()
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+def _first_file(path):
+    """Any data file under a partitioned output directory."""
+    for root, _, files in os.walk(path):
+        if files:
+            return os.path.join(root, files[0])
+    raise ValueError(f"no data files under {path}")
+
+def _import_pyarrow():
+    """pyarrow is optional: only Arrow / Parquet output needs it."""
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("Arrow output requires pyarrow (pip install pyarrow)") from exc
+    return pa
+
+# -----------------------------------------------------------------------------
+# SEEKABLE (COUNTER-BASED) GENERATION
+# Respondent ids 1..N are laid out by group (exposed, control, natural,
+# outliers, terminated) and cut into fixed blocks of `block_size` ids. Each
+# block draws from its own Philox stream whose key comes from the seed and
+# whose counter starts at (0, 0, block, 0), so any block - and hence any
+# respondent or id range - can be rebuilt on its own, in any order, on any
+# machine, without generating the rows before it.
+# -----------------------------------------------------------------------------
+class SeekablePanel:
+    """
+    Random-access panel: same quotas and options as iter_dataset_chunks, but
+    rows are keyed by respondent_id instead of produced in one sequential
+    stream. take(start, stop) builds only the blocks covering that id range,
+    respondent(k) a single record, blocks(shard, n_shards) one shard of a
+    parallel run. Rows come out in id (i.e. group) order, not shuffled.
+    """
+
+    def __init__(
+        self,
+        n_exposed=500,
+        n_control=500,
+        n_natural=0,
+        n_exposed_outliers=8,
+        n_control_outliers=7,
+        n_terminated=50,
+        seed=None,
+        block_size=1024,
+        exposure=None,
+        compact=False,
+        masks=False,
+        verbatims=None,
+        scenario=None
+    ):
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self.quotas = [n_exposed, n_control, n_natural, n_exposed_outliers, n_control_outliers, n_terminated]
+        self.bounds = np.cumsum([0] + self.quotas)  # group g holds ids bounds[g]+1 .. bounds[g+1]
+        self.entropy = np.random.SeedSequence(seed).entropy
+        self.block_size = block_size
+        self.exposure = exposure
+        self.verbatims = verbatims
+        self.scenario = as_scenario(scenario)
+        self.compact = compact
+        self.masks = masks
+        self._key = np.random.SeedSequence(self.entropy).generate_state(2, np.uint64)
+
+    def __len__(self):
+        return int(self.bounds[-1])
+
+    def __repr__(self):
+        return f"SeekablePanel({len(self)} respondents, block_size={self.block_size})"
+
+    @property
+    def n_blocks(self):
+        return -(-len(self) // self.block_size)
+
+    def block_rng(self, block):
+        """The Generator of one block: Philox keyed by the seed, counter at the block."""
+        return np.random.Generator(np.random.Philox(key=self._key, counter=[0, 0, block, 0]))
+
+    def group_of(self, resp_ids):
+        """RESPONDENT_GROUPS name(s) of the given respondent_id(s)."""
+        resp_ids = np.asarray(resp_ids)
+        if ((resp_ids < 1) | (resp_ids > len(self))).any():
+            raise ValueError(f"respondent ids run from 1 to {len(self)}")
+        groups = np.array(RESPONDENT_GROUPS)[np.searchsorted(self.bounds, resp_ids, side="left") - 1]
+        return groups.item() if groups.ndim == 0 else groups
+
+    def _block_columns(self, block):
+        first = block * self.block_size + 1
+        last = min(first + self.block_size - 1, len(self))
+        rng = self.block_rng(block)
+        columns = allocate_columns(last - first + 1)
+        for g, group in enumerate(RESPONDENT_GROUPS):
+            lo, hi = max(first, self.bounds[g] + 1), min(last, self.bounds[g + 1])
+            if lo > hi:
+                continue
+            part = _simulate_group_batch(
+                group, np.arange(lo, hi + 1), rng, self.exposure, self.verbatims, self.scenario
+            )
+            for name, values in part.items():
+                columns[name][lo - first:hi - first + 1] = values
+        return columns
+
+    def _frame(self, columns):
+        return _finish_frame(pd.DataFrame(columns, copy=False), self.compact, self.masks, self.verbatims)
+
+    def take(self, start, stop):
+        """Respondents start .. stop-1 (by respondent_id) as a DataFrame."""
+        start, stop = max(int(start), 1), min(int(stop), len(self) + 1)
+        if start >= stop:
+            return self._frame(allocate_columns(0))
+        blocks = range((start - 1) // self.block_size, (stop - 2) // self.block_size + 1)
+        parts = [self._block_columns(block) for block in blocks]
+        offset = start - (blocks[0] * self.block_size + 1)
+        columns = {
+            name: np.concatenate([part[name] for part in parts])[offset:offset + stop - start]
+            for name in RESPONDENT_COLUMNS
+        }
+        return self._frame(columns)
+
+    def respondent(self, resp_id):
+        """One respondent's record (a dict, like simulate_complete_respondent)."""
+        self.group_of(resp_id)
+        return self.take(resp_id, resp_id + 1).iloc[0].to_dict()
+
+    def blocks(self, shard=0, n_shards=1):
+        """
+        Yield this shard's blocks as DataFrames: blocks shard, shard+n_shards,
+        ... Shards are independent, so n_shards processes (or machines)
+        together produce exactly the whole panel.
+        """
+        if not 0 <= shard < n_shards:
+            raise ValueError("shard must be in 0 .. n_shards-1")
+        for block in range(shard, self.n_blocks, n_shards):
+            yield self._frame(self._block_columns(block))
+
+# -----------------------------------------------------------------------------
+# APPEND MODE
+# write_dataset_*(manifest=True) writes the fixed block layout (see
+# LAYOUT_BLOCK_SIZE) and leaves a JSON sidecar next to the output with the
+# root seed entropy, the block size, the chunking / dtype options, how many
+# respondents each group holds so far and, per segment, the quotas and
+# respondent_id range written. append_dataset reads it back, generates only
+# the new respondents (the next lanes of every group) and appends them: CSV
+# rows go at the end of the file, Parquet / IPC segments become new files
+# next to the original (or inside a partitioned directory). A panel grown
+# segment by segment holds exactly the rows of one write with the summed
+# quotas; only the file order differs (by segment, then shuffled by block).
+# -----------------------------------------------------------------------------
+MANIFEST_VERSION = 2
+_QUOTA_OPTIONS = ["n_exposed", "n_control", "n_natural", "n_exposed_outliers", "n_control_outliers", "n_terminated"]
+_QUOTA_DEFAULTS = dict(zip(_QUOTA_OPTIONS, [500, 500, 0, 8, 7, 50]))
+
+def manifest_path(path):
+    """Sidecar manifest of an output file or directory."""
+    return os.path.normpath(path) + ".manifest.json"
+
+def _load_manifest(path):
+    try:
+        with open(manifest_path(path)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"{path} has no manifest; write it with manifest=True to make it appendable") from None
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"unsupported manifest version {manifest.get('version')}")
+    return manifest
+
+def _save_manifest(path, manifest):
+    # Write then rename, so a crash never leaves a half-written manifest
+    target = manifest_path(path)
+    with open(target + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(target + ".tmp", target)
+
+def _segment_seed(entropy, segment):
+    """
+    Root SeedSequence of a segment. The respondents only depend on its
+    entropy (shared by every segment, see _build_blocks); the spawn key just
+    gives each segment its own chunk plan and quota-cell draws. Segment 0's
+    plan only spawns keys (0,...) and (1,...), so appended segments take
+    (2, segment); the block streams use (3, ...) and (4, ...).
+    """
+    if segment == 0:
+        return np.random.SeedSequence(entropy)
+    return np.random.SeedSequence(entropy, spawn_key=(2, segment))
+
+def _exposure_record(exposure):
+    """Manifest form of an ExposureModel: None for the default, else its joint weights."""
+    if exposure is None or exposure is EXPOSURE:
+        return None
+    return exposure.weights.ravel().tolist()
+
+def _exposure_from_record(record):
+    return None if record is None else ExposureModel(joint=np.reshape(record, (5,) * len(TV_CHANNELS)))
+
+def _cell_layout_record(cell_quotas):
+    """Manifest form of a quota table: its normalized cells as a list of records."""
+    return None if cell_quotas is None else json.loads(normalize_cell_quotas(cell_quotas).to_json(orient="records"))
+
+def _append_cell_quotas(layout, cell_quotas, n_completes):
+    """
+    The quota table of an appended segment: the caller's, which must cover
+    the same cells as the panel's layout, or else n_completes spread over the
+    layout's cells in proportion to their counts.
+    """
+    if cell_quotas is not None:
+        cells = normalize_cell_quotas(cell_quotas)
+        dims = [name for name in cells.columns if name != "n"]
+        if layout is None or sorted(layout[0]) != sorted(cells.columns) or (
+            sorted(map(tuple, cells[dims].to_numpy().tolist()))
+            != sorted(tuple(cell[name] for name in dims) for cell in layout)
+        ):
+            raise ValueError("cell_quotas must cover the same cells as the quota layout in the manifest")
+        return cells
+    if layout is None:
+        return None
+    cells = pd.DataFrame(layout)
+    if n_completes and not cells["n"].sum():
+        raise ValueError("the manifest's quota layout has no completes to spread new respondents over")
+    cells["n"] = _largest_remainder(cells["n"].to_numpy(dtype=float), n_completes)
+    return cells
+
+def _new_manifest(path, file_format, chunk_size, partition_cols, compression, options):
+    """Fix the seed in `options` (so it can be recorded) and start a manifest."""
+    if options.get("verbatims") is not None:
+        raise ValueError("verbatims can't be recorded in a manifest; leave them at the default")
+    if options.get("offsets") is not None:
+        raise ValueError("offsets is fixed by the manifest (a new panel starts at zero)")
+    seed = options.get("seed")
+    entropy = seed.entropy if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed).entropy
+    options["seed"] = _segment_seed(entropy, 0)
+    options["offsets"] = [0] * len(RESPONDENT_GROUPS)
+    options.setdefault("block_size", LAYOUT_BLOCK_SIZE)
+    return {
+        "version": MANIFEST_VERSION,
+        "format": file_format,
+        "entropy": entropy,
+        "block_size": options["block_size"],
+        "chunk_size": chunk_size,
+        "partition_cols": list(partition_cols) if partition_cols else None,
+        "compression": compression,
+        "compact": bool(options.get("compact", False)),
+        "masks": bool(options.get("masks", False)),
+        "scenario": None if options.get("scenario") is None else as_scenario(options["scenario"]).to_dict(),
+        "exposure": _exposure_record(options.get("exposure")),
+        "cell_quotas": _cell_layout_record(options.get("cell_quotas")),
+        "n_rows": 0,
+        "group_counts": dict.fromkeys(RESPONDENT_GROUPS, 0),
+        "last_id": 0,
+        "segments": []
+    }
+
+def _add_segment(path, manifest, options, file, n_rows):
+    """Record a written segment (quotas, id range) and save the manifest."""
+    quotas = {name: int(options.get(name, _QUOTA_DEFAULTS[name])) for name in _QUOTA_OPTIONS}
+    first_ids, last_ids = [], []
+    for g, (group, name) in enumerate(zip(RESPONDENT_GROUPS, _QUOTA_OPTIONS)):
+        start = manifest["group_counts"][group]
+        if quotas[name]:
+            first_ids.append(int(block_layout_ids(g, start, manifest["block_size"])))
+            last_ids.append(int(block_layout_ids(g, start + quotas[name] - 1, manifest["block_size"])))
+        manifest["group_counts"][group] = start + quotas[name]
+    manifest["segments"].append({
+        "quotas": quotas,
+        "n_rows": n_rows,
+        "first_id": min(first_ids, default=None),
+        "last_id": max(last_ids, default=None),
+        "file": os.path.basename(os.path.normpath(file))  # next to the manifest
+    })
+    manifest["n_rows"] += n_rows
+    manifest["last_id"] = max([manifest["last_id"]] + last_ids)
+    _save_manifest(path, manifest)
+
+def append_dataset(path, progress=None, **options):
+    """
+    Add respondents to a write_dataset_csv / _parquet / _arrow output written
+    with manifest=True, without touching the rows already there. `options`
+    are the new segment's quotas (n_exposed, n_control, n_natural, outliers,
+    n_terminated - same defaults as iter_dataset_chunks) plus n_workers; seed,
+    chunk_size, dtypes and scenario come from the manifest (as are the format
+    and compression). So do the exposure model and the quota-cell layout:
+    leave exposure / cell_quotas out to reuse them (new completes are spread
+    over the layout's cells in proportion), and passing values that differ
+    from the recorded ones raises ValueError. Each group continues
+    with its next lanes of the fixed block layout, so the panel ends up with
+    exactly the respondents (same ids and answers) that one write with the
+    summed quotas would have produced. progress works as in the writers.
+    Returns the number of rows appended.
+    """
+    manifest = _load_manifest(path)
+    for name in ("seed", "chunk_size", "compact", "masks", "as_arrow", "offsets", "block_size", "scenario"):
+        if name in options:
+            raise ValueError(f"{name} is fixed by the manifest and can't be passed to append_dataset")
+    if options.get("verbatims") is not None:
+        raise ValueError("verbatims can't be recorded in a manifest, so appends keep the default")
+    if "exposure" in options and _exposure_record(options["exposure"]) != manifest["exposure"]:
+        raise ValueError("exposure differs from the exposure model recorded in the manifest")
+    n_completes = sum(int(options.get(name, _QUOTA_DEFAULTS[name])) for name in _QUOTA_OPTIONS[:-1])
+    segment = len(manifest["segments"])
+    options.update(
+        seed=_segment_seed(manifest["entropy"], segment),
+        offsets=[manifest["group_counts"][group] for group in RESPONDENT_GROUPS],
+        block_size=manifest["block_size"],
+        compact=manifest["compact"],
+        masks=manifest["masks"],
+        scenario=manifest["scenario"],
+        exposure=_exposure_from_record(manifest["exposure"]),
+        cell_quotas=_append_cell_quotas(manifest["cell_quotas"], options.get("cell_quotas"), n_completes)
+    )
+    chunk_size, compression = manifest["chunk_size"], manifest.get("compression")
+    if manifest["format"] == "csv":
+        file = path
+        n_rows = _write_csv(path, "a", chunk_size, options, compression, progress)
+    elif manifest["partition_cols"]:
+        file = path
+        extension = "parquet" if manifest["format"] == "parquet" else "arrow"
+        n_rows = _write_arrow_dataset(
+            path, manifest["format"], chunk_size, manifest["partition_cols"], options,
+            basename_template=f"segment-{segment}-part-{{i}}.{extension}",
+            compression=compression, progress=progress
+        )
+    else:
+        root, extension = os.path.splitext(path)
+        file = f"{root}.{segment}{extension}"
+        n_rows = _write_arrow_dataset(
+            file, manifest["format"], chunk_size, None, options, compression=compression, progress=progress
+        )
+    _add_segment(path, manifest, options, file, n_rows)
+    return n_rows
+
+# -----------------------------------------------------------------------------
+# QUOTA CELLS & RAKING WEIGHTS
+# Quota mode fixes how many complete respondents fall in each demographic
+# cell: every chunk gets an exact multivariate-hypergeometric share of the
+# remaining cells and hands them out to its completes in random order, so the
+# cells are filled exactly with no rejection loop. Demographics don't feed any
+# other answer, so only A2/A3/A4 change. rake_weights() then post-stratifies
+# any sample to population margins.
+# -----------------------------------------------------------------------------
+QUOTA_COLUMNS = ["A2_gender", "A3_age", "A4_province"]
+
+def normalize_cell_quotas(cell_quotas):
+    """
+    Validate a quota table: a DataFrame (or list of dicts) with an `n` column
+    and any of QUOTA_COLUMNS. Provinces may be names or 1-13 codes (returned
+    as names). Returns a DataFrame with one row per distinct cell.
+    """
+    cells = pd.DataFrame(cell_quotas).copy()
+    dims = [name for name in cells.columns if name != "n"]
+    if "n" not in cells.columns or not dims or not set(dims) <= set(QUOTA_COLUMNS):
+        raise ValueError(f"cell_quotas needs an 'n' column and some of {QUOTA_COLUMNS}")
+    if (cells["n"] < 0).any():
+        raise ValueError("cell_quotas counts must be non-negative")
+    if cells.duplicated(dims).any():
+        raise ValueError("cell_quotas lists the same cell more than once")
+    if "A4_province" in cells:
+        cells["A4_province"] = [PROVINCE_MAPPING.get(p, p) for p in cells["A4_province"]]
+    for name in dims:
+        bad = ~cells[name].isin(QUESTIONS[name].codes)
+        if bad.any():
+            raise ValueError(f"cell_quotas has unknown {name} values: {cells.loc[bad, name].unique().tolist()}")
+    cells["n"] = cells["n"].astype(np.int64)
+    return cells.reset_index(drop=True)
+
+_QUOTA_SAMPLERS = {"A2_gender": "gender", "A3_age": "age", "A4_province": "province"}
+
+def proportional_cell_quotas(n, columns=QUOTA_COLUMNS, scenario=None):
+    """
+    Quota table for n completes spread over the population shares of
+    `columns` (the SAMPLERS probabilities, or the scenario's), rounded by
+    largest remainder so the cells add up to exactly n.
+    """
+    samplers = [_samplers(scenario)[_QUOTA_SAMPLERS[name]] for name in columns]
+    grids = np.meshgrid(*[sampler.codes for sampler in samplers], indexing="ij")
+    shares = np.ones(grids[0].shape)
+    for sampler, grid in zip(samplers, grids):
+        shares = shares * sampler.probs[grid - sampler.codes[0]]
+    cells = pd.DataFrame({name: grid.ravel() for name, grid in zip(columns, grids)})
+    cells["n"] = _largest_remainder(shares.ravel(), n)
+    return normalize_cell_quotas(cells)
+
+def _largest_remainder(weights, n):
+    """n split over `weights` (any scale) in integers that add up to exactly n."""
+    exact = weights / weights.sum() * n
+    counts = np.floor(exact).astype(np.int64)
+    counts[np.argsort(counts - exact)[:n - counts.sum()]] += 1
+    return counts
+
+def _assign_quota_cells(chunk, cells, cell_values, rng):
+    """Overwrite the demographics of a chunk's completes from its cell counts."""
+    rows = np.flatnonzero(chunk["Completed"] == 1)
+    drawn = rng.permutation(np.repeat(np.arange(len(cells)), cells))
+    for name, values in cell_values.items():
+        chunk[name][rows] = values[drawn]
+
+def rake_weights(df, targets, max_iter=100, tol=1e-6):
+    """
+    Raking (iterative proportional fitting) weights so the weighted shares of
+    each column in `targets` match it. targets = {column: {value: share}};
+    shares are normalized, so counts work too. Returns weights with mean 1.
+
+    Rows are first collapsed to the joint cells of the target columns, so each
+    IPF sweep costs O(cells) however many millions of rows there are.
+    """
+    columns = list(targets)
+    codes, sizes, margins = [], [], []
+    for name in columns:
+        values = list(targets[name])
+        index = pd.Index(values).get_indexer(df[name])
+        if (index < 0).any():
+            raise ValueError(f"{name} has values with no target: {df[name][index < 0].unique()[:5].tolist()}")
+        share = np.array([targets[name][v] for v in values], dtype=float)
+        codes.append(index)
+        sizes.append(len(values))
+        margins.append(share / share.sum())
+
+    cell = np.ravel_multi_index(codes, sizes)
+    counts = np.bincount(cell, minlength=int(np.prod(sizes))).reshape(sizes).astype(float)
+    n = counts.sum()
+    weights = np.ones(sizes)
+    for axis, margin in enumerate(margins):
+        observed = counts.sum(axis=tuple(a for a in range(len(sizes)) if a != axis))
+        if ((observed == 0) & (margin > 0)).any():
+            raise ValueError(f"{columns[axis]}: a targeted value has no respondents, weights cannot reach it")
+
+    for _ in range(max_iter):
+        worst = 0.0
+        for axis, margin in enumerate(margins):
+            others = tuple(a for a in range(len(sizes)) if a != axis)
+            current = (counts * weights).sum(axis=others) / n
+            factor = np.divide(margin, current, out=np.zeros_like(margin), where=current > 0)
+            shape = [1] * len(sizes)
+            shape[axis] = -1
+            weights = weights * factor.reshape(shape)
+            worst = max(worst, np.abs(current - margin).max())
+        if worst < tol:
+            break
+    else:
+        raise ValueError(f"raking did not converge in {max_iter} iterations (max margin error {worst:.2e})")
+    return weights.ravel()[cell]
+
+def population_targets(columns=QUOTA_COLUMNS, scenario=None):
+    """Raking targets from the module's population shares (SAMPLERS, or the scenario's)."""
+    targets = {}
+    for name in columns:
+        sampler = _samplers(scenario)[_QUOTA_SAMPLERS[name]]
+        codes = [PROVINCE_MAPPING[c] for c in sampler.codes] if name == "A4_province" else sampler.codes.tolist()
+        targets[name] = dict(zip(codes, sampler.probs))
+    return targets
 
 # -----------------------------------------------------------------------------
 # MAIN SCRIPT
 # -----------------------------------------------------------------------------
 if __name__=="__main__":
-    df = generate_dataset()
+    df = generate_dataset(rng=123)
     print("Total respondents:", df.shape[0])  # Should be 1065
 
     # Quick Stats:
@@ -786,7 +3160,13 @@ if __name__=="__main__":
     print(f"Exposed completes: {n_exposed}")
     print(f"Control completes: {n_control}")
     print(f"Terminated respondents: {len(df[df['Completed']==0])}")
+    print(f"Memory per row: {memory_per_row(df):.0f} bytes "
+          f"({memory_per_row(compact_dtypes(df)):.0f} bytes compact)")
 
     # Save to CSV
     df.to_csv("simulated_brandX_survey_dataset.csv", index=False)
     print("Dataset saved as 'simulated_brandX_survey_dataset.csv'.")
+
+    # Columnar copy: dictionary-encoded categoricals, small ints
+    compact_dtypes(df).to_parquet("simulated_brandX_survey_dataset.parquet", index=False)
+    print("Dataset saved as 'simulated_brandX_survey_dataset.parquet'.")
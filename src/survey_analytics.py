@@ -0,0 +1,338 @@
+"""
+Exposure-effect (lift) analytics for generated panels.
+
+Compares exposed and control completes on every brand (B) metric, overall
+and broken down by province, age and gender. The ad (C) questions are only
+asked of exposed respondents, so they get their level among the exposed (and
+its interval) but no control baseline.
+
+One grouped pass per chunk accumulates weighted counts, sums and sums of
+squares per (joint province x age x gender cell, group, metric); the
+per-breakdown tables are margins of that small joint table. Tens of millions
+of rows can so be analysed chunk by chunk, or straight from a written panel
+without loading it:
+
+    analysis = LiftAnalysis(n_boot=200, seed=1)
+    for chunk in iter_file_chunks("panel.parquet", columns=analysis.columns):
+        analysis.update(chunk)
+    print(analysis.results())
+
+Intervals are normal (Welch) intervals from those sums. With n_boot > 0 the
+overall lifts also get Poisson-bootstrap percentile intervals, which stream
+across chunks; bootstrap_lift() is the classic resample-with-replacement
+bootstrap of an in-memory frame, done with index matrices.
+"""
+import math
+import os
+import warnings
+from collections import namedtuple
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import Simulated_brandx_survey as sim
+except ImportError:
+    import Simulated_brandx_survey as sim
+
+# Completes answering outside this range (minutes, bounds included) are the
+# speeder / straggler outliers and are dropped; pass time_range=None to keep them
+CLEAN_TIME_RANGE = sim.CLEAN_COMPLETION_TIME
+BREAKDOWNS = ("A4_province", "A3_age", "A2_gender")
+
+# -----------------------------------------------------------------------------
+# METRICS
+# extract(series) => float per row, NaN where the question wasn't answered.
+# -----------------------------------------------------------------------------
+Metric = namedtuple("Metric", ["name", "description", "column", "extract"])
+
+def _floats(series):
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+def _share(codes):
+    """1.0 if the answer is one of `codes`, 0.0 if another answer, NaN if skipped."""
+    def extract(series):
+        values = _floats(series)
+        return np.where(np.isnan(values), np.nan, np.isin(values, codes))
+    return extract
+
+def _bit(bit):
+    """Multi-select option chosen (1.0 / 0.0), NaN where not asked."""
+    def extract(series):
+        values = sim.multi_select_values(series)
+        return np.where(values == 0, np.nan, values >> np.uint64(bit) & np.uint64(1))
+    return extract
+
+def _brandx_impression(series):
+    ratings = sim.multi_select_matrix(series)[:, 0].astype(float)  # B2a code 1 = Brand X
+    return np.where(ratings == 0, np.nan, ratings)
+
+def _attitude_mean(series):
+    items = sim.multi_select_matrix(series).astype(float)
+    return np.where(items.any(axis=1), items.mean(axis=1), np.nan)
+
+METRICS = [
+    Metric("B1_BrandX_unaided", "BrandX mentioned unaided (share)", "B1_Unaided_BrandAwareness",
+           _bit(sim.BRANDX_INDEX)),
+    Metric("B2_BrandX_aided", "Brand X selected in aided awareness (share)", "B2_Aided_BrandAwareness", _bit(0)),
+    Metric("B2a_BrandX_impression", "Brand X overall impression 1-10, among those aware", "B2a_Overall_Impression",
+           _brandx_impression),
+    Metric("B3_Familiarity_BrandX", "familiarity, mean of 1-5", "B3_Familiarity_BrandX", _floats),
+    Metric("B3_top2", "familiarity top-2 box (4-5)", "B3_Familiarity_BrandX", _share((4,5))),
+    Metric("B4_Consideration_BrandX", "consideration, mean of 1-5", "B4_Consideration_BrandX", _floats),
+    Metric("B4_top2", "consideration top-2 box (4-5)", "B4_Consideration_BrandX", _share((4,5))),
+    Metric("B5_Recommendation_BrandX", "recommendation, mean of 1-10", "B5_Recommendation_BrandX", _floats),
+    Metric("B5_top2", "recommendation top-2 box (9-10)", "B5_Recommendation_BrandX", _share((9,10))),
+    Metric("C1_recall", "unaided ad recall (C1=1)", "C1_Ad_Recall_Pre", _share((1,))),
+    Metric("C3_recall", "ad recall after the ad is shown (C3=1)", "C3_Ad_Recall_Post", _share((1,))),
+    Metric("C4_Ad_Enjoyment", "ad enjoyment, mean of 1-5", "C4_Ad_Enjoyment", _floats),
+    Metric("C4_top2", "ad enjoyment top-2 box (4-5)", "C4_Ad_Enjoyment", _share((4,5))),
+    Metric("C5_attitude", "mean of the six C5 ad attitude items", "C5_Ad_Attitudes", _attitude_mean),
+    Metric("C7_message_1", "aided key message 1 chosen (share)", "C7_Key_Message_Aided", _share((1,))),
+]
+
+# -----------------------------------------------------------------------------
+# PER-CHUNK ARRAYS
+# -----------------------------------------------------------------------------
+def _level_index(series, levels):
+    """Position of each value in `levels` (-1 if missing / unknown)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.set_categories(list(levels)).cat.codes.to_numpy().astype(np.int64)
+    # Few distinct values: map the uniques, not every row
+    codes, uniques = pd.factorize(series)
+    lookup = {level: i for i, level in enumerate(levels)}
+    return np.array([lookup.get(u, -1) for u in uniques] + [-1])[codes]
+
+def _groups(df, time_range):
+    """0 = control complete, 1 = exposed complete, -1 = not analysed."""
+    completed = _floats(df["Completed"]) == 1
+    if time_range is not None:
+        time = _floats(df["Completion_Time"])
+        completed &= (time >= time_range[0]) & (time <= time_range[1])
+    exposed = _floats(df["Exposed_Flag"])
+    return np.where(completed & (exposed == 0), 0, np.where(completed & (exposed == 1), 1, -1))
+
+# Poisson(1) inverse CDF over 2^16 equal cells: bootstrap weights from uint16 draws
+_POISSON_CDF = np.cumsum([math.exp(-1) / math.factorial(k) for k in range(20)])
+_POISSON_GRID = np.searchsorted(_POISSON_CDF, (np.arange(1 << 16) + 0.5) / (1 << 16)).astype(np.float32)
+
+def _poisson_weights(rng, shape):
+    return _POISSON_GRID[rng.integers(0, 1 << 16, shape, dtype=np.uint16)]
+
+# -----------------------------------------------------------------------------
+# STREAMING LIFT
+# -----------------------------------------------------------------------------
+class LiftAnalysis:
+    """
+    Streaming accumulator: update() with each chunk (DataFrame), then
+    results(). `weights` names a weight column (e.g. from rake_weights);
+    n_boot > 0 adds Poisson-bootstrap intervals for the overall lifts.
+    Memory held is a few (cells x 2 x metrics) arrays whatever the panel size.
+    """
+    def __init__(self, metrics=None, breakdowns=BREAKDOWNS, confidence=0.95, time_range=CLEAN_TIME_RANGE,
+                 weights=None, n_boot=0, seed=None):
+        self.metrics = list(METRICS if metrics is None else metrics)
+        self.breakdowns = list(breakdowns)
+        self.confidence = confidence
+        self.time_range = time_range
+        self.weights = weights
+        self.cells = [("overall", "all")] + [(b, level) for b in self.breakdowns for level in sim.QUESTIONS[b].codes]
+        # One slot per level of each breakdown plus a last one for missing
+        self.sizes = [len(sim.QUESTIONS[b].codes) + 1 for b in self.breakdowns]
+        m = len(self.metrics)
+        # sum of w, w*x, w*x^2 and w^2 per (joint cell, group, metric)
+        self.sums = np.zeros((4, int(np.prod(self.sizes)), 2, m))
+        self.n_boot = n_boot
+        self.rng = np.random.default_rng(seed)
+        # per replicate: sum of w and of w*x per (group, metric), overall only
+        self.boot = np.zeros((2, n_boot, 2, m))
+        self.rows = 0
+
+    @property
+    def columns(self):
+        """Columns update() reads (pass to iter_file_chunks)."""
+        names = ["Completed", "Exposed_Flag", "Completion_Time"] + self.breakdowns
+        names += [metric.column for metric in self.metrics] + ([self.weights] if self.weights else [])
+        return list(dict.fromkeys(names))
+
+    def update(self, df):
+        group = _groups(df, self.time_range)
+        rows = np.flatnonzero(group >= 0)
+        group = group[rows]
+        values = np.column_stack([metric.extract(df[metric.column])[rows] for metric in self.metrics])
+        w = np.ones(len(rows)) if self.weights is None else _floats(df[self.weights])[rows]
+
+        # One grouped pass: the answered (row, metric) pairs bincounted into
+        # (joint cell, group, metric) slots, like rake_weights collapses rows
+        levels = [_level_index(df[b], sim.QUESTIONS[b].codes)[rows] for b in self.breakdowns]
+        levels = [np.where(codes < 0, size - 1, codes) for codes, size in zip(levels, self.sizes)]
+        joint = np.ravel_multi_index(levels, self.sizes) if levels else np.zeros(len(rows), dtype=np.int64)
+        m = len(self.metrics)
+        answered = ~np.isnan(values)
+        row, metric = np.nonzero(answered)
+        x, wx = values[answered], w[row]
+        slot = (joint[row] * 2 + group[row]) * m + metric
+        for k, stat in enumerate([wx, wx * x, wx * x * x, wx * wx]):
+            self.sums[k] += np.bincount(slot, weights=stat, minlength=self.sums[k].size).reshape(self.sums[k].shape)
+
+        if self.n_boot:
+            self._update_bootstrap(np.nan_to_num(values) * w[:, None], answered * w[:, None], group)
+        self.rows += len(df)
+        return self
+
+    def _update_bootstrap(self, wx, w, group, max_cells=1 << 22):
+        """Poisson bootstrap: each replicate reweights every row by a Poisson(1) draw."""
+        exposed = (group == 1)[:, None]
+        design = np.hstack([wx * ~exposed, wx * exposed, w * ~exposed, w * exposed]).astype(np.float32)
+        block = max(1, min(self.n_boot, max_cells // max(len(group), 1)))
+        m = len(self.metrics)
+        for start in range(0, self.n_boot, block):
+            stop = min(start + block, self.n_boot)
+            totals = (_poisson_weights(self.rng, (stop - start, len(group))) @ design).astype(float)
+            self.boot[1, start:stop] += totals[:, :2*m].reshape(-1, 2, m)
+            self.boot[0, start:stop] += totals[:, 2*m:].reshape(-1, 2, m)
+
+    def cell_sums(self):
+        """(4, cells, 2, metrics) sums for self.cells: the overall and per-breakdown margins."""
+        joint = self.sums.reshape((4, *self.sizes, 2, len(self.metrics)))
+        dims = tuple(range(1, len(self.sizes) + 1))
+        margins = [joint.sum(axis=dims)[:, None]]
+        for i, size in enumerate(self.sizes):
+            margin = joint.sum(axis=tuple(d for d in dims if d != i + 1))
+            margins.append(margin[:, :size - 1])  # drop the missing slot
+        return np.concatenate(margins, axis=1)
+
+    def results(self):
+        """One row per (breakdown cell, metric): group means, lift, interval, p-value."""
+        w, wx, wx2, w2 = self.cell_sums()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = wx / w
+            n_eff = w * w / w2  # Kish effective sample size (= n unweighted)
+            var = (wx2 / w - mean * mean).clip(0) * n_eff / (n_eff - 1)
+            se = np.sqrt(var / n_eff)
+        lift = mean[:, 1] - mean[:, 0]
+        lift_se = np.sqrt(se[:, 1] ** 2 + se[:, 0] ** 2)
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        # C metrics have no control answers: report the exposed level's interval
+        interval_se = np.where(np.isnan(lift), se[:, 1], lift_se)
+        center = np.where(np.isnan(lift), mean[:, 1], lift)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = lift / mean[:, 0]
+            p_value = np.array([math.erfc(abs(t) / math.sqrt(2)) if np.isfinite(t) else np.nan
+                                for t in (lift / lift_se).ravel()]).reshape(lift.shape)
+
+        n_cells, m = len(self.cells), len(self.metrics)
+        table = pd.DataFrame({
+            "breakdown": np.repeat([cell[0] for cell in self.cells], m),
+            "level": np.repeat(np.array([cell[1] for cell in self.cells], dtype=object), m),
+            "metric": np.tile([metric.name for metric in self.metrics], n_cells),
+            "n_control": np.rint(n_eff[:, 0]).ravel() if self.weights else w[:, 0].ravel(),
+            "n_exposed": np.rint(n_eff[:, 1]).ravel() if self.weights else w[:, 1].ravel(),
+            "control": mean[:, 0].ravel(),
+            "exposed": mean[:, 1].ravel(),
+            "lift": lift.ravel(),
+            "low": (center - z * interval_se).ravel(),
+            "high": (center + z * interval_se).ravel(),
+            "relative_lift": relative.ravel(),
+            "p_value": p_value.ravel(),
+        })
+        table[["n_control", "n_exposed"]] = table[["n_control", "n_exposed"]].fillna(0).astype(np.int64)
+        if self.n_boot:
+            overall = table.index[:m]
+            table["boot_low"] = table["boot_high"] = np.nan
+            table.loc[overall, "boot_low"], table.loc[overall, "boot_high"] = self._bootstrap_interval(w[0, 0] == 0)
+        return table
+
+    def _bootstrap_interval(self, no_control):
+        counts, sums = self.boot
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / counts
+        # Lift per replicate; exposed level where there is no control group
+        stat = np.where(no_control, means[:, 1], means[:, 1] - means[:, 0])
+        tail = (1 - self.confidence) / 2 * 100
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN metrics
+            return np.nanpercentile(stat, [tail, 100 - tail], axis=0)
+
+def analyze_lift(data, **options):
+    """
+    Run a LiftAnalysis over a DataFrame, an iterable of chunks (e.g.
+    iter_dataset_chunks(...)) or the path of a written panel (read with
+    iter_file_chunks). Returns the LiftAnalysis; see its results().
+    """
+    analysis = LiftAnalysis(**options)
+    if isinstance(data, (str, os.PathLike)):
+        data = iter_file_chunks(data, columns=analysis.columns)
+    for chunk in ([data] if isinstance(data, pd.DataFrame) else data):
+        analysis.update(chunk)
+    return analysis
+
+# -----------------------------------------------------------------------------
+# IN-MEMORY BOOTSTRAP
+# -----------------------------------------------------------------------------
+def bootstrap_lift(df, metrics=None, n_boot=1000, confidence=0.95, time_range=CLEAN_TIME_RANGE, seed=None,
+                   max_cells=1 << 24):
+    """
+    Resample-with-replacement bootstrap of the overall lifts, exposed and
+    control resampled separately. Each block of replicates is one
+    (replicates x respondents) index matrix gathered in a single take, so
+    there is no per-replicate Python loop; blocks keep the gathered values
+    under max_cells elements. Returns one row per metric: lift (or exposed
+    level for the C metrics), bootstrap se and percentile interval.
+    """
+    metrics = list(METRICS if metrics is None else metrics)
+    rng = np.random.default_rng(seed)
+    group = _groups(df, time_range)
+    values = np.column_stack([metric.extract(df[metric.column]) for metric in metrics])
+    point, reps = np.full((2, len(metrics)), np.nan), np.full((2, n_boot, len(metrics)), np.nan)
+    for g in (0, 1):
+        answered = ~np.isnan(values[group == g])
+        v = np.nan_to_num(values[group == g])
+        n = len(v)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            point[g] = v.sum(axis=0) / answered.sum(axis=0)
+            block = max(1, max_cells // max(n * len(metrics), 1))
+            for start in range(0, n_boot if n else 0, block):
+                index = rng.integers(0, n, (min(block, n_boot - start), n))
+                reps[g, start:start + len(index)] = v[index].sum(axis=1) / answered[index].sum(axis=1)
+    no_control = np.isnan(point[0])
+    stat = np.where(no_control, reps[1], reps[1] - reps[0])
+    tail = (1 - confidence) / 2 * 100
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN metrics
+        low, high = np.nanpercentile(stat, [tail, 100 - tail], axis=0)
+        se = np.nanstd(stat, axis=0, ddof=1)
+    return pd.DataFrame({
+        "metric": [metric.name for metric in metrics],
+        "control": point[0],
+        "exposed": point[1],
+        "lift": point[1] - point[0],
+        "se": se,
+        "boot_low": low,
+        "boot_high": high,
+    })
+
+# -----------------------------------------------------------------------------
+# OUT-OF-CORE INPUT
+# -----------------------------------------------------------------------------
+def iter_file_chunks(path, columns=None, batch_size=1_000_000):
+    """
+    Stream a written panel as DataFrames of up to batch_size rows, reading
+    only `columns`: CSV (any compression pandas infers), a Parquet / Arrow
+    IPC file with its appended segments, or a partitioned directory (opened
+    by Simulated_brandx_survey.open_dataset, as read_dataset does).
+    """
+    if ".csv" in os.path.basename(str(path)).lower():
+        yield from pd.read_csv(path, usecols=columns, chunksize=batch_size)
+        return
+    for batch in sim.open_dataset(path).to_batches(columns=columns, batch_size=batch_size):
+        yield batch.to_pandas()
+
+if __name__ == "__main__":
+    analysis = analyze_lift(sim.iter_dataset_chunks(
+        n_exposed=500_000, n_control=500_000, n_exposed_outliers=8_000,
+        n_control_outliers=7_000, n_terminated=50_000, seed=123, masks=True
+    ), n_boot=200, seed=123)
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        print(analysis.results().query("breakdown == 'overall'").to_string(index=False))
@@ -0,0 +1,292 @@
+"""
+Command-line entry point for the survey simulator.
+
+    python src/survey_cli.py -o survey.csv --seed 123                 # the classic 1,065 rows
+    python src/survey_cli.py --rows 5000000 --workers 4 -o panel.parquet
+    python src/survey_cli.py --exposed 40000 --control 40000 --terminated 2000 -o panel.csv.gz
+    python src/survey_cli.py --rows 100000000 -o panel.parquet --dry-run
+    python src/survey_cli.py --rows 200000 --scenario quebec_wave2.toml -o quebec.parquet
+
+Rows are streamed chunk by chunk (iter_dataset_chunks), so memory stays flat
+whatever --rows is. Start-up only imports the standard library: numpy,
+pandas and the simulator are loaded once there is something to generate.
+"""
+import argparse
+import os
+import sys
+import time
+
+DEFAULT_OUTPUT = "simulated_brandX_survey_dataset.csv"
+DEFAULT_CHUNK_SIZE = 100_000
+
+# generate_dataset's quota mix, scaled by --rows
+DEFAULT_MIX = {"exposed": 500, "control": 500, "exposed_outliers": 8, "control_outliers": 7, "terminated": 50}
+GROUP_OPTIONS = ["exposed", "control", "natural", "exposed_outliers", "control_outliers", "terminated"]
+
+# File suffix => (format, compression)
+SUFFIXES = {
+    ".csv": ("csv", None),
+    ".csv.gz": ("csv", "gzip"),
+    ".csv.bz2": ("csv", "bz2"),
+    ".csv.xz": ("csv", "xz"),
+    ".parquet": ("parquet", None),
+    ".pq": ("parquet", None),
+    ".arrow": ("arrow", None),
+    ".feather": ("arrow", None),
+    ".ipc": ("arrow", None)
+}
+
+# Format => the --compression codecs its writer accepts
+COMPRESSIONS = {
+    "csv": {"gzip", "bz2", "xz"},
+    "parquet": {"none", "snappy", "gzip", "brotli", "zstd", "lz4"},
+    "arrow": {"lz4", "zstd"}
+}
+
+# Rough single-core figures for the dry-run estimate per format and codec
+# (None = the writer's default: plain CSV, snappy Parquet, plain Arrow),
+# measured on 200k-row streams with default dtypes for CSV, compact for
+# Parquet/Arrow
+ESTIMATES = {
+    "csv": {
+        None: {"bytes_per_row": 258, "rows_per_sec": 24_000},
+        "gzip": {"bytes_per_row": 38, "rows_per_sec": 6_300},
+        "bz2": {"bytes_per_row": 20, "rows_per_sec": 10_700},
+        "xz": {"bytes_per_row": 25, "rows_per_sec": 2_400}
+    },
+    "parquet": {
+        None: {"bytes_per_row": 35, "rows_per_sec": 97_000},
+        "snappy": {"bytes_per_row": 35, "rows_per_sec": 97_000},
+        "none": {"bytes_per_row": 62, "rows_per_sec": 116_000},
+        "gzip": {"bytes_per_row": 26, "rows_per_sec": 30_000},
+        "brotli": {"bytes_per_row": 25, "rows_per_sec": 63_000},
+        "zstd": {"bytes_per_row": 27, "rows_per_sec": 97_000},
+        "lz4": {"bytes_per_row": 35, "rows_per_sec": 106_000}
+    },
+    "arrow": {
+        None: {"bytes_per_row": 152, "rows_per_sec": 129_000},
+        "lz4": {"bytes_per_row": 65, "rows_per_sec": 108_000},
+        "zstd": {"bytes_per_row": 33, "rows_per_sec": 110_000}
+    }
+}
+
+# -----------------------------------------------------------------------------
+# ARGUMENTS
+# -----------------------------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="survey_cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    size = parser.add_argument_group("respondents")
+    size.add_argument("--rows", type=int,
+                      help="total respondents, split in the 500/500/8/7/50 mix of the classic dataset (default 1065)")
+    for name in GROUP_OPTIONS:
+        size.add_argument(f"--{name.replace('_', '-')}", type=int, metavar="N",
+                          help=f"number of {name.replace('_', ' ')} respondents (overrides --rows for this group)")
+
+    run = parser.add_argument_group("generation")
+    run.add_argument("--seed", type=int, help="seed for a reproducible dataset (default: fresh entropy)")
+    run.add_argument("--workers", type=int, default=1, help="worker processes (0 = one per CPU, default 1)")
+    run.add_argument("--chunk-size", type=int,
+                     help=f"rows per streamed chunk (default {DEFAULT_CHUNK_SIZE})")
+    run.add_argument("--compact", action=argparse.BooleanOptionalAction, default=None,
+                     help="compact dtypes (default: on for Parquet/Arrow, off for CSV)")
+    run.add_argument("--masks", action="store_true", help="keep multi-select answers as integer bitmasks")
+    run.add_argument("--scenario", metavar="FILE",
+                     help="scenario profile (.json/.toml/.yaml) overriding the answer distributions")
+
+    out = parser.add_argument_group("output")
+    out.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help=f"output path (default {DEFAULT_OUTPUT})")
+    out.add_argument("--format", choices=sorted(COMPRESSIONS), help="output format (default: from the file suffix)")
+    out.add_argument("--compression",
+                     help="csv: gzip/bz2/xz; parquet: snappy/zstd/gzip/brotli/lz4/none; arrow: lz4/zstd")
+    out.add_argument("--partition-by", nargs="+", metavar="COLUMN", help="hive-partition Parquet/Arrow output")
+    out.add_argument("--manifest", action="store_true", help="write the sidecar manifest that --append needs")
+    out.add_argument("--append", action="store_true",
+                     help="append the new respondents to an existing output written with --manifest")
+    out.add_argument("--dry-run", action="store_true", help="print the plan and a size/time estimate, generate nothing")
+    out.add_argument("-q", "--quiet", action="store_true", help="no progress display")
+    return parser
+
+def resolve_quotas(args):
+    """Per-group counts: --rows scaled over DEFAULT_MIX (largest remainder), then explicit overrides."""
+    quotas = dict.fromkeys(GROUP_OPTIONS, 0)
+    explicit = {name: getattr(args, name) for name in GROUP_OPTIONS if getattr(args, name) is not None}
+    if args.rows is not None or not explicit:
+        total = 1065 if args.rows is None else args.rows
+        scale = total / sum(DEFAULT_MIX.values())
+        shares = {name: count * scale for name, count in DEFAULT_MIX.items()}
+        quotas.update({name: int(share) for name, share in shares.items()})
+        by_remainder = sorted(shares, key=lambda name: shares[name] - int(shares[name]), reverse=True)
+        for name in by_remainder[:total - sum(quotas.values())]:
+            quotas[name] += 1
+    quotas.update(explicit)
+    if any(count < 0 for count in quotas.values()):
+        raise ValueError("respondent counts must not be negative")
+    return quotas
+
+def resolve_format(args):
+    """(format, compression) from --format/--compression, else from the output suffix."""
+    path = args.output.lower()
+    suffix = max((s for s in SUFFIXES if path.endswith(s)), key=len, default=None)
+    file_format, compression = SUFFIXES.get(suffix, (None, None))
+    file_format = args.format or file_format
+    if file_format is None:
+        raise ValueError(f"can't tell the format of {args.output}; pass --format")
+    compression = args.compression or (compression if file_format == "csv" else None)
+    if compression is not None and compression not in COMPRESSIONS[file_format]:
+        raise ValueError(f"--compression for {file_format} must be one of {sorted(COMPRESSIONS[file_format])}")
+    return file_format, compression
+
+# -----------------------------------------------------------------------------
+# PROGRESS & ESTIMATES
+# -----------------------------------------------------------------------------
+def _duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+def _size(n_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n_bytes < 1024:
+            return f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} TB"
+
+class Progress:
+    """Writer `progress` callback: one self-overwriting status line on stderr."""
+
+    def __init__(self, total, stream=sys.stderr, interval=0.5):
+        self.total = max(total, 1)
+        self.stream = stream
+        self.interval = interval
+        self.start = self.last = time.perf_counter()
+        self.drawn = False
+
+    def __call__(self, done):
+        now = time.perf_counter()
+        if now - self.last < self.interval and done < self.total:
+            return
+        self.last = now
+        rate = done / max(now - self.start, 1e-9)
+        eta = (self.total - done) / rate if rate else 0
+        self.stream.write(
+            f"\r{done:>14,} / {self.total:,} rows {done / self.total:6.1%}  "
+            f"{rate:,.0f} rows/s  ETA {_duration(eta)} "
+        )
+        self.stream.flush()
+        self.drawn = True
+
+    def close(self):
+        """End the status line, if one was drawn."""
+        if self.drawn:
+            self.stream.write("\n")
+            self.stream.flush()
+            self.drawn = False
+
+def estimate(n_rows, file_format, workers, compression=None):
+    """(bytes, seconds) rough estimate from ESTIMATES, spread over the workers."""
+    figures = ESTIMATES[file_format][compression]
+    parallel = max(1, min(workers or os.cpu_count() or 1, os.cpu_count() or 1))
+    return n_rows * figures["bytes_per_row"], n_rows / (figures["rows_per_sec"] * parallel)
+
+# -----------------------------------------------------------------------------
+# MAIN
+# -----------------------------------------------------------------------------
+def _simulator():
+    """Import the simulator (and with it numpy/pandas) only when needed."""
+    try:
+        from . import Simulated_brandx_survey as sim
+    except ImportError:
+        import Simulated_brandx_survey as sim
+    return sim
+
+def _write_errors():
+    """ValueError/OSError, plus pyarrow's own errors once a writer has loaded it."""
+    pyarrow = sys.modules.get("pyarrow")
+    return (ValueError, OSError) + ((pyarrow.ArrowException,) if pyarrow else ())
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.append:
+        # The manifest fixes everything about the output but the new quotas
+        fixed = {
+            "--seed": args.seed is not None,
+            "--compact": args.compact is not None,
+            "--masks": args.masks,
+            "--scenario": args.scenario is not None,
+            "--format": args.format is not None,
+            "--compression": args.compression is not None,
+            "--chunk-size": args.chunk_size is not None,
+            "--partition-by": bool(args.partition_by)
+        }
+        given = [option for option, passed in fixed.items() if passed]
+        if given:
+            parser.error(f"--append takes {', '.join(given)} from the manifest")
+    try:
+        quotas = resolve_quotas(args)
+        file_format, compression = resolve_format(args)
+    except ValueError as exc:
+        parser.error(str(exc))
+    chunk_size = DEFAULT_CHUNK_SIZE if args.chunk_size is None else args.chunk_size
+    if chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    if args.partition_by and file_format == "csv":
+        parser.error("--partition-by needs Parquet or Arrow output")
+    n_rows = sum(quotas.values())
+
+    if args.dry_run:
+        n_bytes, seconds = estimate(n_rows, file_format, args.workers, compression)
+        print(f"Would write {n_rows:,} respondents to {args.output} ({file_format}"
+              f"{', ' + compression if compression else ''}{', append' if args.append else ''})")
+        for name, count in quotas.items():
+            if count:
+                print(f"  {name:18s} {count:>14,}")
+        print(f"  {'chunks':18s} {-(-n_rows // chunk_size):>14,} of up to {chunk_size:,} rows")
+        print(f"Estimated size: ~{_size(n_bytes)}; time: ~{_duration(seconds)}")
+        return 0
+
+    sim = _simulator()
+    scenario = None
+    if args.scenario and not args.append:
+        try:
+            scenario = sim.load_scenario(args.scenario)
+        except (OSError, ValueError) as exc:
+            parser.error(f"--scenario: {exc}")
+    options = {f"n_{name}": count for name, count in quotas.items()}
+    options.update(n_workers=args.workers or None)
+    progress = None if args.quiet else Progress(n_rows)
+    start = time.perf_counter()
+    try:
+        if args.append:
+            written = sim.append_dataset(args.output, progress=progress, **options)
+        else:
+            options.update(
+                seed=args.seed, masks=args.masks, chunk_size=chunk_size,
+                manifest=args.manifest, compression=compression, progress=progress,
+                scenario=scenario
+            )
+            if args.compact is not None:
+                options["compact"] = args.compact
+            if file_format == "csv":
+                written = sim.write_dataset_csv(args.output, **options)
+            else:
+                writer = sim.write_dataset_parquet if file_format == "parquet" else sim.write_dataset_arrow
+                written = writer(args.output, partition_cols=args.partition_by, **options)
+    except _write_errors() as exc:
+        if progress is not None:
+            progress.close()
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if progress is not None:
+            progress.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {written:,} respondents to {args.output} in {_duration(elapsed)} "
+          f"({written / max(elapsed, 1e-9):,.0f} rows/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Monte Carlo power analysis for BrandX ad-effect studies.
+
+Sizes a study by simulating many replicate panels at a given exposure effect
+size (see Simulated_brandx_survey.EXPOSURE_EFFECT: 1 = the simulator's
+built-in effect, 0 = none) and counting how often an exposed vs. control
+test on each brand metric comes out significant:
+
+    curves = power_curve([100, 250, 500, 1000], effects=[0.25, 0.5, 1.0], seed=1)
+
+Only the columns the tested metrics depend on are simulated (A6 chip-eating
+frequency => B1 BrandX mention => B3/B4/B5), with the same batch samplers as
+the full generator. A block of replicates is one flat batch of
+replicates x respondents draws reshaped to a (replicate, respondent) matrix,
+so there is no per-replicate Python loop and no DataFrame; blocks are
+independent tasks with their own seed and can run across cores.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import Simulated_brandx_survey as sim
+except ImportError:
+    import Simulated_brandx_survey as sim
+
+# -----------------------------------------------------------------------------
+# METRICS
+# Same names as survey_analytics.METRICS; value(ratings) => float matrix.
+# -----------------------------------------------------------------------------
+POWER_METRICS = {
+    "B1_BrandX_unaided": lambda r: r["brandx_in_b1"].astype(float),
+    "B3_Familiarity_BrandX": lambda r: r["b3"].astype(float),
+    "B3_top2": lambda r: (r["b3"] >= 4).astype(float),
+    "B4_Consideration_BrandX": lambda r: r["b4"].astype(float),
+    "B4_top2": lambda r: (r["b4"] >= 4).astype(float),
+    "B5_Recommendation_BrandX": lambda r: r["b5"].astype(float),
+    "B5_top2": lambda r: (r["b5"] >= 9).astype(float),
+}
+ALTERNATIVES = ("two-sided", "greater")
+
+# -----------------------------------------------------------------------------
+# REPLICATE PANELS
+# -----------------------------------------------------------------------------
+def simulate_replicates(n_replicates, n_exposed, n_control, effect=sim.EXPOSURE_EFFECT, rng=None, scenario=None):
+    """
+    Brand answers of n_replicates independent panels of n_exposed exposed and
+    n_control control (clean, non-outlier) completes. Returns {"brandx_in_b1",
+    "b3", "b4", "b5"}: (n_replicates, n_exposed + n_control) matrices, the
+    exposed respondents in the first n_exposed columns. `scenario` overrides
+    the answer distributions (see Simulated_brandx_survey.load_scenario).
+    """
+    sim._check_effect(effect)
+    rng = sim._as_generator(rng)
+    scenario = sim.as_scenario(scenario)
+    n = n_exposed + n_control
+    exposed = np.tile(np.arange(n) < n_exposed, n_replicates)
+    # Only the first A6 item feeds B1 ("frequent chip eater"); its marginal
+    # is the same whether or not the other five items are drawn
+    first_snack = scenario.samplers["snack_not_never"].draw(rng, len(exposed))
+    _, brandx_in_b1 = sim.sample_b1_brands(
+        exposed, np.isin(first_snack, [1,2]), rng=rng, effect=effect, scenario=scenario
+    )
+    b3, b4, b5 = sim.simulate_brandx_ratings_batch(exposed, brandx_in_b1, rng=rng, effect=effect, scenario=scenario)
+    shape = (n_replicates, n)
+    return {
+        "brandx_in_b1": brandx_in_b1.reshape(shape),
+        "b3": b3.reshape(shape),
+        "b4": b4.reshape(shape),
+        "b5": b5.reshape(shape),
+    }
+
+def replicate_tests(ratings, n_exposed, metrics=None):
+    """
+    Welch (normal-approximation) z statistic of exposed - control for every
+    replicate and metric, plus the lift itself: returns (z, lift), each
+    (replicates, metrics). A metric with no variance in either group gets
+    z = 0 (no lift) or +/-inf.
+    """
+    metrics = list(POWER_METRICS if metrics is None else metrics)
+    values = np.stack([POWER_METRICS[name](ratings) for name in metrics], axis=-1)
+    exposed, control = values[:, :n_exposed], values[:, n_exposed:]
+    lift = exposed.mean(axis=1) - control.mean(axis=1)
+    se = np.sqrt(exposed.var(axis=1, ddof=1) / exposed.shape[1] + control.var(axis=1, ddof=1) / control.shape[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(se > 0, lift / se, np.sign(lift) * np.inf)
+    return np.nan_to_num(z, nan=0.0, posinf=np.inf, neginf=-np.inf), lift
+
+def _run_block(task, metrics, alpha, alternative):
+    """
+    Simulate and test one block of replicates; returns (rejections, lift
+    sums) per metric. Module-level so worker processes can run it.
+    """
+    n_replicates, n_exposed, n_control, effect, seed, scenario = task
+    ratings = simulate_replicates(
+        n_replicates, n_exposed, n_control, effect, rng=np.random.default_rng(seed), scenario=scenario
+    )
+    z, lift = replicate_tests(ratings, n_exposed, metrics)
+    if alternative == "greater":
+        rejected = z > NormalDist().inv_cdf(1 - alpha)
+    else:
+        rejected = np.abs(z) > NormalDist().inv_cdf(1 - alpha / 2)
+    return rejected.sum(axis=0), lift.sum(axis=0)
+
+# -----------------------------------------------------------------------------
+# POWER CURVES
+# -----------------------------------------------------------------------------
+def power_curve(
+    sample_sizes,
+    effects=(sim.EXPOSURE_EFFECT,),
+    n_replicates=1000,
+    control_ratio=1.0,
+    alpha=0.05,
+    alternative="two-sided",
+    metrics=None,
+    seed=None,
+    n_workers=1,
+    max_cells=1 << 22,
+    scenario=None
+):
+    """
+    Detection power per (effect size, sample size, metric). sample_sizes are
+    exposed completes per study; each study has round(control_ratio * n)
+    control completes. alternative="greater" tests for a positive lift only.
+
+    Returns one row per (effect, n_exposed, metric): n_control, power (share
+    of the n_replicates studies with a significant lift), its Monte Carlo
+    interval (+/- 1.96 binomial se) and the mean simulated lift. effect=0
+    rows estimate the false-positive rate, which should sit near alpha.
+
+    Replicates are simulated in blocks of at most max_cells respondents, each
+    with its own Generator spawned from SeedSequence(seed), so a seed gives
+    the same curves whatever n_workers is (None = one per CPU). `scenario`
+    simulates another market or wave (a Scenario, profile dict or file).
+    """
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"alternative must be one of {ALTERNATIVES}, got {alternative!r}")
+    if not 0 < alpha < 1:
+        raise ValueError("alpha must be between 0 and 1")
+    metrics = list(POWER_METRICS if metrics is None else metrics)
+    unknown = sorted(set(metrics) - set(POWER_METRICS))
+    if unknown:
+        raise ValueError(f"unknown metrics: {unknown}")
+    for effect in effects:
+        sim._check_effect(effect)
+    scenario = sim.as_scenario(scenario)
+
+    designs = []
+    for effect in effects:
+        for n_exposed in sample_sizes:
+            n_control = int(round(control_ratio * n_exposed))
+            if n_exposed < 2 or n_control < 2:
+                raise ValueError("every group needs at least 2 respondents")
+            designs.append((effect, n_exposed, n_control))
+
+    # One task per block of replicates; the plan never depends on n_workers
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    tasks, owner = [], []
+    for d, ((effect, n_exposed, n_control), design_seq) in enumerate(zip(designs, seed_seq.spawn(len(designs)))):
+        block = max(1, max_cells // (n_exposed + n_control))
+        sizes = [min(block, n_replicates - start) for start in range(0, n_replicates, block)]
+        for size, block_seq in zip(sizes, design_seq.spawn(len(sizes))):
+            tasks.append((size, n_exposed, n_control, effect, block_seq, scenario))
+            owner.append(d)
+
+    run = partial(_run_block, metrics=metrics, alpha=alpha, alternative=alternative)
+    n_workers = n_workers or os.cpu_count()
+    if n_workers == 1:
+        results = list(map(run, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(run, tasks))
+    rejections = np.zeros((len(designs), len(metrics)))
+    lift_sums = np.zeros((len(designs), len(metrics)))
+    for d, (rejected, lift) in zip(owner, results):
+        rejections[d] += rejected
+        lift_sums[d] += lift
+
+    power = rejections / n_replicates
+    mc_se = np.sqrt(power * (1 - power) / n_replicates)
+    m = len(metrics)
+    return pd.DataFrame({
+        "effect": np.repeat([design[0] for design in designs], m),
+        "n_exposed": np.repeat([design[1] for design in designs], m),
+        "n_control": np.repeat([design[2] for design in designs], m),
+        "metric": np.tile(metrics, len(designs)),
+        "power": power.ravel(),
+        "power_low": (power - 1.96 * mc_se).clip(0, 1).ravel(),
+        "power_high": (power + 1.96 * mc_se).clip(0, 1).ravel(),
+        "mean_lift": (lift_sums / n_replicates).ravel(),
+    })
+
+def required_sample_size(curves, power=0.8):
+    """
+    Smallest simulated n_exposed reaching `power`, per (effect, metric), from
+    a power_curve() table (NaN where no simulated size gets there).
+    """
+    reached = curves[curves["power"] >= power]
+    sizes = reached.groupby(["effect", "metric"])["n_exposed"].min()
+    index = pd.MultiIndex.from_frame(curves[["effect", "metric"]].drop_duplicates())
+    return sizes.reindex(index).astype("Int64").rename("n_exposed").reset_index()
+
+if __name__ == "__main__":
+    curves = power_curve(
+        [50, 100, 200, 400, 800], effects=[0.0, 0.25, 0.5, 1.0], n_replicates=2000, seed=123, n_workers=None
+    )
+    with pd.option_context("display.width", 160, "display.max_rows", 200):
+        print(curves.pivot_table(index=["effect", "metric"], columns="n_exposed", values="power").round(3))
+        print(required_sample_size(curves).to_string(index=False))
@@ -0,0 +1,463 @@
+"""
+Distribution-fidelity checks for generated panels.
+
+Confirms that a generated dataset still matches the probabilities hard-coded
+in Simulated_brandx_survey (the SAMPLERS tables and the nudge rules on top of
+them): demographic marginals, the termination split, the B3/B4 skews after
+adjust_brandx_ratings, C1 recall by viewing frequency, the D2/D3 nudges, ...
+
+Counts are accumulated chunk by chunk with grouped bincounts, so a 10M-row
+build can be checked in one streaming pass:
+
+    validator = FidelityValidator()
+    for chunk in iter_dataset_chunks(..., masks=True):
+        validator.update(chunk)
+    print(validator.report())
+
+Each check is a chi-square goodness-of-fit test per conditioning cell. A check
+fails only if the deviation is both significant (p < alpha) and larger than
+`tolerance` in absolute share: on very large panels any tiny systematic
+difference is significant, on small ones the shares are noisy.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import Simulated_brandx_survey as sim
+except ImportError:
+    import Simulated_brandx_survey as sim
+
+# -----------------------------------------------------------------------------
+# EXPECTED DISTRIBUTIONS
+# Everything below is derived from sim.SAMPLERS (or a scenario's samplers)
+# and the module's nudge rules.
+# -----------------------------------------------------------------------------
+def _probs(name, samplers=sim.SAMPLERS):
+    return samplers[name].probs
+
+def _uniform(k):
+    return np.full(k, 1.0 / k)
+
+def _bump(p, rate):
+    """Distribution of a 1..5 code after "if < 5, +1 with probability rate"."""
+    q = p * (1 - rate)
+    q[1:] += p[:-1] * rate
+    q[-1] += p[-1] * rate
+    return q
+
+def _b3_b4_expected(p3, p4, brandx, exposed):
+    """
+    Exact B3 and B4 marginals after adjust_brandx_ratings, pushing the joint
+    (B3, B4) distribution through its steps.
+    """
+    joint = np.outer(p3, p4)
+
+    def move(joint, f):
+        out = np.zeros_like(joint)
+        for i in range(5):
+            for j in range(5):
+                for (a, b), w in f(i, j):
+                    out[a, b] += joint[i, j] * w
+        return out
+
+    joint = move(joint, lambda i, j: [((i, max(i, j)), 1.0)])
+    if brandx:
+        joint = move(joint, lambda i, j: [((min(i+1, 4), min(j+1, 4)), 1.0)])
+    if exposed:
+        def bump(i, j):
+            steps_i = [(i, 0.5), (i+1, 0.5)] if i < 4 else [(i, 1.0)]
+            steps_j = [(j, 0.5), (j+1, 0.5)] if j < 4 else [(j, 1.0)]
+            return [((a, b), wa * wb) for a, wa in steps_i for b, wb in steps_j]
+        joint = move(joint, bump)
+    joint = move(joint, lambda i, j: [((i, max(i, j)), 1.0)])
+    return joint.sum(axis=1), joint.sum(axis=0)
+
+def _d_nudged(base, primary_shopper, has_kids):
+    """D2/D3 after the D1=1 (50%) and D7=1 (30%) "set to 1 or 2" nudges."""
+    p = base.copy()
+    target = np.zeros_like(p)
+    target[:2] = 0.5
+    for applies, rate in ((primary_shopper, 0.5), (has_kids, 0.3)):
+        if applies:
+            p = (1 - rate) * p + rate * target
+    return p
+
+# -----------------------------------------------------------------------------
+# PER-CHUNK DERIVED ARRAYS
+# Works on the default, compact (Categorical / Int8) and masks=True outputs.
+# -----------------------------------------------------------------------------
+_TERMINATION = ["A1", "A6", "MidSurvey", "Completed"]
+_PROVINCES = [sim.PROVINCE_MAPPING[c] for c in range(1, 14)]
+
+def _floats(series):
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+def _ints(series):
+    """Integer answer codes, -1 where not answered."""
+    return np.nan_to_num(_floats(series), nan=-1).astype(np.int64)
+
+def _category_codes(series, categories):
+    """Index into `categories` (-1 if missing / unknown) for a text column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.set_categories(categories).cat.codes.to_numpy()
+    # Few distinct values: map the uniques, not every row
+    codes, uniques = pd.factorize(series)
+    lookup = np.array([categories.index(u) if u in categories else -1 for u in uniques] + [-1])
+    return lookup[codes]
+
+def _index(values, codes):
+    """Position of each integer value in `codes` (-1 if missing / not a code)."""
+    table = np.full(max(codes) + 2, -1)
+    table[list(codes)] = np.arange(len(codes))
+    return table[np.clip(values, 0, len(table) - 1)]
+
+_mask_values = sim.multi_select_values  # uint64 bitmasks (0 = not asked), from either form
+
+def _popcount(masks):
+    """Number of set bits per uint64 mask."""
+    return np.unpackbits(masks.view(np.uint8)).reshape(len(masks), 64).sum(axis=1)
+
+def _c5_items(series):
+    """(n, 6) Likert items of the C5 grid (0 where not asked)."""
+    return sim.multi_select_matrix(series).astype(np.int64)
+
+def _tv_expected(exposure):
+    """
+    TV_Channel_C/D/E shares within the exposed (A or B watched) and control
+    sides of `exposure`'s joint: whichever group a row was drawn for, its
+    channels given its side follow the joint restricted to that side.
+    """
+    joint = exposure.joint
+    exposed = sim._exposed(np.stack(np.indices(joint.shape), axis=-1) + 1)
+    expected = []
+    for axis in range(2, len(sim.TV_CHANNELS)):
+        others = tuple(a for a in range(joint.ndim) if a != axis)
+        for side in (exposed, ~exposed):
+            # Sides with zero weight are never drawn; any share vector will do
+            shares = np.where(side, joint, 0).sum(axis=others)
+            expected.append(shares / shares.sum() if shares.sum() > 0 else _uniform(5))
+    return np.array(expected)
+
+def _derive(df):
+    """Arrays shared by the checks, computed once per chunk."""
+    tp = _category_codes(df["Termination_Point"], _TERMINATION)
+    completed = tp == 3
+    time = _floats(df["Completion_Time"])
+    # Outliers are forced to extreme times, strictly outside the clean range
+    low, high = sim.CLEAN_COMPLETION_TIME
+    outlier = completed & ((time < low) | (time > high))
+    exposed_flag = _ints(df["Exposed_Flag"]) == 1
+    clean = completed & ~outlier
+    b1 = _mask_values(df["B1_Unaided_BrandAwareness"])
+    b2 = _mask_values(df["B2_Aided_BrandAwareness"])
+    d = {name: _ints(df[name]) for name in [
+        "A2_gender", "A3_age", "TV_Channel_A", "TV_Channel_B", "TV_Channel_C", "TV_Channel_D",
+        "TV_Channel_E", "B3_Familiarity_BrandX", "B4_Consideration_BrandX", "C1_Ad_Recall_Pre",
+        "C2_Ad_Source", "C3_Ad_Recall_Post", "C4_Ad_Enjoyment", "C7_Key_Message_Aided",
+        "D1_Grocery_Shopper_Role", "D2_Snack_Purchase_Frequency", "D3_Weekly_Snack_Spend",
+        "D4_Employment_Status", "D5_Education_Level", "D6_Marital_Status", "D7_Children",
+        "D9_Community_Type", "D10_Household_Income"
+    ] + sim.A6_COLUMNS}
+    d.update(
+        tp=tp,
+        terminated=(tp >= 0) & (tp < 3),
+        completed=completed,
+        screened=(tp >= 1),
+        mid=tp == 2,
+        province=_category_codes(df["A4_province"], _PROVINCES),
+        exposed_clean=clean & exposed_flag,
+        control_clean=clean & ~exposed_flag,
+        clean=clean,
+        brandx=(b1 >> np.uint64(sim.BRANDX_INDEX) & np.uint64(1)) == 1,
+        b1_count=_popcount(b1),
+        b2=b2,
+        b2_count=_popcount(b2 & np.uint64(0x7F)),
+        d8_count=_popcount(_mask_values(df["D8_Children_Age"])),
+        c5=_c5_items(df["C5_Ad_Attitudes"]),
+    )
+    return d
+
+# -----------------------------------------------------------------------------
+# CHECKS
+# extract(d) => (cell, code) index arrays; -1 in either drops the row.
+# expected is a (n_cells, n_codes) matrix of probabilities.
+# -----------------------------------------------------------------------------
+FidelityCheck = namedtuple("FidelityCheck", ["name", "description", "cells", "expected", "extract"])
+
+def _only(mask, values, codes):
+    """Single-cell check: code index where mask holds, else -1."""
+    code = _index(values, codes)
+    return np.where(mask, 0, -1), code
+
+def _marginal(name, description, column, sampler, audience="completed", samplers=sim.SAMPLERS):
+    codes = samplers[sampler].codes
+    return FidelityCheck(
+        name, description, ["all"], _probs(sampler, samplers)[None, :],
+        lambda d: _only(d[audience], d[column], codes)
+    )
+
+def _by_cell(values, cell_masks, codes):
+    cell = np.full(len(values), -1)
+    for c, mask in enumerate(cell_masks):
+        cell[mask] = c
+    return cell, _index(values, codes)
+
+def _b3_b4_check(column, which, samplers=sim.SAMPLERS):
+    groups = [("exposed", "b3_exposed", "b4_exposed", True),
+              ("control", "b3_control", "b4_control", False),
+              ("midsurvey", "b3_control", "b4_control", False)]
+    labels, expected = [], []
+    for group, s3, s4, exposed in groups:
+        for brandx in (False, True):
+            labels.append(f"{group}, BrandX in B1={int(brandx)}")
+            expected.append(_b3_b4_expected(_probs(s3, samplers), _probs(s4, samplers), brandx, exposed)[which])
+
+    def extract(d):
+        masks = []
+        for audience in ("exposed_clean", "control_clean", "mid"):
+            masks += [d[audience] & ~d["brandx"], d[audience] & d["brandx"]]
+        return _by_cell(d[column], masks, (1,2,3,4,5))
+    return FidelityCheck(
+        column, f"{column} skew after adjust_brandx_ratings, by group and BrandX mention",
+        labels, np.array(expected), extract
+    )
+
+def _c_check(column, description, labels, expected, masks, codes):
+    return FidelityCheck(column, description, labels, np.array(expected),
+                         lambda d: _by_cell(d[column], masks(d), codes))
+
+def _d_nudge_check(column, sampler, samplers=sim.SAMPLERS):
+    labels, expected = [], []
+    for shopper in (False, True):
+        for kids in (False, True):
+            labels.append(f"D1=1:{int(shopper)}, D7=1:{int(kids)}")
+            expected.append(_d_nudged(_probs(sampler, samplers), shopper, kids))
+
+    def extract(d):
+        primary, kids = d["D1_Grocery_Shopper_Role"] == 1, d["D7_Children"] == 1
+        done = d["completed"]
+        return _by_cell(d[column], [done & ~primary & ~kids, done & ~primary & kids,
+                                    done & primary & ~kids, done & primary & kids], (1,2,3,4,5,6))
+    return FidelityCheck(column, f"{column} with the D1 / D7 nudges", labels, np.array(expected), extract)
+
+def _c5_extract(d):
+    rows = d["exposed_clean"]
+    positive = d["C4_Ad_Enjoyment"] >= 4
+    cell = np.where(rows, positive.astype(int), -1)
+    items = d["c5"]
+    return np.repeat(cell, items.shape[1]), _index(items.ravel(), (1,2,3,4,5))
+
+def _a6_extract(d):
+    rows = d["completed"] | d["mid"]
+    values = np.concatenate([d[name] for name in sim.A6_COLUMNS])
+    return np.tile(np.where(rows, 0, -1), len(sim.A6_COLUMNS)), _index(values, (1,2,3,4,5))
+
+def _tv_extract(d):
+    values = np.concatenate([d[f"TV_Channel_{c}"] for c in "CDE"])
+    side = np.where(d["screened"], np.where((d["TV_Channel_A"] < 5) | (d["TV_Channel_B"] < 5), 0, 1), -1)
+    cells = [np.where(side >= 0, 2 * j + side, -1) for j in range(3)]
+    return np.concatenate(cells), _index(values, (1,2,3,4,5))
+
+def build_checks(scenario=None, exposure=None):
+    """
+    The fidelity checks against a scenario's distributions (a Scenario,
+    profile dict or profile file) and an ExposureModel's TV viewing;
+    None = the module defaults (both None gives CHECKS).
+    """
+    samplers = sim.as_scenario(scenario).samplers
+    probs = lambda name: _probs(name, samplers)
+    attitude = probs("attitude")
+    return [
+        FidelityCheck(
+            "Termination_Point", "A1/A6/MidSurvey split of terminated respondents",
+            ["terminated"], probs("termination_point")[None, :],
+            lambda d: (np.where(d["terminated"], 0, -1), d["tp"])
+        ),
+        _marginal("A2_gender", "pick_gender shares", "A2_gender", "gender", "screened", samplers=samplers),
+        _marginal("A3_age", "pick_age shares", "A3_age", "age", "screened", samplers=samplers),
+        FidelityCheck(
+            "A4_province", "pick_province shares", ["all"], probs("province")[None, :],
+            lambda d: (np.where(d["screened"], 0, -1), d["province"])
+        ),
+        FidelityCheck(
+            "TV_Channel_CDE", "channels C/D/E by exposure side, from the exposure model's joint",
+            [f"{channel}, {side}" for channel in "CDE" for side in ("exposed", "control")],
+            _tv_expected(exposure or sim.EXPOSURE), _tv_extract
+        ),
+        FidelityCheck(
+            "A6", "snack frequencies (never excluded) for qualified respondents",
+            ["all"], probs("snack_not_never")[None, :], _a6_extract
+        ),
+        FidelityCheck(
+            "B1_count", "number of unaided brand mentions", ["all"], probs("b1_num_brands")[None, :],
+            lambda d: (np.where(d["completed"] | d["mid"], 0, -1), _index(d["b1_count"], (1,2,3)))
+        ),
+        FidelityCheck(
+            "B2_count", "number of aided brands selected (excluding Other)", ["all"],
+            probs("b2_num_selected")[None, :],
+            lambda d: (np.where(d["completed"] | d["mid"], 0, -1), _index(d["b2_count"], (2,3,4)))
+        ),
+        FidelityCheck(
+            "B2_other", "10% select Other in B2", ["all"], np.array([[0.9, 0.1]]),
+            lambda d: (np.where(d["completed"] | d["mid"], 0, -1),
+                       (d["b2"] >> np.uint64(7) & np.uint64(1)).astype(int))
+        ),
+        _b3_b4_check("B3_Familiarity_BrandX", 0, samplers),
+        _b3_b4_check("B4_Consideration_BrandX", 1, samplers),
+        _c_check(
+            "C1_Ad_Recall_Pre", "ad recall by channel A/B viewing frequency",
+            ["frequent viewer", "other"], [probs("c1_frequent_viewer"), probs("c1_other")],
+            lambda d: [d["exposed_clean"] & (np.isin(d["TV_Channel_A"], [1,2]) | np.isin(d["TV_Channel_B"], [1,2])),
+                       d["exposed_clean"] & ~(np.isin(d["TV_Channel_A"], [1,2]) | np.isin(d["TV_Channel_B"], [1,2]))],
+            (1,2,3)
+        ),
+        _c_check(
+            "C2_Ad_Source", "ad source uniform over 1..9 when C1=1", ["C1=1"], [_uniform(9)],
+            lambda d: [d["exposed_clean"] & (d["C1_Ad_Recall_Pre"] == 1)], tuple(range(1,10))
+        ),
+        _c_check(
+            "C3_Ad_Recall_Post", "post recall: 1 when C1=1, else the not-recalled split",
+            ["C1=1", "C1!=1"], [[1.0, 0.0, 0.0], probs("c3_not_recalled")],
+            lambda d: [d["exposed_clean"] & (d["C1_Ad_Recall_Pre"] == 1),
+                       d["exposed_clean"] & (d["C1_Ad_Recall_Pre"] != 1)],
+            (1,2,3)
+        ),
+        _c_check(
+            "C4_Ad_Enjoyment", "more positive when B4>=4 or C1=1",
+            ["B4>=4 or C1=1", "other"], [probs("c4_positive"), probs("c4_other")],
+            lambda d: [d["exposed_clean"] & ((d["B4_Consideration_BrandX"] >= 4) | (d["C1_Ad_Recall_Pre"] == 1)),
+                       d["exposed_clean"] & ~((d["B4_Consideration_BrandX"] >= 4) | (d["C1_Ad_Recall_Pre"] == 1))],
+            (1,2,3,4,5)
+        ),
+        FidelityCheck(
+            "C5_Ad_Attitudes", "attitude items, nudged up when C4>=4",
+            ["C4<4", "C4>=4"], np.array([attitude, _bump(attitude, 0.6)]), _c5_extract
+        ),
+        _c_check(
+            "C7_Key_Message_Aided", "aided key message shares", ["all"], [probs("c7")],
+            lambda d: [d["exposed_clean"]], (1,2,3,4,5,6,7)
+        ),
+        _marginal("D1_Grocery_Shopper_Role", "shopper role shares", "D1_Grocery_Shopper_Role", "d1",
+                  samplers=samplers),
+        _d_nudge_check("D2_Snack_Purchase_Frequency", "d2", samplers),
+        _d_nudge_check("D3_Weekly_Snack_Spend", "d3", samplers),
+        _marginal("D4_Employment_Status", "employment shares", "D4_Employment_Status", "d4", samplers=samplers),
+        _marginal("D5_Education_Level", "education shares", "D5_Education_Level", "d5", samplers=samplers),
+        _marginal("D6_Marital_Status", "marital status shares", "D6_Marital_Status", "d6", samplers=samplers),
+        _marginal("D7_Children", "has children shares", "D7_Children", "d7", samplers=samplers),
+        FidelityCheck(
+            "D8_count", "number of children's age groups when D7=1", ["D7=1"], probs("d8_num_kids")[None, :],
+            lambda d: (np.where(d["completed"] & (d["D7_Children"] == 1), 0, -1),
+                       _index(d["d8_count"], (1,2,3)))
+        ),
+        _marginal("D9_Community_Type", "community type shares", "D9_Community_Type", "community_type",
+                  samplers=samplers),
+        _marginal("D10_Household_Income", "household income shares", "D10_Household_Income", "d10",
+                  samplers=samplers),
+    ]
+
+CHECKS = build_checks()
+
+# -----------------------------------------------------------------------------
+# STATISTICS
+# -----------------------------------------------------------------------------
+def _chi2_sf(x, df):
+    """Upper tail of the chi-square distribution for integer df (closed form)."""
+    if df <= 0:
+        return 1.0
+    half = x / 2.0
+    if df % 2 == 0:
+        terms = range(df // 2)
+        return min(1.0, math.exp(-half) * sum(math.exp(i * math.log(half) - math.lgamma(i + 1)) if half > 0
+                                              else float(i == 0) for i in terms))
+    tail = math.erfc(math.sqrt(half))
+    if half > 0:
+        tail += sum(math.exp(-half + (i + 0.5) * math.log(half) - math.lgamma(i + 1.5)) for i in range(df // 2))
+    return min(1.0, tail)
+
+class FidelityValidator:
+    """
+    Streaming accumulator: update() with each chunk (DataFrame), then
+    results() / report(). Counts are grouped bincounts per check, so the
+    memory held is a few small count matrices whatever the panel size.
+    Pass the panel's `scenario` and `exposure` model to check against its
+    distributions.
+    """
+    def __init__(self, checks=None, alpha=1e-3, tolerance=0.005, scenario=None, exposure=None):
+        if checks is None:
+            checks = CHECKS if scenario is None and exposure is None else build_checks(scenario, exposure)
+        self.checks = list(checks)
+        self.alpha = alpha
+        self.tolerance = tolerance
+        self.counts = {check.name: np.zeros(check.expected.shape, dtype=np.int64) for check in self.checks}
+        self.rows = 0
+
+    def update(self, df):
+        d = _derive(df)
+        for check in self.checks:
+            cell, code = check.extract(d)
+            keep = (cell >= 0) & (code >= 0)
+            n_cells, n_codes = check.expected.shape
+            flat = cell[keep] * n_codes + code[keep]
+            self.counts[check.name] += np.bincount(flat, minlength=n_cells * n_codes).reshape(n_cells, n_codes)
+        self.rows += len(df)
+        return self
+
+    def results(self):
+        """One row per check and cell: observed vs expected shares, chi-square, verdict."""
+        rows = []
+        for check in self.checks:
+            counts = self.counts[check.name]
+            for c, label in enumerate(check.cells):
+                n = int(counts[c].sum())
+                expected = check.expected[c]
+                if n == 0:
+                    rows.append(dict(check=check.name, cell=label, n=0, chi2=np.nan, dof=0, p_value=np.nan,
+                                     max_abs_diff=np.nan, passed=True, description=check.description))
+                    continue
+                observed = counts[c] / n
+                support = expected > 0
+                impossible = bool(counts[c][~support].any())
+                exp_counts = expected[support] * n
+                chi2 = float(((counts[c][support] - exp_counts) ** 2 / exp_counts).sum())
+                dof = int(support.sum()) - 1
+                p_value = 0.0 if impossible else _chi2_sf(chi2, dof)
+                max_diff = float(np.abs(observed - expected).max())
+                passed = not impossible and (p_value >= self.alpha or max_diff <= self.tolerance)
+                rows.append(dict(check=check.name, cell=label, n=n, chi2=chi2, dof=dof, p_value=p_value,
+                                 max_abs_diff=max_diff, passed=passed, description=check.description))
+        return pd.DataFrame(rows)
+
+    def passed(self):
+        return bool(self.results()["passed"].all())
+
+    def report(self):
+        results = self.results()
+        failed = results[~results["passed"]]
+        lines = [f"Fidelity checks on {self.rows:,} rows: {len(results) - len(failed)}/{len(results)} cells passed "
+                 f"(alpha={self.alpha}, tolerance={self.tolerance})"]
+        for row in failed.itertuples():
+            lines.append(f"  FAIL {row.check} [{row.cell}] n={row.n} p={row.p_value:.2e} "
+                         f"max |diff|={row.max_abs_diff:.4f} - {row.description}")
+        return "\n".join(lines)
+
+def validate_fidelity(data, alpha=1e-3, tolerance=0.005, scenario=None, exposure=None):
+    """
+    Run every check over a DataFrame or an iterable of chunks (e.g.
+    iter_dataset_chunks(...)), against `scenario`'s distributions and the
+    `exposure` model if given.
+    Returns the FidelityValidator; see its results(), passed() and report().
+    """
+    validator = FidelityValidator(alpha=alpha, tolerance=tolerance, scenario=scenario, exposure=exposure)
+    for chunk in ([data] if isinstance(data, pd.DataFrame) else data):
+        validator.update(chunk)
+    return validator
+
+if __name__ == "__main__":
+    print(validate_fidelity(sim.iter_dataset_chunks(
+        n_exposed=500_000, n_control=500_000, n_exposed_outliers=8_000,
+        n_control_outliers=7_000, n_terminated=50_000, seed=123, masks=True
+    )).report())
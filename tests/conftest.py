@@ -0,0 +1,7 @@
+"""
+Make the modules in src/ importable the same way the benchmarks do.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
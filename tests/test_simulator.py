@@ -0,0 +1,131 @@
+"""
+Invariants of the simulator, checked on small panels with fixed seeds:
+the batch engine draws from the same distributions as the scalar respondent
+functions, output does not depend on the worker count, written panels read
+back unchanged, appends add up to one larger write, and a zero-effect power
+study rejects at about alpha.
+
+Run with `python -m pytest -q` (needs pytest on top of requirements.txt).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import Simulated_brandx_survey as sim
+import survey_power
+from survey_validation import _chi2_sf
+
+QUOTAS = dict(n_exposed=900, n_control=700, n_exposed_outliers=5, n_control_outliers=4, n_terminated=60)
+
+def _concat(chunks):
+    return pd.concat(list(chunks), ignore_index=True)
+
+def _by_id(df):
+    return df.sort_values("respondent_id", ignore_index=True)
+
+# -----------------------------------------------------------------------------
+# BATCH VS SCALAR
+# -----------------------------------------------------------------------------
+COMPARED_COLUMNS = [
+    "A2_gender", "A3_age", "A4_province", "TV_Channel_A", "TV_Channel_B", "TV_Channel_C", "A6_PotatoChips",
+    "B3_Familiarity_BrandX", "B4_Consideration_BrandX", "B5_Recommendation_BrandX", "C1_Ad_Recall_Pre",
+    "C4_Ad_Enjoyment", "C7_Key_Message_Aided", "D1_Grocery_Shopper_Role", "D2_Snack_Purchase_Frequency",
+    "D3_Weekly_Snack_Spend", "D7_Children", "D10_Household_Income"
+]
+
+def _answers(columns):
+    """Compared columns of a scalar or batch draw, as a DataFrame (NaN = not asked)."""
+    frame = pd.DataFrame({
+        name: (values if name == "A4_province" else pd.to_numeric(pd.Series(values), errors="coerce"))
+        for name, values in ((name, list(columns[name])) for name in COMPARED_COLUMNS)
+    })
+    b1 = np.array(list(columns["B1_Unaided_BrandAwareness"]), dtype=np.uint64)
+    frame["BrandX_in_B1"] = (b1 >> np.uint64(sim.BRANDX_INDEX)) & np.uint64(1)
+    return frame
+
+def _homogeneity_p(a, b):
+    """Chi-square test that two samples of one categorical column share a distribution."""
+    table = pd.crosstab(
+        np.r_[np.zeros(len(a)), np.ones(len(b))], pd.concat([a, b], ignore_index=True).fillna(-1).astype(str)
+    ).to_numpy(dtype=float)
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / table.sum()
+    chi2 = float(((table - expected) ** 2 / expected).sum())
+    return _chi2_sf(chi2, table.shape[1] - 1)
+
+@pytest.mark.parametrize("group", ["exposed", "control"])
+def test_batch_matches_scalar_distributions(group):
+    n = 3000
+    flags = dict(force_exposed=group == "exposed", force_control=group == "control")
+    rng = np.random.default_rng(20)
+    rows = [sim.simulate_complete_respondent(i, rng=rng, **flags) for i in range(n)]
+    scalar = _answers({name: [row[name] for row in rows] for name in rows[0]})
+    batch = _answers(sim.simulate_complete_batch(np.arange(n), rng=np.random.default_rng(21), **flags))
+    p_values = {name: _homogeneity_p(scalar[name], batch[name]) for name in scalar}
+    assert min(p_values.values()) > 1e-3, p_values
+
+# -----------------------------------------------------------------------------
+# WORKERS
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("offsets", [None, [0] * len(sim.RESPONDENT_GROUPS)])
+def test_output_independent_of_worker_count(offsets):
+    options = dict(QUOTAS, chunk_size=400, seed=5, offsets=offsets, block_size=256)
+    serial = _concat(sim.iter_dataset_chunks(n_workers=1, **options))
+    parallel = _concat(sim.iter_dataset_chunks(n_workers=3, **options))
+    assert len(serial) == sum(QUOTAS.values())
+    pd.testing.assert_frame_equal(serial, parallel)
+
+# -----------------------------------------------------------------------------
+# ROUND TRIPS
+# -----------------------------------------------------------------------------
+def test_csv_round_trip(tmp_path):
+    path = tmp_path / "panel.csv"
+    sim.write_dataset_csv(str(path), chunk_size=500, seed=11, **QUOTAS)
+    expected = _concat(sim.iter_dataset_chunks(chunk_size=500, seed=11, **QUOTAS))
+    # CSV does not keep dtypes (ints with gaps read back as floats)
+    pd.testing.assert_frame_equal(pd.read_csv(path), expected, check_dtype=False)
+
+@pytest.mark.parametrize("writer, suffix", [(sim.write_dataset_parquet, "parquet"),
+                                            (sim.write_dataset_arrow, "arrow")])
+@pytest.mark.parametrize("compact", [False, True])
+def test_columnar_round_trip(tmp_path, writer, suffix, compact):
+    path = str(tmp_path / f"panel.{suffix}")
+    writer(path, chunk_size=500, seed=11, compact=compact, **QUOTAS)
+    expected = _concat(sim.iter_dataset_chunks(chunk_size=500, seed=11, compact=compact, **QUOTAS))
+    pd.testing.assert_frame_equal(sim.read_dataset(path).to_pandas(), expected)
+
+# -----------------------------------------------------------------------------
+# APPEND
+# -----------------------------------------------------------------------------
+def _read(path, fmt):
+    return pd.read_csv(path) if fmt == "csv" else sim.read_dataset(path).to_pandas()
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_appends_match_one_larger_write(tmp_path, fmt):
+    writer = {"csv": sim.write_dataset_csv, "parquet": sim.write_dataset_parquet,
+              "arrow": sim.write_dataset_arrow}[fmt]
+    first = dict(n_exposed=300, n_control=500, n_exposed_outliers=3, n_control_outliers=0, n_terminated=40)
+    second = dict(n_exposed=700, n_control=100, n_exposed_outliers=2, n_control_outliers=4, n_terminated=25)
+    grown, whole = str(tmp_path / f"grown.{fmt}"), str(tmp_path / f"whole.{fmt}")
+
+    writer(grown, chunk_size=256, manifest=True, seed=9, **first)
+    sim.append_dataset(grown, n_workers=2, **second)
+    writer(whole, chunk_size=256, manifest=True, seed=9, **{k: first[k] + second[k] for k in first})
+
+    pd.testing.assert_frame_equal(_by_id(_read(grown, fmt)), _by_id(_read(whole, fmt)))
+
+def test_append_rejects_a_different_seed(tmp_path):
+    path = str(tmp_path / "panel.csv")
+    sim.write_dataset_csv(path, manifest=True, seed=9, **QUOTAS)
+    with pytest.raises(ValueError):
+        sim.append_dataset(path, seed=10, n_exposed=10)
+
+# -----------------------------------------------------------------------------
+# POWER
+# -----------------------------------------------------------------------------
+def test_power_false_positive_rate_near_alpha():
+    alpha, n_replicates = 0.05, 2000
+    curve = survey_power.power_curve([150], effects=(0.0,), n_replicates=n_replicates, alpha=alpha, seed=3)
+    # +/- 4 binomial standard errors around alpha
+    margin = 4 * np.sqrt(alpha * (1 - alpha) / n_replicates)
+    assert set(curve["metric"]) == set(survey_power.POWER_METRICS)
+    assert np.all(np.abs(curve["power"] - alpha) < margin), curve[["metric", "power"]]